@@ -0,0 +1,56 @@
+"""
+Compare per-field convert_str_to_type decoding of internal csv rows with the precompiled row decoders used by
+csv_content_to_stands.
+
+python -m benchmarks.csv_decode_benchmark [rows]
+"""
+import csv
+import sys
+from io import StringIO
+
+from lukefi.metsi.data.formats.ForestBuilder import VMI13Builder
+from lukefi.metsi.data.formats.io_utils import csv_content_to_stands, stands_to_csv_content
+from lukefi.metsi.data.formats.util import convert_str_to_type
+from lukefi.metsi.data.model import ForestStand, ReferenceTree, TreeStratum
+from benchmarks.util import read_lines, replicate_vmi13, report
+
+
+def convert_fields(cls, layout, row, offset):
+    """Decoding of a row with a convert_str_to_type call for each field, as the model classes used to"""
+    result = cls()
+    index = offset
+    for property_name, width, converter in layout:
+        value = row[index] if width == 1 else tuple(row[index:index + width])
+        value = converter(value) if converter else convert_str_to_type(cls, value, property_name)
+        setattr(result, property_name, value)
+        index += width
+    return result
+
+
+def convert_str_to_type_content(rows: list) -> list:
+    stands = []
+    for row in rows:
+        if row[0] == "stand":
+            stand = convert_fields(ForestStand, ForestStand.row_layout, row, 2)
+            stand.identifier = row[1]
+            stands.append(stand)
+        elif row[0] == "tree":
+            stands[-1].reference_trees.append(convert_fields(ReferenceTree, ReferenceTree.csv_row_layout, row, 1))
+        elif row[0] == "stratum":
+            stands[-1].tree_strata.append(convert_fields(TreeStratum, TreeStratum.csv_row_layout, row, 1))
+    return stands
+
+
+def main(row_count: int):
+    stands = VMI13Builder({'reference_trees': True}, replicate_vmi13(read_lines('VMI13_source_mini.dat'), 1000)).build()
+    content = list(csv.reader(StringIO('\n'.join(stands_to_csv_content(stands, ';'))), delimiter=';'))
+    rows = (content * (row_count // len(content) + 1))[:row_count]
+    while rows[0][0] != 'stand':
+        rows.pop(0)
+    print(f'{len(rows)} rows')
+    report('convert_str_to_type', lambda: convert_str_to_type_content(rows), repeat=1)
+    report('compiled decoders', lambda: csv_content_to_stands(rows), repeat=1)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,32 @@
+"""
+Time importing the package modules in fresh interpreters, with and without the geospatial stack that is imported on
+first use only.
+
+python -m benchmarks.import_time_benchmark [repeat]
+"""
+import subprocess
+import sys
+
+from benchmarks.util import report
+
+MODULES = {
+    'model': 'lukefi.metsi.data.model',
+    'ForestBuilder': 'lukefi.metsi.data.formats.ForestBuilder',
+    'internal2mela': 'lukefi.metsi.data.conversion.internal2mela',
+    'ForestBuilder and geospatial stack': 'lukefi.metsi.data.formats.ForestBuilder, geopandas, pyproj',
+}
+
+
+def interpreter(script: str):
+    subprocess.run([sys.executable, '-c', script], check=True)
+
+
+def main(repeat: int):
+    baseline = report('interpreter startup', lambda: interpreter('pass'), repeat)
+    for name, modules in MODULES.items():
+        best = report(f'import {name}', lambda: interpreter(f'import {modules}'), repeat)
+        print(f'{"  over startup":<40} {(best - baseline) * 1000:10.1f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,64 @@
+"""
+Compare findtext based parsing of SMK stand, stratum and operation data with the single-pass record extraction.
+
+python -m benchmarks.smk_parse_benchmark [copies]
+"""
+import copy
+import sys
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+
+from lukefi.metsi.data.formats import smk_util
+from benchmarks.util import RESOURCES, report
+
+NS = smk_util.NS
+STAND_FIELDS = ('CompleteState', 'StandBasicDataDate', 'Area', 'SubGroup', 'FertilityClass', 'DrainageState',
+                'MainGroup', 'CuttingRestriction')
+STRATUM_FIELDS = ('StratumNumber', 'TreeSpecies', 'Storey', 'Age', 'BasalArea', 'StemCount', 'MeanDiameter',
+                  'MeanHeight', 'Volume')
+
+
+def findtext_stand(estand: ET.Element) -> SimpleNamespace:
+    sns = SimpleNamespace(id=smk_util.generate_stand_identifier(estand))
+    for name in STAND_FIELDS:
+        setattr(sns, name, estand.findtext(f'./st:StandBasicData/st:{name}', None, NS))
+    return sns
+
+
+def findtext_stratum(estratum: ET.Element) -> SimpleNamespace:
+    sns = SimpleNamespace(id=estratum.attrib['id'])
+    for name in STRATUM_FIELDS:
+        setattr(sns, name, estratum.findtext(f'tst:{name}', None, NS))
+    sns.DataSource = estratum.findtext('co:DataSource', None, NS)
+    return sns
+
+
+def findtext_operation(eoperation: ET.Element) -> tuple:
+    return (eoperation.attrib['id'],
+            eoperation.findtext('./op:OperationType', None, NS),
+            eoperation.findtext('./op:CompletionData/op:CompletionDate', None, NS),
+            eoperation.findtext('./op:ProposalData/op:ProposalYear', None, NS))
+
+
+def parse(estands: list, stand_func, stratum_func, operation_func):
+    for estand in estands:
+        stand_func(estand)
+        for estratum in estand.iterfind('./ts:TreeStandData/ts:TreeStandDataDate/tst:TreeStrata/tst:TreeStratum', NS):
+            stratum_func(estratum)
+        for eoperation in estand.iterfind('./op:Operations/op:Operation', NS):
+            operation_func(eoperation)
+
+
+def main(copies: int):
+    source = ET.parse(RESOURCES / 'SMK_source.xml').getroot().findall('./st:Stands/st:Stand', NS)
+    estands = [copy.deepcopy(estand) for _ in range(copies) for estand in source]
+    print(f'{len(estands)} stands')
+    findtext = report('findtext', lambda: parse(estands, findtext_stand, findtext_stratum, findtext_operation))
+    records = report('records', lambda: parse(estands, smk_util.read_stand_basic_data, smk_util.read_stratum_data,
+                                              smk_util.read_operation_data))
+    print(f'{"per stand findtext / records":<40} {findtext / len(estands) * 1e6:7.1f} / '
+          f'{records / len(estands) * 1e6:.1f} us')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,31 @@
+"""
+Compare building all VMI12 stands and discarding non-forest land at export with cleaned_output, with rejecting them
+on their raw type 1 fields through the 'stand_filter' builder flag.
+
+python -m benchmarks.stand_filter_benchmark [copies]
+"""
+import sys
+
+from lukefi.metsi.data.enums.internal import LandUseCategory
+from lukefi.metsi.data.formats.ForestBuilder import VMI12Builder
+from lukefi.metsi.data.formats.io_utils import cleaned_output
+from lukefi.metsi.data.formats.vmi_filter import StandFilter
+from benchmarks.util import read_lines, replicate_vmi12, report
+
+
+def main(copies: int):
+    rows = replicate_vmi12(read_lines('VMI12_source_mini.dat'), copies)
+    flags = {'reference_trees': True, 'strata_origin': '1'}
+    forest_land = [category for category in LandUseCategory if category.value < 5]
+    filtered_flags = dict(flags, stand_filter=StandFilter(land_use_categories=forest_land))
+    print(f'{len(VMI12Builder(flags, rows).forest_stands)} stands, '
+          f'{len(VMI12Builder(filtered_flags, rows).forest_stands)} accepted by the filter')
+    report('build() and cleaned_output', lambda: cleaned_output(VMI12Builder(flags, rows).build()), repeat=7)
+    assert len(cleaned_output(VMI12Builder(flags, rows).build())) == \
+        len(cleaned_output(VMI12Builder(filtered_flags, rows).build()))
+    report('stand_filter build() and cleaned_output',
+           lambda: cleaned_output(VMI12Builder(filtered_flags, rows).build()), repeat=7)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
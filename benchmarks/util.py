@@ -0,0 +1,34 @@
+"""Shared helpers for the benchmark scripts. Run the scripts as modules from the repository root."""
+import timeit
+import typing
+from pathlib import Path
+
+RESOURCES = Path('tests', 'resources')
+
+
+def read_lines(file_name: str) -> typing.List[str]:
+    with open(RESOURCES / file_name, 'r', encoding='utf-8') as input_file:
+        return [line for line in input_file.readlines() if line.strip()]
+
+
+def replicate_vmi12(rows: typing.List[str], copies: int) -> typing.List[str]:
+    """Copies of VMI12 rows with unique stand identifiers, numbered in the section fields"""
+    return [row[:2] + f'{i // 1000:03d}{i % 1000:03d}' + row[8:] for i in range(copies) for row in rows]
+
+
+def replicate_vmi13(rows: typing.List[str], copies: int) -> typing.List[str]:
+    """Copies of VMI13 rows with unique stand identifiers, numbered in the section fields"""
+    result = []
+    for i in range(copies):
+        for row in rows:
+            fields = row.split()
+            fields[3], fields[4] = str(i // 1000), str(i % 1000)
+            result.append(' '.join(fields))
+    return result
+
+
+def report(name: str, func: typing.Callable, repeat: int = 5) -> float:
+    """Print and return the best time of given repeats of func"""
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f'{name:<40} {best * 1000:10.1f} ms')
+    return best
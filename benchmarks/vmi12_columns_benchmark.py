@@ -0,0 +1,39 @@
+"""
+Compare per-row slicing of VMI12 source rows with the bulk fixed-width extraction of vmi_columns.
+
+python -m benchmarks.vmi12_columns_benchmark [copies]
+"""
+import sys
+
+from lukefi.metsi.data.formats import vmi_columns
+from lukefi.metsi.data.formats.ForestBuilder import VMI12Builder
+from lukefi.metsi.data.formats.vmi_const import VMI12StandIndices, VMI12TreeIndices, VMI12StratumIndices
+from benchmarks.util import read_lines, replicate_vmi12, report
+
+
+def slice_rows(rows: list, indices: type) -> list:
+    fields = list(vmi_columns.index_fields(indices).values())
+    return [[row[index] for index in fields] for row in rows]
+
+
+def main(copies: int):
+    rows = replicate_vmi12(read_lines('VMI12_source_mini.dat'), copies)
+    data = ''.join(row if row.endswith('\n') else row + '\n' for row in rows).encode('utf-8')
+    builder = VMI12Builder({'reference_trees': True}, rows)
+    print(f'{len(builder.forest_stands)} stands, {len(rows)} rows')
+
+    report('row slicing', lambda: (
+        slice_rows(builder.forest_stands, VMI12StandIndices),
+        slice_rows(builder.tree_strata, VMI12StratumIndices),
+        slice_rows(builder.reference_trees, VMI12TreeIndices)))
+    report('column extraction', lambda: (
+        vmi_columns.slice_columns(vmi_columns.char_table(builder.forest_stands), VMI12StandIndices),
+        vmi_columns.slice_columns(vmi_columns.char_table(builder.tree_strata), VMI12StratumIndices),
+        vmi_columns.slice_columns(vmi_columns.char_table(builder.reference_trees), VMI12TreeIndices)))
+    report('build()', lambda: VMI12Builder({'reference_trees': False}, rows).build(), repeat=3)
+    report('build_columnar()', lambda: VMI12Builder({'reference_trees': False}, rows).build_columnar(), repeat=3)
+    report('read_vmi12_columns(bytes)', lambda: vmi_columns.read_vmi12_columns(data), repeat=3)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,39 @@
+"""
+Compare building a handful of stands out of a VMI13 source file by reading the whole file with building them through
+the byte offset index of vmi_index.
+
+python -m benchmarks.vmi_index_benchmark [copies] [stands]
+"""
+import os
+import sys
+import tempfile
+
+from lukefi.metsi.data.formats import vmi_index
+from lukefi.metsi.data.formats.ForestBuilder import VMI13Builder
+from benchmarks.util import read_lines, replicate_vmi13, report
+
+
+def main(copies: int, stand_count: int):
+    flags = {'reference_trees': True, 'strata_origin': '1'}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'VMI13_source.dat')
+        with open(path, 'w', encoding='utf-8') as source:
+            source.write('\n'.join(replicate_vmi13(read_lines('VMI13_source_mini.dat'), copies)))
+        builder = VMI13Builder(flags)
+        index = vmi_index.VMIIndex.create(builder, path)
+        wanted = index.select()[::max(1, len(index.stands) // stand_count)][:stand_count]
+        print(f'{len(index.stands)} stands, {os.path.getsize(path) // 1024} KiB, building {len(wanted)} stands')
+
+        def read_and_filter():
+            with open(path, 'r', encoding='utf-8') as source:
+                rows = [row for row in source if builder.stand_identifier(builder.pre_parse_row(row)) in wanted]
+            return VMI13Builder(flags, rows).build()
+
+        report('create index', lambda: vmi_index.VMIIndex.create(builder, path), repeat=1)
+        report('load persisted index', lambda: vmi_index.load_or_create(builder, path))
+        report('read whole file and filter', read_and_filter, repeat=3)
+        report('build_indexed', lambda: builder.build_indexed(path, stand_ids=wanted))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000, int(sys.argv[2]) if len(sys.argv) > 2 else 10)
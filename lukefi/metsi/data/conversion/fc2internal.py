@@ -1,3 +1,8 @@
+from typing import Sequence
+
+import numpy as np
+
+from lukefi.metsi.data.conversion.util import EnumTable
 from lukefi.metsi.data.enums.forest_centre import (
     ForestCentreSiteType,
     ForestCentreOwnerCategory,
@@ -101,32 +106,74 @@ _drainage_category_map = {
 }
 
 
+_species_table = EnumTable(_species_map)
+_land_use_table = EnumTable(_land_use_map)
+_owner_table = EnumTable(_owner_map)
+_soil_peatland_table = EnumTable(_soil_peatland_map)
+_site_type_table = EnumTable(_site_type_map)
+_drainage_category_table = EnumTable(_drainage_category_map)
+
+
 def convert_drainage_category(code: str):
     value = ForestCentreDrainageCategory(code)
-    return _drainage_category_map.get(value)
+    return _drainage_category_table.get(value)
 
 
 def convert_site_type_category(code: str) -> SiteType:
     value = ForestCentreSiteType(code)
-    return _site_type_map.get(value)
+    return _site_type_table.get(value)
 
 
 def convert_soil_peatland_category(sp_code: str) -> SoilPeatlandCategory:
     value = ForestCentreSoilPeatlandCategory(sp_code)
-    return _soil_peatland_map.get(value)
+    return _soil_peatland_table.get(value)
 
 
 def convert_land_use_category(lu_code: str) -> LandUseCategory:
     fc_category = ForestCentreLandUseCategory(lu_code)
-    return _land_use_map.get(fc_category)
+    return _land_use_table.get(fc_category)
 
 
 def convert_species(species_code: str) -> TreeSpecies:
     """Converts FC species code to internal TreeSpecies code"""
     fc_species = ForestCentreSpecies(species_code)
-    return _species_map.get(fc_species)
+    return _species_table.get(fc_species)
 
 
 def convert_owner(owner_code: str) -> OwnerCategory:
     fc_owner = ForestCentreOwnerCategory(owner_code)
-    return _owner_map.get(fc_owner)
+    return _owner_table.get(fc_owner)
+
+
+def _convert_codes(table: EnumTable, codes: Sequence[str]) -> np.ndarray:
+    return table.convert(table.source_codes(codes))
+
+
+def convert_drainage_category_codes(codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_drainage_category into DrainageCategory values"""
+    return _convert_codes(_drainage_category_table, codes)
+
+
+def convert_site_type_category_codes(codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_site_type_category into SiteType values"""
+    return _convert_codes(_site_type_table, codes)
+
+
+def convert_soil_peatland_category_codes(sp_codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_soil_peatland_category into SoilPeatlandCategory values"""
+    return _convert_codes(_soil_peatland_table, sp_codes)
+
+
+def convert_land_use_category_codes(lu_codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_land_use_category into LandUseCategory values"""
+    return _convert_codes(_land_use_table, lu_codes)
+
+
+def convert_species_codes(species_codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_species into TreeSpecies values"""
+    return _convert_codes(_species_table, species_codes)
+
+
+def convert_owner_codes(owner_codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_owner into OwnerCategory values"""
+    return _convert_codes(_owner_table, owner_codes)
@@ -1,4 +1,8 @@
 from copy import copy
+from typing import Sequence
+
+import numpy as np
+
 from lukefi.metsi.data.enums.mela import (
     MelaOwnerCategory, 
     MelaSiteTypeCategory, 
@@ -15,7 +19,8 @@ from lukefi.metsi.data.enums.internal import (
     LandUseCategory,
     DrainageCategory
     )
-from lukefi.metsi.data.conversion.util import apply_mappers
+from lukefi.metsi.data.conversion.util import MISSING, EnumTable, apply_mappers
+from lukefi.metsi.data.formats import geo_util
 # TODO: can we find a way to resolve the circular import introduced by trying to use these classes just for typing?
 # Even using the iffing below, pytest fails during top_level_collect
 # if typing.TYPE_CHECKING:
@@ -124,8 +129,26 @@ _rich_mire_types = [
 ]
 
 
+# UNDRAINED_MINERAL_SOIL_OR_MIRE is mapped by the SoilPeatlandCategory, other categories default to undrained
+# mineral soil
+_drainage_category_map = {
+    DrainageCategory.DITCHED_MINERAL_SOIL: MelaDrainageCategory.DITCHED_MINERAL_SOIL,
+    DrainageCategory.DITCHED_MIRE: MelaDrainageCategory.DITCHED_MIRE,
+    DrainageCategory.TRANSFORMING_MIRE: MelaDrainageCategory.TRANSFORMING_MIRE,
+    DrainageCategory.TRANSFORMED_MIRE: MelaDrainageCategory.TRANSFORMED_MIRE,
+}
+
+
+species_table = EnumTable(species_map, MelaTreeSpecies.OTHER_DECIDUOUS)
+land_use_table = EnumTable(land_use_map)
+owner_table = EnumTable(owner_map)
+_site_type_table = EnumTable(_site_type_map)
+_soil_peatland_table = EnumTable(_soil_peatland_map)
+_drainage_category_table = EnumTable(_drainage_category_map, MelaDrainageCategory.UNDRAINED_MINERAL_SOIL)
+
+
 def site_type_mapper(target):
-    target.site_type_category = _site_type_map.get(target.site_type_category)
+    target.site_type_category = _site_type_table.get(target.site_type_category)
     return target
 
 
@@ -135,16 +158,8 @@ def drainage_category_mapper(target):
             target.drainage_category = MelaDrainageCategory.UNDRAINED_MINERAL_SOIL
         else:
             target.drainage_category = MelaDrainageCategory.UNDRAINED_MIRE
-    elif target.drainage_category == DrainageCategory.DITCHED_MINERAL_SOIL:
-        target.drainage_category = MelaDrainageCategory.DITCHED_MINERAL_SOIL
-    elif target.drainage_category == DrainageCategory.DITCHED_MIRE:
-        target.drainage_category = MelaDrainageCategory.DITCHED_MIRE
-    elif target.drainage_category == DrainageCategory.TRANSFORMING_MIRE:
-        target.drainage_category = MelaDrainageCategory.TRANSFORMING_MIRE
-    elif target.drainage_category == DrainageCategory.TRANSFORMED_MIRE:
-        target.drainage_category = MelaDrainageCategory.TRANSFORMED_MIRE
     else:
-        target.drainage_category = MelaDrainageCategory.UNDRAINED_MINERAL_SOIL
+        target.drainage_category = _drainage_category_table.get(target.drainage_category)
     return target
 
 
@@ -162,40 +177,92 @@ def soil_peatland_mapper(target):
         else:
             target.soil_peatland_category = MelaSoilAndPeatlandCategory.PEATLAND_BARREN_TREELESS_MIRE
     else: 
-        target.soil_peatland_category = _soil_peatland_map.get(target.soil_peatland_category)
+        target.soil_peatland_category = _soil_peatland_table.get(target.soil_peatland_category)
     
     return target
     
 
 def land_use_mapper(target):
     """in-place mapping from internal LandUseCategory to MelaLandUseCategory"""
-    target.land_use_category = land_use_map.get(target.land_use_category)
+    target.land_use_category = land_use_table.get(target.land_use_category)
     return target
 
 
 def owner_mapper(target):
     """in-place mapping from internal land owner category to mela owner category"""
-    target.owner_category = owner_map.get(target.owner_category)
+    target.owner_category = owner_table.get(target.owner_category)
     return target
 
 
 def species_mapper(target):
     """in-place mapping from internal tree species to mela tree species"""
-    target.species = species_map.get(target.species, MelaTreeSpecies.OTHER_DECIDUOUS)
+    target.species = species_table.get(target.species)
     return target
 
 
+def site_type_codes(site_types: Sequence[int]) -> np.ndarray:
+    """Vectorized site_type_mapper of a column of SiteType values, MISSING for None"""
+    return _site_type_table.convert(site_types)
+
+
+def soil_peatland_codes(soil_peatland_categories: Sequence[int], site_types: Sequence[int]) -> np.ndarray:
+    """
+    Vectorized soil_peatland_mapper of a column of SoilPeatlandCategory values with a column of the SiteType values
+    of the same targets, MISSING for None
+    """
+    soil_peatland_categories = np.asarray(soil_peatland_categories, dtype=np.int64)
+    site_types = np.asarray(site_types, dtype=np.int64)
+    treeless_mire = np.select(
+        [site_types == MISSING, np.isin(site_types, _rich_mire_types)],
+        [MISSING, MelaSoilAndPeatlandCategory.PEATLAND_RICH_TREELESS_MIRE.value],
+        MelaSoilAndPeatlandCategory.PEATLAND_BARREN_TREELESS_MIRE.value)
+    return np.where(soil_peatland_categories == SoilPeatlandCategory.TREELESS_MIRE, treeless_mire,
+                    _soil_peatland_table.convert(soil_peatland_categories))
+
+
+def drainage_category_codes(drainage_categories: Sequence[int], soil_peatland_categories: Sequence[int]) -> np.ndarray:
+    """
+    Vectorized drainage_category_mapper of a column of DrainageCategory values with a column of the
+    SoilPeatlandCategory values of the same targets, MISSING for None
+    """
+    drainage_categories = np.asarray(drainage_categories, dtype=np.int64)
+    undrained = np.where(np.asarray(soil_peatland_categories) == SoilPeatlandCategory.MINERAL_SOIL,
+                         MelaDrainageCategory.UNDRAINED_MINERAL_SOIL.value, MelaDrainageCategory.UNDRAINED_MIRE.value)
+    return np.where(drainage_categories == DrainageCategory.UNDRAINED_MINERAL_SOIL_OR_MIRE, undrained,
+                    _drainage_category_table.convert(drainage_categories))
+
+
+def land_use_codes(land_use_categories: Sequence[int]) -> np.ndarray:
+    """Vectorized land_use_mapper of a column of LandUseCategory values, MISSING for None"""
+    return land_use_table.convert(land_use_categories)
+
+
+def owner_codes(owner_categories: Sequence[int]) -> np.ndarray:
+    """Vectorized owner_mapper of a column of OwnerCategory values, MISSING for None"""
+    return owner_table.convert(owner_categories)
+
+
+def species_codes(species: Sequence[int]) -> np.ndarray:
+    """Vectorized species_mapper of a column of TreeSpecies values, MISSING for None"""
+    return species_table.convert(species)
+
+
+_direct_location_crs = ('EPSG:3067', 'EPSG:2393')
+
+
 def stand_location_converter(target):
     """
     in-place conversion of ForestStand geolocation to kilometer precision,
-    and to YKJ/KKJ3 with band prefix 3 removed for EPSG:2393
+    and to YKJ/KKJ3 with band prefix 3 removed for EPSG:2393.
+    Geolocations in other coordinate systems are transformed to EPSG:3067 first.
     """
+    if target.geo_location[3] not in _direct_location_crs:
+        target.geo_location = geo_util.reproject_geo_locations([target.geo_location], 'EPSG:3067')[0]
+
     if target.geo_location[3] == 'EPSG:3067':
         lat, lon = (target.geo_location[0] / 1000, target.geo_location[1] / 1000)
-    elif target.geo_location[3] == 'EPSG:2393':
-        lat, lon = (target.geo_location[0] / 1000, target.geo_location[1] / 1000 - 3000)
     else:
-        raise Exception("Unsupported CRS {} for stand {}".format(target.geo_location[3], target.identifier))
+        lat, lon = (target.geo_location[0] / 1000, target.geo_location[1] / 1000 - 3000)
 
     target.geo_location = (
         lat,
@@ -205,6 +272,18 @@ def stand_location_converter(target):
     return target
 
 
+def stand_location_batch_converter(targets: list) -> list:
+    """
+    in-place conversion of ForestStand geolocations as in stand_location_converter, with geolocations in other
+    coordinate systems transformed to EPSG:3067 in a single transformation per source coordinate system
+    """
+    other = [target for target in targets if target.geo_location[3] not in _direct_location_crs]
+    locations = geo_util.reproject_geo_locations([target.geo_location for target in other], 'EPSG:3067')
+    for target, location in zip(other, locations):
+        target.geo_location = location
+    return [stand_location_converter(target) for target in targets]
+
+
 def stand_area_converter(target):
     """ in-place conversion to for variables area and area weight when stands is auxiliary """
     if target.is_auxiliary():
@@ -227,21 +306,51 @@ def mela_tree(tree):
     return apply_mappers(result, *default_mela_tree_mappers)
 
 
-def mela_stand(stand):
-    """Convert a ForestStand so that enumerated category variables are converted to Mela value space"""
+def _copy_stand(stand):
     result = copy(stand)
     result.geo_location = copy(stand.geo_location)
     result.stems_per_ha_scaling_factors = copy(stand.stems_per_ha_scaling_factors)
-    result = apply_mappers(result, *default_mela_stand_mappers)
-    result.reference_trees = list(map(mela_tree, result.reference_trees))
-    for tree in result.reference_trees:
-        tree.stand = result
-    result.tree_strata = list(map(mela_stratum, result.tree_strata))
-    for stratum in result.tree_strata:
-        stratum.stand = result
     return result
 
 
+def _mela_stand_members(result, reference_trees=True, tree_strata=True):
+    if reference_trees:
+        result.reference_trees = list(map(mela_tree, result.reference_trees))
+        for tree in result.reference_trees:
+            tree.stand = result
+    else:
+        result.reference_trees = []
+    if tree_strata:
+        result.tree_strata = list(map(mela_stratum, result.tree_strata))
+        for stratum in result.tree_strata:
+            stratum.stand = result
+    else:
+        result.tree_strata = []
+    return result
+
+
+def mela_stand(stand, reference_trees=True, tree_strata=True):
+    """
+    Convert a ForestStand so that enumerated category variables are converted to Mela value space.
+    With reference_trees or tree_strata False the members are not converted and the result has none of them.
+    """
+    result = apply_mappers(_copy_stand(stand), *default_mela_stand_mappers)
+    return _mela_stand_members(result, reference_trees, tree_strata)
+
+
+def mela_stands(stands: list, reference_trees=True, tree_strata=True) -> list:
+    """
+    Convert ForestStands as in mela_stand, with the geolocations of all stands converted as a batch by
+    stand_location_batch_converter
+    """
+    results = stand_location_batch_converter([_copy_stand(stand) for stand in stands])
+    mappers = [mapper for mapper in default_mela_stand_mappers if mapper is not stand_location_converter]
+    return [
+        _mela_stand_members(apply_mappers(result, *mappers), reference_trees, tree_strata)
+        for result in results
+    ]
+
+
 default_mela_tree_mappers = [species_mapper]
 default_mela_stratum_mappers = [species_mapper]
 default_mela_stand_mappers = [stand_location_converter,
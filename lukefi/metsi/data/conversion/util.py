@@ -1,8 +1,76 @@
-from typing import Callable
+from enum import Enum
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+MISSING = -1
 
 
 def apply_mappers(target, *mappers: Callable):
     """apply a list of mapper functions to a target object"""
     for mapper in mappers:
         target = mapper(target)
-    return target
\ No newline at end of file
+    return target
+
+
+class EnumTable:
+    """
+    Compiled lookup table of an enum conversion, given as a dict of source members to target members.
+
+    The integer array `codes` holds the value of the target member for each source code, with MISSING for unmapped
+    source members. Source codes are the values of integer enum members and the definition order of the members of
+    other enums. Single members are converted with get(), like dict.get, and whole columns of source codes with
+    convert(). Missing values are coded MISSING in columns and converted to the default.
+    """
+
+    def __init__(self, mapping: dict, default: Optional[Enum] = None):
+        self.source = type(next(iter(mapping)))
+        self.target = type(next(iter(mapping.values())))
+        self.default = default
+        self.default_code = MISSING if default is None else default.value
+        self._positions = None if issubclass(self.source, int) else {
+            member: position for position, member in enumerate(self.source)}
+        self.codes = np.full(max(self.source_code(member) for member in self.source) + 1, MISSING, dtype=np.int64)
+        for source, target in mapping.items():
+            self.codes[self.source_code(source)] = target.value
+        members = {member.value: member for member in self.target}
+        self._lookup = {
+            source: members[code] for source, code in ((s, self.codes[self.source_code(s)]) for s in self.source)
+            if code != MISSING
+        }
+
+    def source_code(self, member: Enum) -> int:
+        """The source code of given member of the source enum"""
+        return member.value if self._positions is None else self._positions[member]
+
+    def get(self, source) -> Optional[Enum]:
+        """The target member of a source member, or the default for unmapped and missing values"""
+        return self._lookup.get(source, self.default)
+
+    def source_codes(self, values: Sequence) -> np.ndarray:
+        """
+        Source codes of a column of source enum values. The values are converted once per unique value with the
+        source enum, raising ValueError for values that are not in the enum.
+        """
+        unique, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        codes = np.array([self.source_code(self.source(value)) for value in unique.tolist()], dtype=np.int64)
+        return codes[inverse]
+
+    def convert(self, codes: Sequence[int]) -> np.ndarray:
+        """Target values of a column of source codes, with the default for unmapped and MISSING source codes"""
+        codes = np.asarray(codes, dtype=np.int64)
+        known = (codes >= 0) & (codes < len(self.codes))
+        result = self.codes[np.where(known, codes, 0)]
+        return np.where(known & (result != MISSING), result, self.default_code)
+
+    def members(self, codes: Sequence[int]) -> np.ndarray:
+        """Object array of the target members of a column of target values, None for MISSING"""
+        members = np.array([None, *self.target], dtype=object)
+        values = np.array([MISSING, *(member.value for member in self.target)])
+        order = np.argsort(values)
+        return members[order][np.searchsorted(values[order], np.asarray(codes, dtype=np.int64))]
+
+
+def enum_codes(members: Sequence[Optional[Enum]]) -> np.ndarray:
+    """Integer values of a column of integer valued enum members, MISSING for None"""
+    return np.array([MISSING if member is None else member.value for member in members], dtype=np.int64)
@@ -1,5 +1,8 @@
-from typing import Optional
+from typing import Optional, Sequence
 
+import numpy as np
+
+from lukefi.metsi.data.conversion.util import MISSING, EnumTable
 from lukefi.metsi.data.enums.vmi import (
     VmiSiteType,
     VmiOwnerCategory,  
@@ -113,45 +116,94 @@ _drainage_category_map = {
 }
 
 
+_species_table = EnumTable(_species_map)
+_land_use_table = EnumTable(_land_use_map)
+_owner_table = EnumTable(_owner_map)
+_soil_peatland_table = EnumTable(_soil_peatland_map)
+_site_type_table = EnumTable(_site_type_map)
+_drainage_category_table = EnumTable(_drainage_category_map)
+
+_empty_vmi_strs = ('', ' ', '.')
+
+
 def is_empty_vmi_str(candidate: str) -> bool:
-    return candidate in ('', ' ', '.')
+    return candidate in _empty_vmi_strs
 
 
 def convert_drainage_category(code):
     if is_empty_vmi_str(code):
         return None
     value = VmiDrainageCategory(code)
-    return _drainage_category_map.get(value)
+    return _drainage_category_table.get(value)
 
 
 def convert_site_type_category(code: str) -> Optional[SiteType]:
     if is_empty_vmi_str(code):
         return None
     value = VmiSiteType(code)
-    return _site_type_map.get(value)
+    return _site_type_table.get(value)
 
 
 def convert_soil_peatland_category(code: str) -> Optional[SoilPeatlandCategory]:
     if is_empty_vmi_str(code):
         return None
     vmi_category = VmiSoilPeatlandCategory(code)
-    return _soil_peatland_map.get(vmi_category)
+    return _soil_peatland_table.get(vmi_category)
 
 
 def convert_land_use_category(lu_code: str) -> LandUseCategory:
     """sanitization of lu_code is the responsibility of the caller, 
     meaning that this conversion will fail e.g. if the parameter is a lower-case letter."""
     vmi_category = VmiLandUseCategory(lu_code)
-    return _land_use_map.get(vmi_category)
+    return _land_use_table.get(vmi_category)
 
 
 def convert_species(species_code: str) -> TreeSpecies:
     """Converts VMI species code to internal TreeSpecies code"""
     value = species_code.strip()
     vmi_species = VmiSpecies(value)
-    return _species_map.get(vmi_species)
+    return _species_table.get(vmi_species)
 
 
 def convert_owner(owner_code: str) -> OwnerCategory:
     vmi_owner = VmiOwnerCategory(owner_code)
-    return _owner_map.get(vmi_owner)
\ No newline at end of file
+    return _owner_table.get(vmi_owner)
+
+
+def _optional_codes(table: EnumTable, codes: Sequence[str]) -> np.ndarray:
+    """Internal values of a column of VMI codes, MISSING for empty VMI values"""
+    codes = np.asarray(codes, dtype=str)
+    empty = np.isin(codes, _empty_vmi_strs)
+    result = np.full(len(codes), MISSING, dtype=np.int64)
+    result[~empty] = table.convert(table.source_codes(codes[~empty]))
+    return result
+
+
+def convert_drainage_category_codes(codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_drainage_category into DrainageCategory values, MISSING for None"""
+    return _optional_codes(_drainage_category_table, codes)
+
+
+def convert_site_type_category_codes(codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_site_type_category into SiteType values, MISSING for None"""
+    return _optional_codes(_site_type_table, codes)
+
+
+def convert_soil_peatland_category_codes(codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_soil_peatland_category into SoilPeatlandCategory values, MISSING for None"""
+    return _optional_codes(_soil_peatland_table, codes)
+
+
+def convert_land_use_category_codes(lu_codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_land_use_category into LandUseCategory values"""
+    return _land_use_table.convert(_land_use_table.source_codes(lu_codes))
+
+
+def convert_species_codes(species_codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_species into TreeSpecies values"""
+    return _species_table.convert(_species_table.source_codes(np.char.strip(np.asarray(species_codes, dtype=str))))
+
+
+def convert_owner_codes(owner_codes: Sequence[str]) -> np.ndarray:
+    """Vectorized convert_owner into OwnerCategory values"""
+    return _owner_table.convert(_owner_table.source_codes(owner_codes))
@@ -1,14 +1,29 @@
+import os
 import typing
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 
-from lukefi.metsi.data.enums.internal import OwnerCategory
+from lukefi.metsi.data.enums.internal import OwnerCategory, SoilPeatlandCategory
 from lukefi.metsi.data.model import ForestStand, ReferenceTree, TreeStratum
 from lukefi.metsi.data.conversion import vmi2internal, fc2internal
-from lukefi.metsi.data.formats import smk_util, util, vmi_util
+from lukefi.metsi.data.formats import smk_util, util, vmi_codes, vmi_columns, vmi_filter, vmi_index, vmi_util, \
+    xml_backend
 from abc import ABC, abstractmethod
 from lukefi.metsi.data.formats.vmi_const import VMI12StandIndices, VMI12TreeIndices, VMI12StratumIndices, \
     VMI13StandIndices, VMI13TreeIndices, VMI13StratumIndices
-from lukefi.metsi.data.formats.vmi_supplementing import naslund_height, supplement_age_for_reference_trees
+from lukefi.metsi.data.formats.vmi_supplementing import supplement_age_for_reference_trees, supplement_naslund_heights
+
+def _build_stand_partition(builder_type: type, builder_flags: dict,
+                           partition: typing.List[tuple]) -> typing.List[ForestStand]:
+    """Build a partition of (stand_id, stand_row, strata_rows, tree_rows) groups in a worker process"""
+    builder = builder_type(builder_flags)
+    return [builder.build_stand(stand_row, strata_rows, tree_rows, stand_id)
+            for stand_id, stand_row, strata_rows, tree_rows in partition]
+
+
+# soil and peatland categories where operation types 4, 15 and 100 set cutting method 6 instead of 5
+_forest_soils = (SoilPeatlandCategory.MINERAL_SOIL, SoilPeatlandCategory.SPRUCE_MIRE, SoilPeatlandCategory.PINE_MIRE)
+
 
 class ForestBuilder(ABC):
     """Abstract base class of forest builders"""
@@ -21,11 +36,19 @@ class ForestBuilder(ABC):
 class VMIBuilder(ForestBuilder):
     """Shared functionality of VMI* builders"""
 
+    stand_indices: VMI12StandIndices or VMI13StandIndices = None
+    tree_indices: VMI12TreeIndices or VMI13TreeIndices = None
+    stratum_indices: VMI12StratumIndices or VMI13StratumIndices = None
+
     def __init__(self, builder_flags: dict, data_rows: typing.Iterable):
         """
         Initialize instance variable lists for forest stands, reference trees and tree strata.
         Given source data is pre-parsed for data types 1, 2 and 3.
 
+        With builder flag 'stand_filter', a vmi_filter.StandFilter, the rows of stands rejected by the filter are
+        left out here, before any conversion. Type 2 and 3 rows following the type 1 row of their stand are checked
+        as they are read, and rows preceding it once all rows are read.
+
         :param builder_flags: building process spesific flags
         :param data_rows: Iterable raw data rows from a VMI source file
         """
@@ -33,20 +56,66 @@ class VMIBuilder(ForestBuilder):
         self.reference_trees: typing.List[str] = []
         self.tree_strata: typing.List[str] = []
         self.builder_flags = builder_flags
+        self.stand_filter: typing.Optional[vmi_filter.StandFilter] = builder_flags.get('stand_filter')
 
-        for row in data_rows:
-            try:
-                row_type = self.find_row_type(row)
+        if self.stand_filter is None:
+            for row in data_rows:
+                row_type = self.safe_row_type(row)
                 if row_type == 1:
                     self.forest_stands.append(row)
                 elif row_type == 2:
                     self.tree_strata.append(row)
                 elif row_type == 3:
                     self.reference_trees.append(row)
-            except (IndexError, TypeError) as e:
-                print(e)
-                print('warning: VMI row not addressable: ')
-                print('    ' + str(row))
+        else:
+            self.classify_filtered_rows(data_rows)
+
+    def classify_filtered_rows(self, data_rows: typing.Iterable):
+        """Classify the rows of stands accepted by the 'stand_filter' builder flag in a single pass"""
+        accepted: typing.Set[str] = set()
+        rejected: typing.Set[str] = set()
+        # rows read before the type 1 row of their stand, kept until all stand rows are known
+        unresolved = False
+        for row in data_rows:
+            row_type = self.safe_row_type(row)
+            if row_type == 1:
+                identifier = self.stand_identifier(row)
+                if self.accepts_stand(row):
+                    accepted.add(identifier)
+                    self.forest_stands.append(row)
+                else:
+                    rejected.add(identifier)
+            elif row_type in (2, 3):
+                identifier = self.stand_identifier(row)
+                if identifier not in accepted:
+                    if identifier in rejected:
+                        continue
+                    unresolved = True
+                (self.tree_strata if row_type == 2 else self.reference_trees).append(row)
+        if unresolved:
+            self.tree_strata = [row for row in self.tree_strata if self.stand_identifier(row) in accepted]
+            self.reference_trees = [row for row in self.reference_trees if self.stand_identifier(row) in accepted]
+
+    def safe_row_type(self, row: typing.Sequence) -> typing.Optional[int]:
+        """Return the VMI data type of the row, or None with a warning for rows that are not addressable"""
+        try:
+            return self.find_row_type(row)
+        except (IndexError, TypeError) as e:
+            print(e)
+            print('warning: VMI row not addressable: ')
+            print('    ' + str(row))
+            return None
+
+    def pre_parse_row(self, raw: str) -> typing.Sequence:
+        """Return the addressable form of a raw VMI source row"""
+        return raw
+
+    def stand_identifier(self, row: typing.Sequence) -> str:
+        return vmi_util.generate_stand_identifier(row, self.stand_indices)
+
+    def accepts_stand(self, stand_row: typing.Sequence) -> bool:
+        """Whether the stand of given pre-parsed type 1 row passes the 'stand_filter' builder flag"""
+        return self.stand_filter is None or self.stand_filter.accepts(stand_row, self.stand_indices)
 
     def convert_stand_entry(self, indices: VMI12StandIndices or VMI13StandIndices,
                             data_row: typing.Sequence, stand_id: int or None = None) -> ForestStand:
@@ -61,10 +130,10 @@ class VMIBuilder(ForestBuilder):
         result.land_use_category_detail = data_row[indices.land_category_detail]
         result.site_type_category = vmi2internal.convert_site_type_category(data_row[indices.kasvupaikkatunnus])
         result.soil_peatland_category = vmi2internal.convert_soil_peatland_category(data_row[indices.paatyyppi])
-        result.tax_class_reduction = vmi_util.determine_tax_class_reduction(data_row[indices.tax_class_reduction])
-        result.tax_class = vmi_util.determine_tax_class(data_row[indices.tax_class])
+        result.tax_class_reduction = vmi_codes.TAX_CLASS_REDUCTION.decode(data_row[indices.tax_class_reduction])
+        result.tax_class = vmi_codes.TAX_CLASS.decode(data_row[indices.tax_class])
         result.drainage_category = vmi2internal.convert_drainage_category(data_row[indices.ojitus_tilanne])
-        result.development_class = vmi_util.determine_development_class(data_row[indices.kehitysluokka])
+        result.development_class = vmi_codes.DEVELOPMENT_CLASS.decode(data_row[indices.kehitysluokka])
         result.drainage_feasibility = vmi_util.determine_drainage_feasibility(data_row[indices.ojitus_tarve])
         result.forestry_centre_id = vmi_util.parse_forestry_centre(data_row[indices.forestry_centre])
         result.forest_management_category = vmi_util.determine_forest_management_category(
@@ -107,7 +176,7 @@ class VMIBuilder(ForestBuilder):
         result = TreeStratum()
         result.identifier = vmi_util.generate_stratum_identifier(data_row, indices)
         result.species = vmi2internal.convert_species(data_row[indices.species])
-        result.origin = vmi_util.determine_stratum_origin(data_row[indices.origin])
+        result.origin = vmi_codes.STRATUM_ORIGIN.decode(data_row[indices.origin])
         result.stems_per_ha = util.get_or_default(
             util.parse_float(data_row[indices.stems_per_ha]), 0.0)
         result.sapling_stems_per_ha = util.get_or_default(
@@ -140,6 +209,202 @@ class VMIBuilder(ForestBuilder):
         """Empties the stands' `tree_strata` lists."""
         return [stand.tree_strata.clear() for stand in stands]
 
+    def convert_geo_locations(self, stands: typing.List[ForestStand]) -> typing.List[ForestStand]:
+        """Convert the geo locations of built stands as a batch. No conversion by default."""
+        return stands
+
+    def build_stand(self, stand_row: typing.Sequence, strata_rows: typing.Iterable[typing.Sequence],
+                    tree_rows: typing.Iterable[typing.Sequence], stand_id: int) -> ForestStand:
+        """
+        Build a single ForestStand out of its pre-parsed type 1, 2 and 3 rows. The stand is populated, supplemented
+        and cleaned up exactly as in build().
+        """
+        stand = self.convert_stand_entry(self.stand_indices, stand_row, stand_id)
+        for row in strata_rows:
+            stratum = self.convert_stratum_entry(self.stratum_indices, row)
+            stratum.stand = stand
+            stand.tree_strata.append(stratum)
+
+        if self.builder_flags['reference_trees']:
+            for row in tree_rows:
+                tree = self.convert_tree_entry(self.tree_indices, row)
+                tree.stand = stand
+                stand.reference_trees.append(tree)
+
+            self.supplemenent_missing_values([stand])
+            self.remove_strata([stand])
+        return stand
+
+    def group_rows_by_stand(self, data_rows: typing.Iterable[str], presorted: bool = True) -> typing.Iterator[
+            typing.Tuple[int, typing.Sequence, typing.List[typing.Sequence], typing.List[typing.Sequence]]]:
+        """
+        Group raw VMI rows by their stand identifier. Yields (stand_id, stand_row, strata_rows, tree_rows) tuples,
+        with stand_id being the order number of the stand row in the source.
+
+        With presorted=True, the rows of each stand are expected to be contiguous in the source and only the rows of
+        a single stand are held in memory at a time. ValueError is raised when a stand reappears after its group has
+        been closed. With presorted=False, all raw rows are first grouped in memory, which supports sources in any
+        order while still avoiding the conversion of all stands before the first one is yielded.
+
+        Stray type 2 or 3 rows without a stand row raise KeyError, as in build(). Stands rejected by the
+        'stand_filter' builder flag are skipped and left out of the stand_id numbering, as in build().
+        """
+        def row_groups() -> typing.Iterator[typing.Tuple[str, typing.Sequence, list, list]]:
+            current = None
+            for raw in data_rows:
+                row = self.pre_parse_row(raw)
+                row_type = self.safe_row_type(row)
+                if row_type not in (1, 2, 3):
+                    continue
+                identifier = self.stand_identifier(row)
+                if current is None or current[0] != identifier:
+                    if current is not None:
+                        yield current
+                    current = [identifier, [], [], []]
+                current[row_type].append(row)
+            if current is not None:
+                yield current
+
+        stand_order = 0
+        if presorted:
+            finished = set()
+            for identifier, stand_rows, strata_rows, tree_rows in row_groups():
+                if identifier in finished:
+                    raise ValueError(f"Rows of VMI stand {identifier} are not contiguous. Use presorted=False.")
+                finished.add(identifier)
+                if not stand_rows:
+                    raise KeyError(identifier)
+                stand_rows = [row for row in stand_rows if self.accepts_stand(row)]
+                if not stand_rows:
+                    continue
+                stand_order += len(stand_rows)
+                yield stand_order, stand_rows[-1], strata_rows, tree_rows
+        else:
+            groups: typing.Dict[str, list] = {}
+            rejected = set()
+            for identifier, stand_rows, strata_rows, tree_rows in row_groups():
+                group = groups.setdefault(identifier, [None, None, [], []])
+                for row in stand_rows:
+                    if not self.accepts_stand(row):
+                        rejected.add(identifier)
+                        continue
+                    stand_order += 1
+                    group[0] = group[0] or stand_order
+                    group[1] = row
+                group[2].extend(strata_rows)
+                group[3].extend(tree_rows)
+            for identifier, group in list(groups.items()):
+                if group[1] is None:
+                    if identifier not in rejected:
+                        raise KeyError(identifier)
+                    del groups[identifier]
+            for group in sorted(groups.values(), key=lambda g: g[0]):
+                yield group[0], group[1], group[2], group[3]
+
+    def build_stream(self, data_rows: typing.Iterable[str], presorted: bool = True) -> typing.Iterator[ForestStand]:
+        """
+        Yield populated and supplemented ForestStand instances one at a time out of given raw VMI source rows, such
+        as an open source file. Memory use is bounded by the size of a single stand when the source is sorted by
+        stand. See group_rows_by_stand for the handling of unsorted sources.
+
+        :param data_rows: Iterable raw data rows from a VMI source file
+        :param presorted: the rows of each stand are contiguous in the source
+        """
+        for stand_id, stand_row, strata_rows, tree_rows in self.group_rows_by_stand(data_rows, presorted):
+            yield self.convert_geo_locations([self.build_stand(stand_row, strata_rows, tree_rows, stand_id)])[0]
+
+    def build_indexed(self, source_path: typing.Union[str, os.PathLike],
+                      stand_ids: typing.Optional[typing.Iterable[str]] = None,
+                      predicate: typing.Optional[typing.Callable[[str], bool]] = None,
+                      encoding: str = 'utf-8') -> typing.List[ForestStand]:
+        """
+        Populate a list of ForestStand like build() for selected stands of a VMI source file, reading only the rows
+        of those stands. The rows are located with the byte offset index of vmi_index, which is created and persisted
+        next to the source file on first use and whenever the source has changed since. Stands keep the stand_id
+        numbering of a build() of the whole file. With the 'stand_filter' builder flag, the stand rows of the whole
+        file are read and filtered, numbering the accepted stands as build() does, before the other rows of the
+        selected accepted stands are read.
+
+        :param source_path: path of the VMI source file
+        :param stand_ids: identifiers of the stands to build, as given by vmi_util.generate_stand_identifier
+        :param predicate: build only the stands whose identifier is accepted by the predicate
+        :param encoding: text encoding of the source file
+        """
+        index = vmi_index.load_or_create(self, source_path, encoding)
+        identifiers = index.select(stand_ids, predicate)
+        stand_numbers = {identifier: index.stands[identifier][0] for identifier in identifiers}
+        if self.stand_filter is not None:
+            # rejected stands are left out of the stand_id numbering, as in build()
+            stand_rows = index.read_rows(source_path, index.select(), (1,))
+            accepted = (
+                identifier for identifier in index.select()
+                if stand_rows[identifier][0] and self.accepts_stand(self.pre_parse_row(stand_rows[identifier][0][-1]))
+            )
+            stand_numbers = {identifier: number for number, identifier in enumerate(accepted, 1)}
+            identifiers = [identifier for identifier in identifiers if identifier in stand_numbers]
+        row_types = (1, 2, 3) if self.builder_flags['reference_trees'] else (1, 2)
+        rows = index.read_rows(source_path, identifiers, row_types)
+        stands = []
+        for identifier in identifiers:
+            stand_rows, strata_rows, tree_rows = (
+                [self.pre_parse_row(raw) for raw in raws] for raws in rows[identifier])
+            if not stand_rows:
+                raise KeyError(identifier)
+            stands.append(self.build_stand(stand_rows[-1], strata_rows, tree_rows, stand_numbers[identifier]))
+        return self.convert_geo_locations(stands)
+
+    def partition_rows(self) -> typing.List[tuple]:
+        """
+        Group the constructor classified rows by their stand identifier into
+        (stand_id, stand_row, strata_rows, tree_rows) tuples in stand order, numbered as in build().
+        """
+        groups: typing.Dict[str, tuple] = {}
+        for i, row in enumerate(self.forest_stands):
+            groups[self.stand_identifier(row)] = (i + 1, row, [], [])
+        for row in self.tree_strata:
+            groups[self.stand_identifier(row)][2].append(row)
+        if self.builder_flags['reference_trees']:
+            for row in self.reference_trees:
+                groups[self.stand_identifier(row)][3].append(row)
+        return list(groups.values())
+
+    def build_parallel(self, max_workers: int or None = None,
+                       chunksize: int or None = None) -> typing.List[ForestStand]:
+        """
+        Populate a list of ForestStand like build(), converting and supplementing the stands in a pool of worker
+        processes. Stands are independent of each other, so the result is identical to build(), in the same order and
+        with the same stand_id numbering.
+
+        :param max_workers: number of worker processes, defaults to the number of CPUs
+        :param chunksize: number of stands sent to a worker at a time, defaults to four chunks per worker
+        """
+        partitions = self.partition_rows()
+        if not partitions:
+            return []
+        max_workers = max_workers or os.cpu_count() or 1
+        if chunksize is None:
+            chunksize = max(1, -(-len(partitions) // (max_workers * 4)))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunks = [partitions[i:i + chunksize] for i in range(0, len(partitions), chunksize)]
+            results = executor.map(_build_stand_partition,
+                                   [type(self)] * len(chunks),
+                                   [self.builder_flags] * len(chunks),
+                                   chunks)
+            return self.convert_geo_locations([stand for chunk in results for stand in chunk])
+
+    def build_columnar(self) -> typing.List[ForestStand]:
+        """
+        Populate a list of ForestStand like build(), converting and supplementing the constructor classified rows
+        with the columnar passes of vmi_columns. Model objects are created only for the result.
+        """
+        columns = self.convert_columns(
+            self.forest_stands,
+            self.tree_strata,
+            self.reference_trees if self.builder_flags['reference_trees'] else None)
+        if self.builder_flags['reference_trees']:
+            columns = self.supplement_columns(columns)
+        return self.convert_geo_locations(vmi_columns.materialize(columns))
+
     @abstractmethod
     def find_row_type(self, row: typing.Iterable):
         ...
@@ -152,10 +417,25 @@ class VMIBuilder(ForestBuilder):
     def supplemenent_missing_values(self, stands: list[ForestStand]):
         ...
 
+    @abstractmethod
+    def convert_columns(self, stand_rows: list, strata_rows: list,
+                        tree_rows: typing.Optional[list]) -> vmi_columns.VMIColumns:
+        """Convert classified rows into property arrays with vmi_columns. Trees are left out when tree_rows is None."""
+        ...
+
+    @abstractmethod
+    def supplement_columns(self, columns: vmi_columns.VMIColumns) -> vmi_columns.VMIColumns:
+        """Supplement missing values of property arrays as supplemenent_missing_values does for model objects"""
+        ...
+
 
 class VMI12Builder(VMIBuilder):
     """VMI12 specific builder implementation"""
 
+    stand_indices = VMI12StandIndices
+    tree_indices = VMI12TreeIndices
+    stratum_indices = VMI12StratumIndices
+
     def __init__(self, builder_flags: dict, data_rows: typing.List[str] = []):
         # TODO: data_rows sanity check for VMI12
         super().__init__(builder_flags, data_rows)
@@ -164,8 +444,8 @@ class VMI12Builder(VMIBuilder):
                             stand_id: int or None = None) -> ForestStand:
         """Create a ForestStand out of given VMI12 type 1 data row using given data indices and order number"""
         result = super().convert_stand_entry(indices, data_row, stand_id)
-        result.year = vmi_util.parse_vmi12_date(data_row[indices.date]).year
-        area_ha = vmi_util.determine_vmi12_area_ha(
+        result.year = vmi_util.parse_vmi12_year(data_row[indices.date])
+        area_ha = vmi_codes.VMI12_AREA_HA.decode(
             int(data_row[indices.lohkomuoto]),
             int(data_row[indices.county]))
         result.set_area(area_ha)
@@ -174,14 +454,14 @@ class VMI12Builder(VMIBuilder):
         height = vmi_util.transform_vmi12_height_above_sea_level(data_row[indices.height_above_sea_level])
         result.set_geo_location(lat, lon, height, "EPSG:2393")
         result.drainage_year = vmi_util.determine_drainage_year(data_row[indices.ojitus_aika], result.year)
-        result.soil_surface_preparation_year = vmi_util.determine_soil_surface_preparation_year(
+        result.soil_surface_preparation_year = vmi_codes.SOIL_SURFACE_PREPARATION_YEAR.decode(
                     data_row[indices.maanmuokkaus],
                     result.year)
-        result.regeneration_area_cleaning_year = vmi_util.determine_clearing_of_reform_sector_year(
+        result.regeneration_area_cleaning_year = vmi_codes.REFORM_SECTOR_CLEARING_YEAR.decode(
                     data_row[indices.muu_toimenpide],
                     data_row[indices.muu_toimenpide_aika],
                     result.year)
-        result.artificial_regeneration_year = vmi_util.determine_artificial_regeneration_year(
+        result.artificial_regeneration_year = vmi_codes.ARTIFICIAL_REGENERATION_YEAR.decode(
             data_row[indices.viljely],
             data_row[indices.viljely_aika],
             result.year)
@@ -208,6 +488,30 @@ class VMI12Builder(VMIBuilder):
         """Return VMI12 data type of the row"""
         return int(row[13])
 
+    def convert_geo_locations(self, stands: typing.List[ForestStand]) -> typing.List[ForestStand]:
+        """
+        With builder flag 'reproject_geo_location', convert the EPSG:2393 geo locations of given stands to EPSG:3067
+        in a single coordinate transformation.
+        """
+        if not self.builder_flags.get('reproject_geo_location', False):
+            return stands
+        located = [stand for stand in stands if stand.geo_location and stand.geo_location[3] == 'EPSG:2393']
+        lat, lon = vmi_util.convert_vmi12_geolocations(
+            [stand.geo_location[0] for stand in located],
+            [stand.geo_location[1] for stand in located])
+        for stand, new_lat, new_lon in zip(located, lat.tolist(), lon.tolist()):
+            stand.set_geo_location(new_lat, new_lon, stand.geo_location[2])
+        return stands
+
+    def convert_columns(self, stand_rows: typing.List[str], strata_rows: typing.List[str],
+                        tree_rows: typing.Optional[typing.List[str]]) -> vmi_columns.VMIColumns:
+        """Slice VMI12 rows into field columns in bulk and convert them into property arrays"""
+        return vmi_columns.vmi12_columns(stand_rows, strata_rows, tree_rows)
+
+    def supplement_columns(self, columns: vmi_columns.VMIColumns) -> vmi_columns.VMIColumns:
+        """Supplement missing heights and ages in VMI12 property arrays"""
+        return vmi_columns.supplement_columns(columns, True)
+
     def supplemenent_missing_values(self, stands: typing.List[ForestStand]):
         """Supplement missing heights and ages in VMI12 stands. Note that the order matters: heights must be supplemented before ages."""
         for stand in stands:
@@ -215,9 +519,9 @@ class VMI12Builder(VMIBuilder):
                 tree.stems_per_ha = vmi_util.determine_stems_per_ha(
                     tree.breast_height_diameter,
                     True)
-                if (tree.height or 0) <= 0:
-                    tree.height = naslund_height(tree.breast_height_diameter, tree.species)
+        supplement_naslund_heights(tree for stand in stands for tree in stand.reference_trees)
 
+        for stand in stands:
             for stratum in stand.tree_strata:
                 if stratum.sapling_stratum:
                     sapling = stratum.to_sapling_reference_tree()
@@ -259,27 +563,44 @@ class VMI12Builder(VMIBuilder):
 
             self.supplemenent_missing_values(list(result.values()))
             self.remove_strata(list(result.values()))
-        
-        return list(result.values())
+
+        return self.convert_geo_locations(list(result.values()))
 
 class VMI13Builder(VMIBuilder):
     """VMI13 specific builder implementation"""
 
+    stand_indices = VMI13StandIndices
+    tree_indices = VMI13TreeIndices
+    stratum_indices = VMI13StratumIndices
+
     def __init__(self,  builder_flags: dict, data_rows: typing.List[str] = []):
-        pre_parsed_rows = map(lambda raw: raw.split(), data_rows)
+        pre_parsed_rows = map(self.pre_parse_row, data_rows)
         # TODO: data_rows sanity check for VMI13
         super().__init__(builder_flags, pre_parsed_rows)
 
+    def pre_parse_row(self, raw: str) -> typing.List[str]:
+        """Split a raw VMI13 row into its whitespace separated fields"""
+        return raw.split()
+
     def find_row_type(self, row: typing.Sequence):
         """Return VMI13 data type of the row"""
         return int(row[0])
 
+    def convert_columns(self, stand_rows: typing.List[list], strata_rows: typing.List[list],
+                        tree_rows: typing.Optional[typing.List[list]]) -> vmi_columns.VMIColumns:
+        """Convert pre-split VMI13 rows into property arrays"""
+        return vmi_columns.vmi13_columns(stand_rows, strata_rows, tree_rows)
+
+    def supplement_columns(self, columns: vmi_columns.VMIColumns) -> vmi_columns.VMIColumns:
+        """Supplement missing heights and ages in VMI13 property arrays"""
+        return vmi_columns.supplement_columns(columns, False)
+
     def convert_stand_entry(self, indices: VMI13StandIndices,
                             data_row: typing.Sequence,
                             stand_id: int or None = None) -> ForestStand:
         """Create a ForestStand out of given VMI13 type 1 data row using given data indices and order number"""
         result = super().convert_stand_entry(indices, data_row, stand_id)
-        result.year = vmi_util.parse_vmi13_date(data_row[indices.date]).year
+        result.year = vmi_util.parse_vmi13_year(data_row[indices.date])
         area_ha = vmi_util.determine_vmi13_area_ha(int(data_row[indices.lohkomuoto]))
         result.set_area(area_ha)
         lat = vmi_util.parse_float(data_row[indices.lat])
@@ -288,15 +609,15 @@ class VMI13Builder(VMIBuilder):
         result.set_geo_location(lat, lon, height)
         result.drainage_year = vmi_util.determine_drainage_year(data_row[indices.ojitus_aika], result.year)
         result.fertilization_year = None  # value missing in VMI12 source
-        result.soil_surface_preparation_year = vmi_util.determine_soil_surface_preparation_year(
+        result.soil_surface_preparation_year = vmi_codes.SOIL_SURFACE_PREPARATION_YEAR.decode(
             data_row[indices.maanmuokkaus],
             result.year
         )
-        result.regeneration_area_cleaning_year = vmi_util.determine_clearing_of_reform_sector_year(
+        result.regeneration_area_cleaning_year = vmi_codes.REFORM_SECTOR_CLEARING_YEAR.decode(
             data_row[indices.muu_toimenpide],
             data_row[indices.muu_toimenpide_aika],
             result.year)
-        result.artificial_regeneration_year = vmi_util.determine_artificial_regeneration_year(
+        result.artificial_regeneration_year = vmi_codes.ARTIFICIAL_REGENERATION_YEAR.decode(
             data_row[indices.viljely],
             data_row[indices.viljely_aika],
             result.year)
@@ -325,9 +646,9 @@ class VMI13Builder(VMIBuilder):
                 tree.stems_per_ha = vmi_util.determine_stems_per_ha(
                     tree.breast_height_diameter,
                     False)
-                if (tree.height or 0) <= 0:
-                    tree.height = naslund_height(tree.breast_height_diameter, tree.species)
+        supplement_naslund_heights(tree for stand in stands for tree in stand.reference_trees)
 
+        for stand in stands:
             for stratum in stand.tree_strata:
                 if stratum.sapling_stratum:
                     sapling = stratum.to_sapling_reference_tree()
@@ -375,8 +696,14 @@ class VMI13Builder(VMIBuilder):
 class XMLBuilder(ForestBuilder):
 
     def __init__(self, builder_flags: dict, data: str):
-        self.root: ET.Element = ET.fromstring(data)
+        """
+        :param builder_flags: builder flag 'xml_backend' selects the parser backend 'lxml' or 'etree'. By default lxml
+            is used when it is installed.
+        :param data: the XML document
+        """
         self.builder_flags = builder_flags
+        self.backend = xml_backend.get_backend(builder_flags.get('xml_backend'))
+        self.root: ET.Element = self.backend.fromstring(data)
 
 
     @abstractmethod
@@ -398,69 +725,79 @@ class ForestCentreBuilder(XMLBuilder):
     xpath_strata = './ts:TreeStandData/ts:TreeStandDataDate[@type="{}"]/tst:TreeStrata/tst:TreeStratum'
     xpath_stand = "st:Stands/st:Stand"
 
+    # operation type code to the year attribute it sets and the method of last cutting, if any
+    operation_actions = {
+        oper_type: action
+        for oper_types, action in (
+            ((1,), ('cutting_year', 4)), # RSD records 28 and 31
+            ((2, 13, 20), ('cutting_year', 3)),
+            ((3, 11, 12, 14, 91, 94), ('cutting_year', 1)),
+            ((4, 15, 100), ('cutting_year', lambda stand: 6 if stand.soil_peatland_category in _forest_soils else 5)),
+            ((6, 7, 102, 116, 123, 124), ('cutting_year', 6)),
+            ((8, 101, 103, 104, 105, 106, 107, 108, 109,
+              110, 111, 112, 113, 114, 115, 117, 118,
+              119, 120, 121, 122, 125, 126, 127, 128), ('cutting_year', 5)),
+            ((200, 201, 202, 203, 204, 205, 206, 207, 208,
+              209, 210, 211, 212, 213, 214, 215, 216, 217, 218, 219, 220,
+              221, 222, 223, 224, 225, 226, 227, 228, 300, 301, 302, 303,
+              304, 305, 306, 307, 308, 309, 310, 311, 312, 313, 314, 315,
+              316, 317, 318, 319, 320, 321, 322, 323, 324, 325, 326, 327,
+              328, 601, 602, 603, 604, 605, 606, 607, 608, 609, 610, 611,
+              612, 613, 614, 615, 616, 617, 618, 619, 620, 621, 622, 623,
+              624, 625, 626, 627, 628, 629, 630), ('artificial_regeneration_year', None)), # RSD record 25
+            ((401, 410, 420, 450), ('regeneration_area_cleaning_year', None)), # RSD record 23
+            ((501, 510, 511, 520, 521, 522, 523, 530, 531, 540, 550, 560, 960),
+             ('soil_surface_preparation_year', None)), # RSD record 21
+            ((660, 670, 680, 690, 701, 730, 740, 745, 750, 760, 860, 870, 880, 890),
+             ('young_stand_tending_year', None)), # RSD record 26
+            ((911, 912), ('fertilization_year', None)), # RSD record 20
+            ((930, 940), ('drainage_year', None)), # RSD record 19
+            ((970,), ('pruning_year', None)), # RSD record 27
+        )
+        for oper_type in oper_types
+    }
+
 
     def __init__(self, builder_flags: dict, data: str):
         super().__init__(builder_flags, data)
-        self.xpath_strata = self.xpath_strata.format(builder_flags['strata_origin'])
-
-
-    def set_stand_operations(self, stand: ForestStand, operations: typing.List[typing.Dict[int, typing.Tuple[int, int]]]) -> ForestStand:
-        for oper in operations.values():
-            (oper_type, oper_year) = oper
-            if oper_type in (1,):
-                stand.cutting_year = oper_year # RSD record 28
-                stand.method_of_last_cutting = 4 # RSD record 31
-            elif oper_type in (2, 13, 20):
-                stand.cutting_year = oper_year # RSD record 28
-                stand.method_of_last_cutting = 3 # RSD record 31
-            elif oper_type in (3, 11, 12, 14, 91, 94):
-                stand.cutting_year = oper_year # RSD record 28
-                stand.method_of_last_cutting = 1 # RSD record 31
-            elif oper_type in (4, 15, 100):
-                stand.cutting_year = oper_year # RSD record 28
-                stand.method_of_last_cutting = 6 if stand.soil_and_peatland_category in (1,2,3) else 5
-            elif oper_type in (6, 7, 102, 116, 123, 124):
-                stand.cutting_year = oper_year # RSD record 28
-                stand.method_of_last_cutting = 6 # RSD record 31
-            elif oper_type in (8, 101, 103, 104, 105, 106, 107, 108, 109,
-                110, 111, 112, 113, 114, 115, 117, 118,
-                119, 120, 121, 122, 125, 126, 127, 128):
-                stand.cutting_year = oper_year # RSD record 28
-                stand.method_of_last_cutting = 5 # RSD record 31
-            elif oper_type in (200, 201, 202, 203, 204, 205, 206, 207, 208,
-                209, 210, 211, 212, 213, 214, 215, 216, 217, 218, 219, 220,
-                221, 222, 223, 224, 225, 226, 227, 228, 300, 301, 302, 303,
-                304, 305, 306, 307, 308, 309, 310, 311, 312, 313, 314, 315,
-                316, 317, 318, 319, 320, 321, 322, 323, 324, 325, 326, 327,
-                328, 601, 602, 603, 604, 605, 606, 607, 608, 609, 610, 611,
-                612, 613, 614, 615, 616, 617, 618, 619, 620, 621, 622, 623,
-                624, 625, 626, 627, 628, 629, 630):
-                stand.artificial_regeneration_year = oper_year # RSD record 25
-            elif oper_type in (401, 410, 420, 450):
-                stand.regeneration_area_cleaning_year = oper_year # RSD record 23
-            elif oper_type in (501, 510, 511, 520, 521, 522, 523, 530, 531, 540, 550, 560, 960):
-                stand.soil_surface_preparation_year = oper_year # RSD record 21
-            elif oper_type in (660, 670, 680, 690, 701, 730, 740, 745, 750, 760, 860, 870, 880, 890):
-                stand.young_stand_tending_year = oper_year # RSD record 26
-            elif oper_type in (911, 912):
-                stand.fertilization_year = oper_year # RSD record 20
-            elif oper_type in (930, 940):
-                stand.drainage_year = oper_year # RSD record 19
-            elif oper_type in (970,):
-                stand.pruning_year = oper_year # RSD record 27
-            else:
+        self.compile_paths()
+
+    def compile_paths(self):
+        """Stand, strata and operation paths compiled with the parser backend"""
+        self.xpath_strata = self.xpath_strata.format(self.builder_flags['strata_origin'])
+        self.find_stands = self.backend.xpath(self.xpath_stand)
+        self.find_strata = self.backend.xpath(self.xpath_strata)
+        self.find_operations = self.backend.xpath(smk_util.XPATH_OPERATIONS)
+
+
+    def set_stand_operations(self, stand: ForestStand, operations: typing.Dict[int, typing.Tuple[int, int]]) -> ForestStand:
+        for (oper_type, oper_year) in operations.values():
+            action = self.operation_actions.get(oper_type)
+            if action is None:
                 UserWarning('Unable to spesify operation type {} for stand \'{}\''.format(oper_type, stand.identifier))
+                continue
+            (year_attribute, method_of_last_cutting) = action
+            setattr(stand, year_attribute, oper_year)
+            if callable(method_of_last_cutting):
+                stand.method_of_last_cutting = method_of_last_cutting(stand) # RSD record 31
+            elif method_of_last_cutting is not None:
+                stand.method_of_last_cutting = method_of_last_cutting # RSD record 31
         return stand
 
 
-    def convert_stand_entry(self, estand: ET.Element) -> ForestStand:
-        stand_basic_data = smk_util.parse_stand_basic_data(estand)
+    def convert_stand_entry(self, estand: ET.Element,
+                            coordinates: typing.Optional[typing.Tuple[float, float, str]] = None) -> ForestStand:
+        """
+        Create a ForestStand out of given Stand element. Coordinates as (latitude, longitude, crs) may be given for
+        stands with a precomputed centroid, otherwise they are parsed from the stand geometry.
+        """
+        stand_basic_data = smk_util.read_stand_basic_data(estand)
         stand = ForestStand()
         stand.management_unit_id = None # RSD record 1
         stand.year = smk_util.parse_year(stand_basic_data.StandBasicDataDate) # RSD record 2
         stand.area = util.parse_float(stand_basic_data.Area) # RSD record 3
         stand.area_weight = stand.area # RSD record 4
-        (latitude, longitude, crs) = smk_util.parse_coordinates(estand)
+        (latitude, longitude, crs) = coordinates or smk_util.parse_coordinates(estand)
         stand.geo_location = (latitude, longitude, None, crs) # RSD record 5,6,8
         stand.identifier = stand_basic_data.id # RSD record 7
         stand.degree_days = None # RSD record 9
@@ -474,7 +811,7 @@ class ForestCentreBuilder(XMLBuilder):
         stand.drainage_category = fc2internal.convert_drainage_category(stand_basic_data.DrainageState) # RSD record 16
         stand.drainage_feasibility = True # RSD record 17
         # RSD record 18 is '0' by default
-        operations = smk_util.parse_stand_operations(estand, target_operations='past')
+        operations = smk_util.parse_operations(self.find_operations(estand), target_operations='past')
         stand = self.set_stand_operations(stand, operations) # RSD records 19, 20, 21, 23, 25, 26, 27, 28 and 31
         stand.natural_regeneration_feasibility = False # RSD record 22
         stand.development_class = 0 # RSD record 24
@@ -486,7 +823,7 @@ class ForestCentreBuilder(XMLBuilder):
 
 
     def convert_stratum_entry(self, estratum: ET.Element) -> TreeStratum:
-        stratum_data = smk_util.parse_stratum_data(estratum)
+        stratum_data = smk_util.read_stratum_data(estratum)
         stratum = TreeStratum()
         stratum.identifier = stratum_data.id
         stratum.species = fc2internal.convert_species(stratum_data.TreeSpecies)
@@ -499,18 +836,77 @@ class ForestCentreBuilder(XMLBuilder):
         return stratum
 
 
+    def batch_coordinates(self, estands: typing.List[ET.Element]) -> typing.List[typing.Tuple[float, float, str]]:
+        """Stand centroid coordinates as (latitude, longitude, crs), computed in a single batch"""
+        geometries, crss = zip(*map(smk_util.parse_geometry, estands)) if estands else ((), ())
+        return [
+            (None, None, None) if centroid is None else (float(centroid[1]), float(centroid[0]), crs)
+            for centroid, crs in zip(smk_util.batch_centroids(geometries), crss)
+        ]
+
     def build(self) -> typing.List[ForestStand]:
+        """
+        Populate a list of ForestStand with associated TreeStratum entries. With builder flag 'batch_centroids'
+        the centroids of all stand geometries are computed in a single batch.
+        """
         stands = []
-        estands = self.root.findall(self.xpath_stand, smk_util.NS)
-        for estand in estands:
-            stand = self.convert_stand_entry(estand)
-            strata = []
-            estrata = estand.findall(self.xpath_strata, smk_util.NS)
-            for estratum in estrata:
-                stratum = self.convert_stratum_entry(estratum)
-                stratum.identifier = f"{stand.identifier}.{stratum.tree_number or stratum.identifier}-stratum"
-                strata.append(stratum)
-            stand.tree_strata = strata
-            stands.append(stand)
+        estands = self.find_stands(self.root)
+        if self.builder_flags.get('batch_centroids', False):
+            coordinates = self.batch_coordinates(estands)
+        else:
+            coordinates = [None] * len(estands)
+        for estand, stand_coordinates in zip(estands, coordinates):
+            stands.append(self.build_stand(estand, stand_coordinates))
         return stands
+
+    def build_stand(self, estand: ET.Element,
+                    coordinates: typing.Optional[typing.Tuple[float, float, str]] = None) -> ForestStand:
+        """Create a ForestStand with its TreeStratum entries out of given Stand element"""
+        stand = self.convert_stand_entry(estand, coordinates)
+        strata = []
+        estrata = self.find_strata(estand)
+        for estratum in estrata:
+            stratum = self.convert_stratum_entry(estratum)
+            stratum.identifier = f"{stand.identifier}.{stratum.tree_number or stratum.identifier}-stratum"
+            strata.append(stratum)
+        stand.tree_strata = strata
+        return stand
+
+
+class ForestCentreStreamBuilder(ForestCentreBuilder):
+    """
+    ForestCentreBuilder for large documents. The document is parsed incrementally with the backend iterparse and
+    each Stand element is converted and discarded as soon as it closes, so memory use is bounded by a single stand
+    rather than the whole document. Stand centroids are always computed per stand.
+    """
+
+    stands_tag = '{{{}}}Stands'.format(smk_util.NS['st'])
+    stand_tag = '{{{}}}Stand'.format(smk_util.NS['st'])
+
+    def __init__(self, builder_flags: dict, source: typing.Union[str, os.PathLike, typing.BinaryIO]):
+        """
+        :param builder_flags: as for ForestCentreBuilder
+        :param source: path to a Forest Centre XML file or a binary stream of one
+        """
+        self.source = source
+        self.builder_flags = builder_flags
+        self.backend = xml_backend.get_backend(builder_flags.get('xml_backend'))
+        self.compile_paths()
+
+    def build_stream(self) -> typing.Iterator[ForestStand]:
+        """Yield populated ForestStand instances one at a time, in document order"""
+        path: typing.List[ET.Element] = []
+        for event, element in self.backend.iterparse(self.source, events=('start', 'end')):
+            if event == 'start':
+                path.append(element)
+                continue
+            path.pop()
+            if element.tag == self.stand_tag and len(path) == 2 and path[1].tag == self.stands_tag:
+                stand = self.build_stand(element)
+                element.clear()
+                path[1].remove(element)
+                yield stand
+
+    def build(self) -> typing.List[ForestStand]:
+        return list(self.build_stream())
         
\ No newline at end of file
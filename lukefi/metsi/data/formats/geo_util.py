@@ -0,0 +1,53 @@
+"""Coordinate reference system transformations for forest stand geo locations"""
+import typing
+from functools import lru_cache
+
+import numpy as np
+
+CRS = typing.Union[str, int]
+
+
+@lru_cache(maxsize=None)
+def get_transformer(source_crs: CRS, target_crs: CRS) -> 'pyproj.Transformer':
+    """
+    Return a cached transformer between given coordinate reference systems, in x, y (lon, lat) axis order. pyproj is
+    imported on the first call, keeping it out of the import time of the package.
+    """
+    from pyproj import Transformer
+    return Transformer.from_crs(source_crs, target_crs, always_xy=True)
+
+
+def transform_coordinates(lat: typing.Sequence[float], lon: typing.Sequence[float], source_crs: CRS,
+                          target_crs: CRS) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Transform arrays of coordinates from source CRS to target CRS in a single call.
+
+    :param lat: latitudes (northings) in source CRS
+    :param lon: longitudes (eastings) in source CRS
+    :return: lat, lon arrays in target CRS
+    """
+    x, y = np.asarray(lon, dtype=float), np.asarray(lat, dtype=float)
+    if x.size == 1:
+        # single points take the scalar path of pyproj
+        x, y = float(x[0]), float(y[0])
+    x, y = get_transformer(source_crs, target_crs).transform(x, y)
+    return np.atleast_1d(np.asarray(y, dtype=float)), np.atleast_1d(np.asarray(x, dtype=float))
+
+
+def reproject_geo_locations(geo_locations: typing.Sequence[typing.Optional[tuple]],
+                            target_crs: str) -> typing.List[typing.Optional[tuple]]:
+    """
+    Transform (lat, lon, height, crs) geo locations into target CRS, with one transformation call for each distinct
+    source CRS. Locations already in target CRS and missing locations are returned as is.
+    """
+    result = list(geo_locations)
+    positions_by_crs: typing.Dict[str, typing.List[int]] = {}
+    for i, location in enumerate(result):
+        if location is not None and location[3] != target_crs:
+            positions_by_crs.setdefault(location[3], []).append(i)
+    for crs, positions in positions_by_crs.items():
+        lat, lon = transform_coordinates([result[i][0] for i in positions], [result[i][1] for i in positions],
+                                         crs, target_crs)
+        for i, new_lat, new_lon in zip(positions, lat.tolist(), lon.tolist()):
+            result[i] = (new_lat, new_lon, result[i][2], target_crs)
+    return result
@@ -1,6 +1,15 @@
-from itertools import chain
-from typing import Any, List, Tuple, Callable
+import bz2
+import gzip
+import io
+import lzma
+import os
+from dataclasses import dataclass
+from itertools import chain, islice
+from typing import Any, List, Tuple, Callable, Iterable, Iterator, BinaryIO, TextIO
 
+import numpy as np
+
+from lukefi.metsi.data.conversion.internal2mela import mela_stand, mela_stands
 from lukefi.metsi.data.formats.util import parse_float
 from lukefi.metsi.data.model import ForestStand, ReferenceTree, TreeStratum
 from lukefi.metsi.data.formats.rsd_const import MSBInitialDataRecordConst as msb_meta
@@ -18,22 +27,33 @@ def recreate_tree_indices(trees: List[ReferenceTree]) -> List[ReferenceTree]:
     return trees
 
 
+def is_outputtable(stand: ForestStand) -> bool:
+    return (
+        stand.is_forest_land()
+        and not stand.is_other_excluded_forest()
+        and (not stand.is_auxiliary() or stand.has_trees() or stand.has_strata())
+    )
+
+
+def cleaned_output_stream(stands: Iterable[ForestStand]) -> Iterator[ForestStand]:
+    """Recreate forest stands for output one at a time, as in cleaned_output"""
+    idx = 0
+    for stand in stands:
+        stand.reference_trees = [t for t in stand.reference_trees if t.is_living()]
+        stand.reference_trees = recreate_tree_indices(stand.reference_trees)
+        if is_outputtable(stand):
+            idx += 1
+            stand.set_identifiers(idx)
+            yield stand
+
+
 def cleaned_output(stands: List[ForestStand]) -> List[ForestStand]:
     """Recreate forest stands for output:
         1) filtering out non-living reference trees
         2) recreating indices for reference trees
         3) filtering out non-forestland stands and empty auxiliary stands
         4) recreating indices for stands"""
-    for stand in stands:
-        stand.reference_trees = [t for t in stand.reference_trees if t.is_living()]
-        stand.reference_trees = recreate_tree_indices(stand.reference_trees)
-    stands = [s for s in stands if (
-        s.is_forest_land()
-        and not s.is_other_excluded_forest()
-        and (not s.is_auxiliary() or s.has_trees() or s.has_strata())
-    )]
-    stands = recreate_stand_indices(stands)
-    return stands
+    return list(cleaned_output_stream(stands))
 
 
 def rsd_float(source: str or int or float or None) -> str:
@@ -43,9 +63,34 @@ def rsd_float(source: str or int or float or None) -> str:
         return f'{0:.6f}'
 
 
-def msb_metadata(stand: ForestStand) -> Tuple[List[str], List[str], List[str]]:
+def rsd_number(source: str or int or float or None) -> float:
+    """Numeric RSD value, with 0 for values not convertible to float as in rsd_float"""
+    try:
+        return float(source)
+    except:
+        return 0.0
+
+
+def rsd_array(records: List[list], columns: int) -> np.ndarray:
+    """Pack RSD records into a 2-D float array, with None and values not convertible to float as 0"""
+    rows = [[0.0 if value is None else value for value in record] for record in records]
+    try:
+        return np.array(rows, dtype=float).reshape(-1, columns)
+    except (TypeError, ValueError):
+        return np.array([[rsd_number(value) for value in record] for record in records], dtype=float).reshape(-1, columns)
+
+
+def rsd_format_rows(array: np.ndarray, row_format: str) -> List[str]:
     """
-    Generate a triple with:
+    Format the rows of an RSD record array in bulk, in the manner of np.savetxt. Formatting with %.6f is equal to
+    rsd_float, as both round the exact binary value to six decimals.
+    """
+    return [row_format % tuple(row) for row in array.tolist()]
+
+
+def msb_metadata_values(stand: ForestStand) -> Tuple[list, list, list]:
+    """
+    Generate a triple with the numeric values of:
         MSB physical record metadata
         Initial data record stand metadata
         Initial data record tree set metadata
@@ -63,39 +108,81 @@ def msb_metadata(stand: ForestStand) -> Tuple[List[str], List[str], List[str]]:
         len(stand.reference_trees) * msb_meta.tree_record_length
     ])
     physical_record_metadata = [
-        rsd_float(outputtable_id),  # UID
-        str(sum([
+        outputtable_id,  # UID
+        sum([
             logical_record_length,
             msb_meta.logical_record_header_length
-        ]))  # physical record length
+        ])  # physical record length
     ]
     logical_record_metadata = [
-        rsd_float(msb_meta.logical_record_type),  # logical record type
-        rsd_float(logical_record_length),
-        rsd_float(msb_meta.stand_record_length)
+        msb_meta.logical_record_type,  # logical record type
+        logical_record_length,
+        msb_meta.stand_record_length
     ]
     logical_subrecord_metadata = [
-        rsd_float(len(stand.reference_trees)),
-        rsd_float(msb_meta.tree_record_length)
+        len(stand.reference_trees),
+        msb_meta.tree_record_length
     ]
     return physical_record_metadata, logical_record_metadata, logical_subrecord_metadata
 
 
-def rsd_forest_stand_rows(stand: ForestStand) -> List[str]:
-    """Generate RSD data file rows (with MSB metadata) for a single ForestStand"""
+def msb_metadata(stand: ForestStand) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Generate a triple with:
+        MSB physical record metadata
+        Initial data record stand metadata
+        Initial data record tree set metadata
+    """
+    physical_record_metadata, logical_record_metadata, logical_subrecord_metadata = msb_metadata_values(stand)
+    return (
+        [rsd_float(physical_record_metadata[0]), str(physical_record_metadata[1])],
+        list(map(rsd_float, logical_record_metadata)),
+        list(map(rsd_float, logical_subrecord_metadata))
+    )
+
+
+# the physical record length of a stand row is written as an integer, all other values with six decimals
+RSD_STAND_ROW_COLUMNS = sum([
+    msb_meta.physical_record_header_length,
+    msb_meta.logical_record_header_length,
+    msb_meta.logical_record_metadata_length,
+    msb_meta.stand_record_length,
+    msb_meta.logical_subrecord_metadata_length
+])
+RSD_STAND_ROW_FORMAT = ' '.join(['%.6f', '%d'] + ['%.6f'] * (RSD_STAND_ROW_COLUMNS - 2))
+RSD_TREE_ROW_FORMAT = ' '.join(['%.6f'] * msb_meta.tree_record_length)
+
+
+def mela_rsd_content(melaed_stands: List[ForestStand]) -> List[str]:
+    """
+    Generate RSD data file rows (with MSB metadata) for ForestStands already converted to the Mela value space.
+    Stand and tree records are packed into float arrays and formatted in bulk.
+    """
+    stand_records = []
+    tree_records = []
+    for melaed in melaed_stands:
+        metadata = msb_metadata_values(melaed)
+        stand_records.append(list(chain(metadata[0], metadata[1], melaed.as_mela_rsd_row(), metadata[2])))
+        tree_records.extend(tree.as_mela_rsd_row() for tree in melaed.reference_trees)
+    stand_rows = rsd_format_rows(rsd_array(stand_records, RSD_STAND_ROW_COLUMNS), RSD_STAND_ROW_FORMAT)
+    tree_rows = iter(rsd_format_rows(rsd_array(tree_records, msb_meta.tree_record_length), RSD_TREE_ROW_FORMAT))
     result = []
-    msb_preliminary_records = msb_metadata(stand)
-    result.append(" ".join(chain(
-        msb_preliminary_records[0],
-        msb_preliminary_records[1],
-        map(rsd_float, stand.as_rsd_row()),
-        msb_preliminary_records[2]
-    )))
-    for tree in stand.reference_trees:
-        result.append(" ".join(map(rsd_float, tree.as_rsd_row())))
+    for melaed, stand_row in zip(melaed_stands, stand_rows):
+        result.append(stand_row)
+        result.extend(next(tree_rows) for _ in melaed.reference_trees)
     return result
 
 
+def mela_rsd_rows(melaed: ForestStand) -> List[str]:
+    """Generate RSD data file rows (with MSB metadata) for a ForestStand already converted to the Mela value space"""
+    return mela_rsd_content([melaed])
+
+
+def rsd_forest_stand_rows(stand: ForestStand) -> List[str]:
+    """Generate RSD data file rows (with MSB metadata) for a single ForestStand"""
+    return mela_rsd_rows(mela_stand(stand, tree_strata=False))
+
+
 def csv_value(source: Any) -> str:
     if source is None:
         return "None"
@@ -133,14 +220,17 @@ def stands_to_csv_content(stands: list[ForestStand], delimeter: str) -> list[str
 
 
 def csv_content_to_stands(csv_content: list[list[str]]) -> list[ForestStand]:
+    decode_stand = ForestStand.csv_row_decoder()
+    decode_tree = ReferenceTree.csv_row_decoder()
+    decode_stratum = TreeStratum.csv_row_decoder()
     stands = []
     for row in csv_content:
         if row[0] == "stand":
-            stands.append(ForestStand.from_csv_row(row))
+            stands.append(decode_stand(row))
         elif row[0] == "tree":
-            stands[-1].reference_trees.append(ReferenceTree.from_csv_row(row))
+            stands[-1].reference_trees.append(decode_tree(row))
         elif row[0] == "stratum":
-            stands[-1].tree_strata.append(TreeStratum.from_csv_row(row))
+            stands[-1].tree_strata.append(decode_stratum(row))
 
     # once all stands are recreated, add the stand reference to trees and strata
     for stand in stands:
@@ -159,5 +249,82 @@ def outputtable_rows(stands: List[ForestStand], formatter: Callable[[List[Forest
 
 
 def stands_to_rsd_content(stands: List[ForestStand]) -> list[str]:
-    """Generate RSD file contents for the given list of ForestStand"""
-    return outputtable_rows(stands, lambda stand: rsd_forest_stand_rows(stand))
\ No newline at end of file
+    """
+    Generate RSD file contents for the given list of ForestStand. Each stand is converted to the Mela value space
+    once, as a batch, and tree strata are left out of the conversion as RSD has no use for them.
+    """
+    return mela_rsd_content(mela_stands(cleaned_output(stands), tree_strata=False))
+
+
+@dataclass
+class WriteStats:
+    """Counts of a streaming write. Bytes are counted before any compression of the sink."""
+    stands: int = 0
+    records: int = 0
+    bytes: int = 0
+
+
+compressed_openers = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+
+def open_sink(path: str or os.PathLike) -> BinaryIO:
+    """Open a binary file for writing, compressed with gzip, bz2 or lzma by the file suffix .gz, .bz2 or .xz"""
+    opener = compressed_openers.get(os.path.splitext(path)[1].lower(), open)
+    return opener(path, 'wb')
+
+
+def write_chunks(chunks: Iterable[Tuple[int, List[str]]], sink: BinaryIO or TextIO,
+                 encoding: str = 'utf-8') -> WriteStats:
+    """
+    Write chunks of (stand count, lines) to a text or binary file object, one buffered write per chunk.
+    Binary sinks are written with given encoding and text sinks with their own.
+    """
+    stats = WriteStats()
+    text_sink = isinstance(sink, io.TextIOBase)
+    if text_sink:
+        encoding = sink.encoding or encoding
+    for stand_count, lines in chunks:
+        if not lines:
+            continue
+        text = '\n'.join(lines) + '\n'
+        data = text.encode(encoding)
+        sink.write(text if text_sink else data)
+        stats.stands += stand_count
+        stats.records += len(lines)
+        stats.bytes += len(data)
+    return stats
+
+
+def stand_chunks(stands: Iterable[ForestStand], chunk_size: int) -> Iterator[List[ForestStand]]:
+    iterator = iter(stands)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def write_rsd(stands: Iterable[ForestStand], sink: BinaryIO or TextIO, chunk_size: int = 1000,
+              encoding: str = 'utf-8') -> WriteStats:
+    """
+    Stream the RSD file contents of given ForestStands to a text or binary file object, such as one opened with
+    open_sink. The stands are cleaned for output and converted to Mela value space a chunk of stands at a time,
+    so memory use does not grow with the number of stands.
+    """
+    def chunks():
+        for chunk in stand_chunks(cleaned_output_stream(stands), chunk_size):
+            yield len(chunk), mela_rsd_content(mela_stands(chunk, tree_strata=False))
+    return write_chunks(chunks(), sink, encoding)
+
+
+def write_csv(stands: Iterable[ForestStand], sink: BinaryIO or TextIO, delimeter: str = ';',
+              chunk_size: int = 1000, encoding: str = 'utf-8') -> WriteStats:
+    """
+    Stream the csv rows of given ForestStands, their reference trees and tree strata to a text or binary file
+    object, such as one opened with open_sink, a chunk of stands at a time.
+    """
+    def chunks():
+        for chunk in stand_chunks(stands, chunk_size):
+            yield len(chunk), [row for stand in chunk for row in stand_to_csv_rows(stand, delimeter)]
+    return write_chunks(chunks(), sink, encoding)
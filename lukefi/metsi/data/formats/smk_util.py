@@ -1,8 +1,8 @@
-import geopandas
 import datetime
+import numpy as np
 
-from shapely.geometry import Polygon, Point
-from typing import Tuple, List, Dict
+from functools import lru_cache
+from typing import Tuple, List, Dict, Optional, Sequence
 from xml.etree.ElementTree import Element
 from types import SimpleNamespace
 from lukefi.metsi.data.formats import util
@@ -27,46 +27,141 @@ NS = {
     }
 
 
-def generate_stand_identifier(xml_stand: Element) -> str:
-    stand_identifier = xml_stand.attrib.get('id')
-    stand_number = xml_stand.findtext('./st:StandBasicData/st:StandNumber', None, NS)
-    stand_number_extension = xml_stand.findtext('./st:StandBasicData/st:StandNumberExtension', None, NS)
+def clark_tag(prefix: str, tag: str) -> str:
+    """ Tag name in Clark notation {namespace}tag, as ElementTree presents namespaced tags """
+    return f"{{{NS[prefix]}}}{tag}"
+
+
+class SmkRecord:
+    """
+    Base for slotted records of SMK element children. The child texts of an element are read in a single pass by
+    dispatching on precomputed Clark notation tag names, with findtext semantics: the first matching child wins, an
+    empty child reads as '' and a missing child as None.
+    """
+    __slots__ = ()
+    tags: Dict[str, str] = {}
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    @classmethod
+    def read(cls, element: Element) -> 'SmkRecord':
+        record = cls()
+        tags = cls.tags
+        for child in element:
+            name = tags.get(child.tag)
+            if name is not None and getattr(record, name) is None:
+                setattr(record, name, child.text or '')
+        return record
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self) -> str:
+        values = ', '.join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+    def as_namespace(self) -> SimpleNamespace:
+        return SimpleNamespace(**{n: getattr(self, n) for n in self.__slots__})
+
+
+class StandBasicDataRecord(SmkRecord):
+    __slots__ = ('id', 'StandNumber', 'StandNumberExtension', 'CompleteState', 'StandBasicDataDate', 'Area',
+                 'SubGroup', 'FertilityClass', 'DrainageState', 'MainGroup', 'CuttingRestriction')
+    tags = {clark_tag('st', name): name for name in __slots__[1:]}
+
+
+class TreeStratumRecord(SmkRecord):
+    __slots__ = ('id', 'StratumNumber', 'TreeSpecies', 'Storey', 'Age', 'BasalArea', 'StemCount', 'MeanDiameter',
+                 'MeanHeight', 'Volume', 'DataSource')
+    tags = {clark_tag('tst', name): name for name in __slots__[1:-1]}
+    tags[clark_tag('co', 'DataSource')] = 'DataSource'
+
+
+class OperationRecord(SmkRecord):
+    """
+    Operation children in a single pass. CompletionData and ProposalData hold the nested CompletionDate and
+    ProposalYear elements, so their presence is recorded as True and the nested texts are read from them directly.
+    """
+    __slots__ = ('id', 'OperationType', 'CompletionData', 'ProposalData', 'CompletionDate', 'ProposalYear')
+    tags = {clark_tag('op', 'OperationType'): 'OperationType'}
+    nested_tags = {
+        clark_tag('op', 'CompletionData'): ('CompletionData', clark_tag('op', 'CompletionDate'), 'CompletionDate'),
+        clark_tag('op', 'ProposalData'): ('ProposalData', clark_tag('op', 'ProposalYear'), 'ProposalYear'),
+    }
+
+    @classmethod
+    def read(cls, element: Element) -> 'OperationRecord':
+        record = cls()
+        for child in element:
+            name = cls.tags.get(child.tag)
+            if name is not None:
+                if record.OperationType is None:
+                    record.OperationType = child.text or ''
+                continue
+            nested = cls.nested_tags.get(child.tag)
+            if nested is None or getattr(record, nested[0]):
+                continue
+            setattr(record, nested[0], True)
+            for grandchild in child:
+                if grandchild.tag == nested[1]:
+                    setattr(record, nested[2], grandchild.text or '')
+                    break
+        return record
+
+
+STAND_BASIC_DATA_TAG = clark_tag('st', 'StandBasicData')
+
+
+def stand_identifier(stand_id: Optional[str], stand_number: Optional[str],
+                     stand_number_extension: Optional[str]) -> str:
     if stand_number and stand_number_extension:
         return f"{stand_number}.{stand_number_extension}"
     elif stand_number:
         return stand_number
-    elif stand_identifier:
-        return stand_identifier
+    elif stand_id:
+        return stand_id
+
+
+def generate_stand_identifier(xml_stand: Element) -> str:
+    stand_number = xml_stand.findtext('./st:StandBasicData/st:StandNumber', None, NS)
+    stand_number_extension = xml_stand.findtext('./st:StandBasicData/st:StandNumberExtension', None, NS)
+    return stand_identifier(xml_stand.attrib.get('id'), stand_number, stand_number_extension)
+
+
+def read_stand_basic_data(xml_stand: Element) -> StandBasicDataRecord:
+    """ StandBasicData of a Stand element in a single pass, with the stand identifier as id """
+    for child in xml_stand:
+        if child.tag == STAND_BASIC_DATA_TAG:
+            record = StandBasicDataRecord.read(child)
+            break
+    else:
+        record = StandBasicDataRecord()
+    record.id = stand_identifier(xml_stand.attrib.get('id'), record.StandNumber, record.StandNumberExtension)
+    return record
+
+
+def read_stratum_data(estratum: Element) -> TreeStratumRecord:
+    record = TreeStratumRecord.read(estratum)
+    record.id = estratum.attrib['id']
+    return record
+
+
+def read_operation_data(eoperation: Element) -> OperationRecord:
+    record = OperationRecord.read(eoperation)
+    record.id = eoperation.attrib['id']
+    return record
 
 
 def parse_stand_basic_data(xml_stand: Element) -> SimpleNamespace:
-    sns = SimpleNamespace()
-    sns.id = generate_stand_identifier(xml_stand)
-    sns.CompleteState = xml_stand.findtext('./st:StandBasicData/st:CompleteState', None, NS)
-    sns.StandBasicDataDate = xml_stand.findtext('./st:StandBasicData/st:StandBasicDataDate', None, NS)
-    sns.Area = xml_stand.findtext('./st:StandBasicData/st:Area', None, NS)
-    sns.SubGroup = xml_stand.findtext('./st:StandBasicData/st:SubGroup', None, NS)
-    sns.FertilityClass = xml_stand.findtext('./st:StandBasicData/st:FertilityClass', None, NS)
-    sns.DrainageState = xml_stand.findtext('./st:StandBasicData/st:DrainageState', None, NS)
-    sns.MainGroup = xml_stand.findtext('./st:StandBasicData/st:MainGroup', None, NS)
-    sns.CuttingRestriction = xml_stand.findtext('./st:StandBasicData/st:CuttingRestriction', None, NS)
+    sns = read_stand_basic_data(xml_stand).as_namespace()
+    del sns.StandNumber, sns.StandNumberExtension
     return sns
 
 
 def parse_stratum_data(estratum: Element) -> SimpleNamespace:
-    sns = SimpleNamespace()
-    sns.id = estratum.attrib['id']
-    sns.StratumNumber = estratum.findtext('tst:StratumNumber', None, NS)
-    sns.TreeSpecies = estratum.findtext('tst:TreeSpecies', None, NS)
-    sns.Storey = estratum.findtext('tst:Storey', None, NS)
-    sns.Age = estratum.findtext('tst:Age', None, NS)
-    sns.BasalArea = estratum.findtext('tst:BasalArea', None, NS)
-    sns.StemCount = estratum.findtext('tst:StemCount', None, NS)
-    sns.MeanDiameter = estratum.findtext('tst:MeanDiameter', None, NS)
-    sns.MeanHeight = estratum.findtext('tst:MeanHeight', None, NS)
-    sns.Volume = estratum.findtext('tst:Volume', None, NS)
-    sns.DataSource = estratum.findtext('co:DataSource', None, NS)
-    return sns
+    return read_stratum_data(estratum).as_namespace()
 
 
 def parse_date(value: str) -> datetime.date:
@@ -75,33 +170,46 @@ def parse_date(value: str) -> datetime.date:
     return datetime.date(*date)
 
 
+def parse_date_year(value: str) -> int:
+    """ year of a yyyy-mm-dd date, read directly from the string without building a date """
+    return int(value.split('-', 1)[0])
+
+
+def past_operation(record: OperationRecord) -> Tuple[int, int]:
+    return (util.parse_int(record.OperationType), parse_date_year(record.CompletionDate))
+
+
+def future_operation(record: OperationRecord) -> Tuple[int, int]:
+    return (util.parse_int(record.OperationType), util.parse_int(record.ProposalYear))
+
+
 def parse_past_operations(eoperations: List[Element]) -> Dict[int, Tuple[int, int]]:
-    operations = {}
-    for eoper in eoperations:
-        oper_id = util.parse_int(eoper.attrib['id'])
-        oper_type = util.parse_int(eoper.findtext('./op:OperationType', None, NS))
-        date = parse_date(eoper.findtext('./op:CompletionData/op:CompletionDate', None, NS))
-        oper_year = date.year
-        operations[oper_id] = (oper_type, oper_year)
-    return operations
+    records = map(read_operation_data, eoperations)
+    return {util.parse_int(record.id): past_operation(record) for record in records}
 
 
 def parse_future_operations(eoperations: List[Element]) -> Dict[int, Tuple[int, int]]:
-    operations = {}
-    for eoper in eoperations:
-        oper_id = util.parse_int(eoper.attrib['id'])
-        oper_type = util.parse_int(eoper.findtext('./op:OperationType', None, NS))
-        oper_year = util.parse_int(eoper.findtext('./op:ProposalData/op:ProposalYear', None, NS))
-        operations[oper_id] = (oper_type, oper_year)
-    return operations
+    records = map(read_operation_data, eoperations)
+    return {util.parse_int(record.id): future_operation(record) for record in records}
 
 
-def parse_stand_operations(estand: Element, target_operations=None) -> List[Dict[int, Tuple[int, int]]]:
-    eoperations = estand.findall('./op:Operations/op:Operation', NS)
-    past_eoperatios = list(filter(lambda eoper: False if eoper.find('./op:CompletionData', NS) is None else True, eoperations))
-    future_eoperations = list(filter(lambda eoper: False if eoper.find('./op:ProposalData', NS) is None else True, eoperations))
-    past_operations = parse_past_operations(past_eoperatios)
-    future_operations = parse_future_operations(future_eoperations)
+XPATH_OPERATIONS = './op:Operations/op:Operation'
+
+
+def parse_operations(eoperations: List[Element], target_operations=None) -> Dict[int, Tuple[int, int]]:
+    """
+    Operations as {id: (type, year)} in a single pass, each Operation element read once. Completed operations are
+    past and proposed operations future, and target_operations 'past' or 'future' restricts the result to either.
+    Otherwise future operations take precedence for operations with both completion and proposal data.
+    """
+    past_operations = {}
+    future_operations = {}
+    for eoper in eoperations:
+        record = read_operation_data(eoper)
+        if record.CompletionData and target_operations != 'future':
+            past_operations[util.parse_int(record.id)] = past_operation(record)
+        if record.ProposalData and target_operations != 'past':
+            future_operations[util.parse_int(record.id)] = future_operation(record)
     if target_operations == 'past':
         return past_operations
     elif target_operations == 'future':
@@ -113,6 +221,10 @@ def parse_stand_operations(estand: Element, target_operations=None) -> List[Dict
         return all_operations
 
 
+def parse_stand_operations(estand: Element, target_operations=None) -> List[Dict[int, Tuple[int, int]]]:
+    return parse_operations(estand.findall(XPATH_OPERATIONS, NS), target_operations)
+
+
 def parse_year(source: str) -> int or None:
     return(None if len(source) < 4 else util.parse_int(source[:4]))
 
@@ -171,42 +283,112 @@ def point_series(value: str) -> List[Tuple[float, float]]:
     return series
 
 
+def coordinate_array(value: str) -> np.ndarray:
+    """ Converts a gml string presentation to an array of (x, y) points"""
+    return np.array([float(token) for token in value.replace(',', ' ').split()], dtype=float).reshape(-1, 2)
+
+
+@lru_cache(maxsize=None)
+def parse_crs(srs_name: str) -> str:
+    """ Validated CRS of a gml srsName attribute. Cached, as documents use a single CRS for all geometries."""
+    # the geospatial stack is imported on first use to keep it out of the import time of the package
+    from pyproj import CRS
+    return CRS.from_user_input(srs_name).srs
+
+
+def polygon_centroid(coordinates: np.ndarray) -> Tuple[float, float]:
+    """
+    Centroid of a polygon exterior ring with the shoelace formula. Triangles are summed from the first vertex in the
+    order GEOS sums them, so the result is equal to the centroid of the matching shapely Polygon.
+    """
+    x, y = coordinates[:, 0], coordinates[:, 1]
+    x0, y0 = x[0], y[0]
+    x1, y1, x2, y2 = x[:-1], y[:-1], x[1:], y[1:]
+    area2 = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+    # GEOS sums clockwise rings as positive area
+    sign = 1.0 if np.add.accumulate(area2)[-1] < 0 else -1.0
+    area_sum = np.add.accumulate(sign * area2)[-1]
+    if area_sum == 0.0:
+        from shapely.geometry import Polygon
+        centroid = Polygon(coordinates).centroid
+        return centroid.x, centroid.y
+    cx = np.add.accumulate(sign * area2 * (x0 + x1 + x2))[-1]
+    cy = np.add.accumulate(sign * area2 * (y0 + y1 + y2))[-1]
+    return float(cx / 3 / area_sum), float(cy / 3 / area_sum)
+
+
+def geometry_centroid(geometry_type: str, coordinates: np.ndarray) -> Tuple[float, float]:
+    if geometry_type == 'point':
+        return float(coordinates[0, 0]), float(coordinates[0, 1])
+    return polygon_centroid(coordinates)
+
+
 def parse_centroid(sns: SimpleNamespace) -> Tuple[float, float, str]:
     """
-    GeoSeries instance of Geopandas library is used as container for stand gml data.
-    The centroid of geoseries contain the latitude and longitude of the stand geometry.
+    The centroid of stand gml point or polygon data, computed directly from the coordinates.
 
     Also the parsed crs is returned altough SMK XML is standardised to use ESPG:3067 as default.
     """
-    crs = sns.egeometry.attrib['srsName']
+    crs = parse_crs(sns.egeometry.attrib['srsName'])
     raw_coords = sns.egeometry.findtext(sns.coord_xpath, None, NS)
-    Geometry = None
-    if sns.geometry_type == 'point':
-        Geometry = Point
-    else:
-        Geometry = Polygon
-    geometry = Geometry(point_series(raw_coords))
-    gs = geopandas.GeoSeries(data=geometry, crs=crs)
-    return (gs.centroid.x[0], gs.centroid.y[0], gs.crs.srs)
+    (x, y) = geometry_centroid(sns.geometry_type, coordinate_array(raw_coords))
+    return (x, y, crs)
 
 
-def parse_coordinates(estand: Element) -> Tuple[float, float, str]:
+def batch_centroids(geometries: Sequence[Optional[Tuple[str, np.ndarray]]]) -> List[Optional[Tuple[float, float]]]:
     """
-    Extracting stand latitude and longitude coordinates from gml point or polygon smk xml element.
-    Also the coordiante reference system (crs) is extracted and returned.
+    Centroids of (geometry_type, coordinates) pairs as given by parse_geometry, computed with a single GeoSeries
+    centroid call. Missing geometries have a None centroid.
     """
+    import geopandas
+    from shapely.geometry import Point, Polygon
+    present = [i for i, geometry in enumerate(geometries) if geometry is not None]
+    shapes = [
+        Point(geometries[i][1][0]) if geometries[i][0] == 'point' else Polygon(geometries[i][1])
+        for i in present
+    ]
+    result = [None] * len(geometries)
+    if shapes:
+        centroids = geopandas.GeoSeries(data=shapes).centroid
+        for i, x, y in zip(present, centroids.x.tolist(), centroids.y.tolist()):
+            result[i] = (x, y)
+    return result
+
+
+def parse_geometry_element(estand: Element) -> SimpleNamespace:
     epoint = estand.find('./st:StandBasicData/gdt:PolygonGeometry/gml:pointProperty/gml:Point', NS)
     epolygon = estand.find('./st:StandBasicData/gdt:PolygonGeometry/gml:polygonProperty/gml:Polygon', NS)
     sns = SimpleNamespace(geometry_type=None, egeometry=None, coord_xpath=None)
-    if epoint:
+    if epoint is not None and len(epoint):
         sns.geometry_type = 'point'
         sns.egeometry = epoint
         sns.coord_xpath = './gml:coordinates'
-    elif epolygon:
+    elif epolygon is not None and len(epolygon):
         sns.geometry_type = 'polygon'
         sns.egeometry = epolygon
         sns.coord_xpath = './gml:exterior/gml:LinearRing/gml:coordinates'
-    else:
+    return sns
+
+
+def parse_geometry(estand: Element) -> Tuple[Optional[Tuple[str, np.ndarray]], Optional[str]]:
+    """
+    Extracting the stand geometry as a (geometry_type, coordinates) pair and its crs, for computing centroids
+    in a batch with batch_centroids. The geometry and crs are None for stands without a geometry.
+    """
+    sns = parse_geometry_element(estand)
+    if sns.egeometry is None:
+        return (None, None)
+    coordinates = coordinate_array(sns.egeometry.findtext(sns.coord_xpath, None, NS))
+    return ((sns.geometry_type, coordinates), parse_crs(sns.egeometry.attrib['srsName']))
+
+
+def parse_coordinates(estand: Element) -> Tuple[float, float, str]:
+    """
+    Extracting stand latitude and longitude coordinates from gml point or polygon smk xml element.
+    Also the coordiante reference system (crs) is extracted and returned.
+    """
+    sns = parse_geometry_element(estand)
+    if sns.egeometry is None:
         return (None, None, None)
     (longitude, latitude, crs) = parse_centroid(sns)
     return (float(latitude), float(longitude), crs)
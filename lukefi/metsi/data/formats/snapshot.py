@@ -0,0 +1,233 @@
+"""
+Binary columnar snapshots of forest stands with their reference trees and tree strata.
+
+A snapshot holds three tables, stands, reference_trees and tree_strata, as NumPy arrays in a single .npz archive.
+Trees and strata are linked to their stands by the stand_index column. Columns are encoded by the values they hold:
+enumerations as small integer codes, fixed length tuples split into a column per position and lists as flat
+values with offsets. Missing values are recorded in a mask. Integers of a column that also holds floats are read
+back as floats.
+"""
+import dataclasses
+import importlib
+import json
+import numbers
+import typing
+from enum import Enum
+
+import numpy as np
+
+from lukefi.metsi.data.model import ForestStand, ReferenceTree, TreeStratum
+
+SNAPSHOT_VERSION = 1
+
+Arrays = typing.Dict[str, np.ndarray]
+
+# table name, model class and the stand member list of the table
+TABLES = (
+    ('stands', ForestStand, None),
+    ('reference_trees', ReferenceTree, 'reference_trees'),
+    ('tree_strata', TreeStratum, 'tree_strata'),
+)
+
+_relations = ('stand', 'reference_trees', 'tree_strata')
+
+
+def model_fields(cls: type) -> typing.List[str]:
+    """Names of the persisted dataclass fields of a model class, relations to other model objects excluded"""
+    return [field.name for field in dataclasses.fields(cls) if field.name not in _relations]
+
+
+def enum_path(enum_type: type) -> str:
+    return f"{enum_type.__module__}:{enum_type.__qualname__}"
+
+
+def resolve_enum(path: str) -> type:
+    module, qualname = path.split(':')
+    result = importlib.import_module(module)
+    for name in qualname.split('.'):
+        result = getattr(result, name)
+    return result
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, numbers.Integral) and not isinstance(value, (bool, np.bool_))
+
+
+def column_kind(values: typing.Sequence) -> str:
+    """Encoding kind of a column by the values it holds, None values aside"""
+    present = [value for value in values if value is not None]
+    if not present:
+        return 'none'
+    if all(isinstance(value, Enum) for value in present):
+        return 'enum'
+    if all(isinstance(value, (bool, np.bool_)) for value in present):
+        return 'bool'
+    if all(_is_int(value) for value in present):
+        return 'int'
+    if all(isinstance(value, numbers.Real) and not isinstance(value, Enum) for value in present):
+        return 'float'
+    if all(isinstance(value, str) for value in present):
+        return 'str'
+    if all(isinstance(value, tuple) for value in present) and len({len(value) for value in present}) == 1 \
+            and len(present[0]) > 0:
+        return 'tuple'
+    if all(isinstance(value, (tuple, list)) for value in present):
+        return 'sequence'
+    raise TypeError(f"Unable to encode a column of {', '.join(sorted({type(v).__name__ for v in present}))}")
+
+
+def encode_column(key: str, values: typing.Sequence, arrays: Arrays) -> dict:
+    """
+    Encode a column of values into arrays under keys prefixed with key. Returns the metadata needed to decode it.
+    """
+    kind = column_kind(values)
+    meta = {'kind': kind}
+    mask = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    if kind != 'none' and mask.any():
+        arrays[f'{key}.mask'] = mask
+    if kind == 'enum':
+        members = list(dict.fromkeys(value for value in values if value is not None))
+        codes = {member: code for code, member in enumerate(members)}
+        dtype = np.int16 if len(members) < 2 ** 15 else np.int32
+        arrays[f'{key}.values'] = np.array([-1 if value is None else codes[value] for value in values], dtype=dtype)
+        meta['members'] = [[enum_path(type(member)), member.name] for member in members]
+    elif kind == 'bool':
+        arrays[f'{key}.values'] = np.array([-1 if value is None else value for value in values], dtype=np.int8)
+    elif kind in ('int', 'float'):
+        dtype = np.int64 if kind == 'int' else np.float64
+        arrays[f'{key}.values'] = np.array([0 if value is None else value for value in values], dtype=dtype)
+    elif kind == 'str':
+        arrays[f'{key}.values'] = np.array(['' if value is None else value for value in values], dtype=str)
+    elif kind == 'tuple':
+        length = len(next(value for value in values if value is not None))
+        meta['length'] = length
+        meta['items'] = [
+            encode_column(f'{key}.{i}', [None if value is None else value[i] for value in values], arrays)
+            for i in range(length)
+        ]
+    elif kind == 'sequence':
+        meta['container'] = 'tuple' if all(isinstance(v, tuple) for v in values if v is not None) else 'list'
+        lengths = [0 if value is None else len(value) for value in values]
+        arrays[f'{key}.offsets'] = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+        meta['items'] = encode_column(f'{key}.items', [item for value in values if value for item in value], arrays)
+    return meta
+
+
+def decode_column(key: str, meta: dict, arrays: typing.Mapping[str, np.ndarray], rows: int) -> list:
+    """Decode a column encoded by encode_column into a list of values"""
+    kind = meta['kind']
+    if kind == 'none':
+        return [None] * rows
+    if kind == 'enum':
+        members = [resolve_enum(path)[name] for path, name in meta['members']]
+        result = [members[code] for code in arrays[f'{key}.values'].tolist()]
+    elif kind == 'bool':
+        result = [value == 1 for value in arrays[f'{key}.values'].tolist()]
+    elif kind in ('int', 'float', 'str'):
+        result = arrays[f'{key}.values'].tolist()
+    elif kind == 'tuple':
+        result = list(zip(*(decode_column(f'{key}.{i}', item, arrays, rows) for i, item in enumerate(meta['items']))))
+    else:
+        offsets = arrays[f'{key}.offsets'].tolist()
+        items = decode_column(f'{key}.items', meta['items'], arrays, offsets[-1])
+        container = tuple if meta['container'] == 'tuple' else list
+        result = [container(items[start:stop]) for start, stop in zip(offsets[:-1], offsets[1:])]
+    mask = arrays.get(f'{key}.mask')
+    if mask is not None:
+        result = [None if missing else value for value, missing in zip(result, mask.tolist())]
+    return result
+
+
+def value_decoder(key: str, meta: dict, arrays: typing.Mapping[str, np.ndarray]) -> typing.Callable[[int], typing.Any]:
+    """Decoder of single values of a column encoded by encode_column, by row index"""
+    kind = meta['kind']
+    mask = arrays.get(f'{key}.mask')
+    if kind == 'none':
+        return lambda index: None
+    if kind == 'enum':
+        members = [resolve_enum(path)[name] for path, name in meta['members']]
+        values = arrays[f'{key}.values']
+        decode = lambda index: members[values[index]]
+    elif kind == 'bool':
+        values = arrays[f'{key}.values']
+        decode = lambda index: bool(values[index] == 1)
+    elif kind in ('int', 'float', 'str'):
+        values = arrays[f'{key}.values']
+        decode = lambda index: values[index].item()
+    elif kind == 'tuple':
+        items = [value_decoder(f'{key}.{i}', item, arrays) for i, item in enumerate(meta['items'])]
+        decode = lambda index: tuple(item(index) for item in items)
+    else:
+        offsets = arrays[f'{key}.offsets']
+        item = value_decoder(f'{key}.items', meta['items'], arrays)
+        container = tuple if meta['container'] == 'tuple' else list
+        decode = lambda index: container(item(i) for i in range(offsets[index], offsets[index + 1]))
+    if mask is None:
+        return decode
+    return lambda index: None if mask[index] else decode(index)
+
+
+def encode_tables(stands: typing.Sequence[ForestStand]) -> typing.Tuple[Arrays, dict]:
+    """Encode stands with their reference trees and tree strata into arrays and their metadata"""
+    arrays = {}
+    meta = {'version': SNAPSHOT_VERSION, 'tables': {}}
+    for table, cls, member in TABLES:
+        if member is None:
+            objects = stands
+        else:
+            objects = [obj for stand in stands for obj in getattr(stand, member)]
+            arrays[f'{table}.stand_index'] = np.repeat(np.arange(len(stands), dtype=np.int64),
+                                                       [len(getattr(stand, member)) for stand in stands])
+        columns = {
+            name: encode_column(f'{table}.{name}', [obj.__dict__.get(name) for obj in objects], arrays)
+            for name in model_fields(cls)
+        }
+        meta['tables'][table] = {'rows': len(objects), 'columns': columns}
+    return arrays, meta
+
+
+def _instances(cls: type, names: typing.List[str], columns: typing.List[list]) -> list:
+    result = []
+    for values in zip(*columns):
+        instance = cls()
+        instance.__dict__.update(zip(names, values))
+        result.append(instance)
+    return result
+
+
+def decode_tables(arrays: typing.Mapping[str, np.ndarray], meta: dict) -> typing.List[ForestStand]:
+    """Rebuild stands with their reference trees and tree strata, and the stand references of the latter"""
+    if meta['version'] != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {meta['version']}")
+    stands = []
+    for table, cls, member in TABLES:
+        table_meta = meta['tables'][table]
+        names = list(table_meta['columns'])
+        columns = [
+            decode_column(f'{table}.{name}', table_meta['columns'][name], arrays, table_meta['rows'])
+            for name in names
+        ]
+        instances = _instances(cls, names, columns)
+        if member is None:
+            stands = instances
+            continue
+        for instance, stand_index in zip(instances, arrays[f'{table}.stand_index'].tolist()):
+            stand = stands[stand_index]
+            instance.stand = stand
+            getattr(stand, member).append(instance)
+    return stands
+
+
+def write_snapshot(stands: typing.Sequence[ForestStand], file: typing.Union[str, typing.BinaryIO],
+                   compressed: bool = False):
+    """Write stands with their reference trees and tree strata as a columnar snapshot into a .npz file"""
+    arrays, meta = encode_tables(stands)
+    arrays['meta'] = np.array(json.dumps(meta))
+    (np.savez_compressed if compressed else np.savez)(file, **arrays)
+
+
+def read_snapshot(file: typing.Union[str, typing.BinaryIO]) -> typing.List[ForestStand]:
+    """Read stands with their reference trees and tree strata from a columnar snapshot written by write_snapshot"""
+    with np.load(file, allow_pickle=False) as archive:
+        arrays = {key: archive[key] for key in archive.files}
+    return decode_tables(arrays, json.loads(arrays.pop('meta').item()))
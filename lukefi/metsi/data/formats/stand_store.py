@@ -0,0 +1,168 @@
+"""
+Read-only memory-mapped columnar store of forest stands with their reference trees and tree strata.
+
+The store is a directory of .npy arrays in the column encoding of snapshot, with offset arrays mapping each stand
+to the ranges of its reference trees and tree strata. Readers open the arrays with numpy memory mapping, so any
+number of processes share the pages of a single store through the operating system cache. Stands, trees and strata
+are read through lightweight views with the attribute names of the model classes, and model objects are only created
+for the stands a reader materializes.
+"""
+import json
+import os
+import typing
+
+import numpy as np
+
+from lukefi.metsi.data.formats import snapshot
+from lukefi.metsi.data.model import ForestStand, ReferenceTree, TreeStratum
+
+META_FILE = 'meta.json'
+
+
+def write_store(stands: typing.Sequence[ForestStand], directory: typing.Union[str, os.PathLike]):
+    """
+    Write stands with their reference trees and tree strata as a columnar store into given directory. A store
+    already in the directory is replaced.
+    """
+    arrays, meta = snapshot.encode_tables(stands)
+    for table, _, member in snapshot.TABLES:
+        if member is not None:
+            counts = [len(getattr(stand, member)) for stand in stands]
+            arrays[f'{table}.offsets'] = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+    # the arrays of the store are listed in its metadata, leaving out any files of an earlier store in the directory
+    meta['arrays'] = sorted(arrays)
+    os.makedirs(directory, exist_ok=True)
+    for key, array in arrays.items():
+        np.save(os.path.join(directory, f'{key}.npy'), array, allow_pickle=False)
+    with open(os.path.join(directory, META_FILE), 'w', encoding='utf-8') as meta_file:
+        json.dump(meta, meta_file)
+
+
+class ModelView:
+    """Read-only view of a row of a store table, with the column values as attributes"""
+    __slots__ = ('_store', '_index')
+    table: str = None
+
+    def __init__(self, store: 'StandStore', index: int):
+        object.__setattr__(self, '_store', store)
+        object.__setattr__(self, '_index', index)
+
+    def __getattr__(self, name: str):
+        decoder = None if name.startswith('_') else self._store.decoders[self.table].get(name)
+        if decoder is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return decoder(self._index)
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError(f"'{type(self).__name__}' is read-only, materialize the stand to modify it")
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self._store is other._store and self._index == other._index
+
+    def __hash__(self) -> int:
+        return hash((type(self), id(self._store), self._index))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._index})"
+
+    def values(self) -> dict:
+        """The column values of the row by attribute name"""
+        return {name: decoder(self._index) for name, decoder in self._store.decoders[self.table].items()}
+
+
+class StandView(ModelView):
+    __slots__ = ()
+    table = 'stands'
+
+    @property
+    def reference_trees(self) -> typing.List['TreeView']:
+        start, stop = self._store.member_range('reference_trees', self._index)
+        return [TreeView(self._store, i) for i in range(start, stop)]
+
+    @property
+    def tree_strata(self) -> typing.List['StratumView']:
+        start, stop = self._store.member_range('tree_strata', self._index)
+        return [StratumView(self._store, i) for i in range(start, stop)]
+
+    def materialize(self) -> ForestStand:
+        """A ForestStand with its ReferenceTree and TreeStratum instances, independent of the store"""
+        return self._store.materialize([self._index])[0]
+
+
+class TreeView(ModelView):
+    __slots__ = ()
+    table = 'reference_trees'
+
+    @property
+    def stand(self) -> StandView:
+        return StandView(self._store, int(self._store.arrays['reference_trees.stand_index'][self._index]))
+
+
+class StratumView(ModelView):
+    __slots__ = ()
+    table = 'tree_strata'
+
+    @property
+    def stand(self) -> StandView:
+        return StandView(self._store, int(self._store.arrays['tree_strata.stand_index'][self._index]))
+
+
+class StandStore(typing.Sequence[StandView]):
+    """A store written by write_store, opened read-only with memory mapped arrays"""
+
+    def __init__(self, directory: typing.Union[str, os.PathLike]):
+        with open(os.path.join(directory, META_FILE), 'r', encoding='utf-8') as meta_file:
+            self.meta = json.load(meta_file)
+        if self.meta['version'] != snapshot.SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported store version {self.meta['version']}")
+        self.arrays = {
+            key: np.load(os.path.join(directory, f'{key}.npy'), mmap_mode='r', allow_pickle=False)
+            for key in self.meta['arrays']
+        }
+        self.decoders = {
+            table: {
+                name: snapshot.value_decoder(f'{table}.{name}', column, self.arrays)
+                for name, column in table_meta['columns'].items()
+            }
+            for table, table_meta in self.meta['tables'].items()
+        }
+
+    def __len__(self) -> int:
+        return self.meta['tables']['stands']['rows']
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [StandView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('stand index out of range')
+        return StandView(self, index)
+
+    def member_range(self, table: str, stand_index: int) -> typing.Tuple[int, int]:
+        offsets = self.arrays[f'{table}.offsets']
+        return int(offsets[stand_index]), int(offsets[stand_index + 1])
+
+    def _instance(self, cls: type, table: str, index: int):
+        instance = cls()
+        instance.__dict__.update((name, decoder(index)) for name, decoder in self.decoders[table].items())
+        return instance
+
+    def materialize(self, indices: typing.Optional[typing.Iterable[int]] = None) -> typing.List[ForestStand]:
+        """
+        ForestStand instances with their ReferenceTree and TreeStratum instances for the stands of given indices,
+        or all stands of the store.
+        """
+        if indices is None:
+            return snapshot.decode_tables(self.arrays, self.meta)
+        stands = []
+        for index in indices:
+            stand = self._instance(ForestStand, 'stands', index)
+            for cls, table in ((ReferenceTree, 'reference_trees'), (TreeStratum, 'tree_strata')):
+                members = getattr(stand, table)
+                for i in range(*self.member_range(table, index)):
+                    member = self._instance(cls, table, i)
+                    member.stand = stand
+                    members.append(member)
+            stands.append(stand)
+        return stands
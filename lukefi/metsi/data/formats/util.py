@@ -1,5 +1,5 @@
 from enum import EnumMeta
-from typing import Optional, Any
+from typing import Optional, Any, Callable, Sequence, Tuple
 
 
 def parse_int(source: str) -> Optional[int]:
@@ -51,3 +51,105 @@ def convert_str_to_type(_class: type, value: str, property_name: str):
             return tuple(parse_float(v) for v in value) 
     else:
         raise Exception(f"could not convert {value} to {property_name}.")
+
+
+def class_annotations(_class: type) -> dict:
+    """type hints of _class and its base classes, as given in their __annotations__"""
+    result = {}
+    for base in reversed(_class.__mro__):
+        result.update(base.__dict__.get('__annotations__', {}))
+    return result
+
+
+def _none_or(converter: Callable[[str], Any]) -> Callable[[str], Any]:
+    return lambda value: None if value == "None" else converter(value)
+
+
+def enum_converter(enum_type: EnumMeta) -> Callable[[str], Any]:
+    """converter of 'EnumName.MEMBER' csv values to members of enum_type by the member name"""
+    members = {f"{enum_type.__name__}.{name}": member for name, member in enum_type.__members__.items()}
+
+    def convert(value):
+        if value in members:
+            return members[value]
+        return enum_type[value.split('.')[1]]
+    return convert
+
+
+def _unconvertible(property_name: str) -> Callable[[str], Any]:
+    def convert(value):
+        raise Exception(f"could not convert {value} to {property_name}.")
+    return convert
+
+
+def compile_converter(property_type: type, property_name: str) -> Callable[[str], Any]:
+    """
+    Specialized converter of a single csv value to given property type, equal to convert_str_to_type but with
+    the type hint inspected only once.
+    """
+    if property_type in (bool, Optional[bool]):
+        return _none_or(lambda value: value == "True")
+    if property_type in (int, Optional[int]):
+        return _none_or(int)
+    if property_type in (float, Optional[float]):
+        return _none_or(float)
+    if property_type in (str, Optional[str]):
+        return _none_or(str)
+    enum_type = property_type
+    if not isinstance(enum_type, EnumMeta):
+        enum_type = getattr(property_type, '__args__', (None,))[0]
+    if isinstance(enum_type, EnumMeta):
+        return _none_or(enum_converter(enum_type))
+    return _unconvertible(property_name)
+
+
+def compile_tuple_converter(property_type: type) -> Callable[[Sequence[str]], Any]:
+    """Specialized converter of consecutive csv values to given tuple or list property type"""
+    #stand.stems_per_ha_scaling_factors
+    if property_type == tuple[float, float]:
+        return lambda values: tuple(parse_float(v) for v in values)
+    #stand.geo_location
+    if property_type == Optional[tuple[float, float, float, str]]:
+        return lambda values: tuple(parse_float(v) for v in values[0:3]) + (
+            str(values[3]) if values[3] != "None" else None,)
+    #stand.monthly rainfall and stand.monthly_temperatures
+    if property_type == Optional[list[float]]:
+        return lambda values: [parse_float(v) for v in values]
+    #stratum.stand_origin_relative_position
+    if property_type == tuple[float, float, float]:
+        return lambda values: tuple(parse_float(v) for v in values)
+    return lambda values: None
+
+
+RowLayout = Sequence[Tuple[str, int, Optional[Callable[[Any], Any]]]]
+
+
+def compile_row_decoder(_class: type, layout: RowLayout, offset: int = 0) -> Callable[..., Any]:
+    """
+    Compile a decoder of csv rows into _class instances. The layout lists (property name, column count, converter)
+    in column order from given offset. Properties of one column are converted by their type hint with
+    compile_converter and properties of several columns with compile_tuple_converter, unless a converter is given.
+
+    The decoder is called with a row and optionally an existing instance to populate, and returns the instance.
+    """
+    annotations = class_annotations(_class)
+    fields = []
+    index = offset
+    for property_name, width, converter in layout:
+        if width == 1:
+            column = index
+            converter = converter or compile_converter(annotations[property_name], property_name)
+        else:
+            column = slice(index, index + width)
+            converter = converter or compile_tuple_converter(annotations[property_name])
+        fields.append((property_name, column, converter))
+        index += width
+    fields = tuple(fields)
+
+    def decode(row: Sequence[str], result=None):
+        if result is None:
+            result = _class()
+        for property_name, column, converter in fields:
+            setattr(result, property_name, converter(row[column]))
+        return result
+    return decode
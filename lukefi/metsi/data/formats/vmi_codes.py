@@ -0,0 +1,157 @@
+"""
+Table driven decoding of VMI code values.
+
+The code value rules of vmi_util are compiled into dict lookups keyed by the raw source code, or a tuple of codes,
+over the known values of the codes. Codes outside the compiled domain fall back to the rule itself, so the tables
+return the same values, and raise the same errors, as the functions of vmi_util. Tables decode a single code, or
+combination of codes, with decode() and whole columns of codes with map().
+"""
+import itertools
+import typing
+
+import numpy as np
+
+from lukefi.metsi.data.formats import vmi_util
+from lukefi.metsi.data.formats.vmi_const import vmi12_county_areas
+
+_MISSING = object()
+
+DIGITS = tuple('0123456789')
+BLANKS = ('', ' ', '.')
+DIGIT_CODES = DIGITS + BLANKS
+
+
+def unique_rows(*columns: typing.Sequence) -> typing.Tuple[typing.List[tuple], np.ndarray]:
+    """
+    The unique combinations of values in given equal length columns as tuples, and the position of the combination
+    of each row in them.
+    """
+    size = len(columns[0])
+    if size == 0:
+        return [], np.empty(0, dtype=np.int64)
+    codes = np.zeros(size, dtype=np.int64)
+    for column in columns:
+        values, inverse = np.unique(column, return_inverse=True)
+        codes = np.unique(codes * len(values) + inverse, return_inverse=True)[1]
+    _, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    keys = list(zip(*(np.asarray(column)[first].tolist() for column in columns)))
+    return keys, inverse
+
+
+def spread(values: list, inverse: np.ndarray, dtype: typing.Any = object) -> np.ndarray:
+    """Array of given dtype with the values at the positions given by inverse"""
+    if dtype is object:
+        result = np.empty(len(values), dtype=object)
+        for i, value in enumerate(values):
+            result[i] = value
+    else:
+        result = np.array(values, dtype=dtype)
+    return result[inverse]
+
+
+class CodeTable:
+    """
+    Lookup table of a code value rule, compiled over given domain of code tuples. Single codes are decoded with
+    decode(), called like the rule, and columns of codes with map().
+    """
+
+    def __init__(self, rule: typing.Callable, domain: typing.Iterable[tuple]):
+        self.rule = rule
+        domain = list(domain)
+        if len(domain[0]) == 1:
+            self.table = {code: rule(code) for code, in domain}
+            self.decode = self._single_code_decoder(self.table, rule)
+        else:
+            self.table = {key: rule(*key) for key in domain}
+            self.decode = self._code_tuple_decoder(self.table, rule)
+
+    @staticmethod
+    def _single_code_decoder(table: dict, rule: typing.Callable) -> typing.Callable:
+        get = table.get
+
+        def decode(code):
+            result = get(code, _MISSING)
+            return rule(code) if result is _MISSING else result
+        return decode
+
+    @staticmethod
+    def _code_tuple_decoder(table: dict, rule: typing.Callable) -> typing.Callable:
+        get = table.get
+
+        def decode(*codes):
+            result = get(codes, _MISSING)
+            return rule(*codes) if result is _MISSING else result
+        return decode
+
+    def map(self, *columns: typing.Sequence, dtype: typing.Any = object) -> np.ndarray:
+        """Decode equal length columns of codes into an array of given dtype"""
+        keys, inverse = unique_rows(*columns)
+        return spread([self.decode(*key) for key in keys], inverse, dtype)
+
+
+class YearCodeTable:
+    """
+    Lookup table of a code value rule for years relative to the inventory year. The rule is called with the codes and
+    the year last, and returns the year less an offset given by the codes, or None. The offsets are compiled over given
+    domain of code tuples. Single codes and a year are decoded with decode(), called like the rule, and columns of
+    codes and years with map().
+    """
+
+    def __init__(self, rule: typing.Callable, domain: typing.Iterable[tuple]):
+        self.offsets = CodeTable(lambda *codes: rule(*codes, 0), domain)
+        offset = self.offsets.decode
+
+        def decode(*codes_and_year) -> typing.Optional[int]:
+            result = offset(*codes_and_year[:-1])
+            return None if result is None else codes_and_year[-1] + result
+        self.decode = decode
+
+    def map(self, *columns: typing.Sequence) -> np.ndarray:
+        """Decode equal length columns of codes, and a last column of years, into an object array of years or None"""
+        offsets = self.offsets.map(*columns[:-1])
+        present = np.not_equal(offsets, None)
+        result = np.full(len(offsets), None, dtype=object)
+        years = np.asarray(columns[-1])[present] + offsets[present].astype(np.int64)
+        result[present] = spread(years.tolist(), np.arange(len(years)))
+        return result
+
+
+def _production_limitation_fmc(production_limitation: str, production_limitation_detail: str) -> typing.Optional[int]:
+    """The forest management category of the production limitation rules, or None when none of them apply"""
+    return vmi_util.determine_fmc_by_production_limitations(None, '', None, production_limitation,
+                                                           production_limitation_detail, '')
+
+
+PRODUCTION_LIMITATIONS = (
+    '0', '101', '102', '103', '104', '105', '107', '108', '109', '201', '202', '203', '205', '206', '207', '301',
+    '302', '303', '304', '305', '306', '307', '308', '309', '310', '401', '402', '403', '404', '405', '406', '407',
+    '408', '409', '501', '502', '503', '504'
+) + BLANKS
+
+TAX_CLASS_REDUCTION = CodeTable(vmi_util.determine_tax_class_reduction, itertools.product(DIGIT_CODES))
+TAX_CLASS = CodeTable(vmi_util.determine_tax_class, itertools.product(DIGIT_CODES))
+OWNER_GROUP = CodeTable(vmi_util.determine_owner_group, itertools.product(DIGITS))
+STRATUM_ORIGIN = CodeTable(vmi_util.determine_stratum_origin, itertools.product(DIGIT_CODES))
+DEVELOPMENT_CLASS = CodeTable(vmi_util.determine_development_class, itertools.product(DIGIT_CODES))
+PRODUCTION_LIMITATION_FMC = CodeTable(_production_limitation_fmc,
+                                      itertools.product(PRODUCTION_LIMITATIONS, DIGIT_CODES))
+VMI12_AREA_HA = CodeTable(vmi_util.determine_vmi12_area_ha,
+                          itertools.product(range(10), range(1, len(vmi12_county_areas))))
+
+ARTIFICIAL_REGENERATION_YEAR = YearCodeTable(vmi_util.determine_artificial_regeneration_year,
+                                             itertools.product(DIGIT_CODES, DIGIT_CODES + tuple('aAbB')))
+SOIL_SURFACE_PREPARATION_YEAR = YearCodeTable(vmi_util.determine_soil_surface_preparation_year,
+                                              itertools.product(DIGIT_CODES + tuple('aA')))
+REFORM_SECTOR_CLEARING_YEAR = YearCodeTable(vmi_util.determine_clearing_of_reform_sector_year,
+                                            itertools.product(DIGIT_CODES, DIGIT_CODES))
+
+
+def fmc_by_production_limitations(default: int, other_values: str, owner_group: int, production_limitation: str,
+                                  production_limitation_detail: str, protection_forest_code: str) -> int:
+    """vmi_util.determine_fmc_by_production_limitations with the production limitation rules looked up"""
+    fmc = PRODUCTION_LIMITATION_FMC.decode(production_limitation, production_limitation_detail)
+    if fmc is not None:
+        return fmc
+    # none of the limitation rules apply, leaving the rules of other values and protection forests
+    return vmi_util.determine_fmc_by_production_limitations(default, other_values, owner_group, '', '',
+                                                           protection_forest_code)
@@ -0,0 +1,471 @@
+"""
+Columnar ingestion of VMI source data. Source rows are read into one array per VMI index field and converted into
+arrays per ForestStand, TreeStratum and ReferenceTree property. Model objects are materialized only on request.
+
+Code value conversions apply the scalar functions of vmi_util and vmi2internal, or the lookup tables of vmi_codes, once
+per unique source value or value combination, so the results are identical to the row by row conversion in the VMI
+builders. Missing values of reference trees are supplemented for all stands at once with supplement_columns.
+"""
+import typing
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from lukefi.metsi.data.conversion import vmi2internal
+from lukefi.metsi.data.formats import util, vmi_codes, vmi_supplementing, vmi_util
+from lukefi.metsi.data.formats.vmi_const import VMI12StandIndices, VMI12TreeIndices, VMI12StratumIndices, \
+    VMI13StandIndices, VMI13TreeIndices, VMI13StratumIndices
+from lukefi.metsi.data.model import ForestStand, ReferenceTree, TreeStratum
+
+Columns = typing.Dict[str, np.ndarray]
+
+
+@dataclass
+class VMIColumns:
+    """
+    Property arrays of VMI forest stands, tree strata and reference trees. Rows of strata and trees are linked to
+    their stand by the position of the stand in the stand arrays, given in the 'stand_index' array.
+    """
+    stands: Columns = field(default_factory=dict)
+    strata: Columns = field(default_factory=dict)
+    trees: Columns = field(default_factory=dict)
+
+    @property
+    def stand_count(self) -> int:
+        return len(self.stands.get('identifier', ()))
+
+
+class _FieldNames:
+    """Stand-in for VMI indices classes, addressing a dict of source values by the field names"""
+
+    def __getattr__(self, name: str) -> str:
+        return name
+
+
+def index_fields(indices: type) -> typing.Dict[str, typing.Union[int, slice]]:
+    """Return the data indices of a VMI indices class by their field names"""
+    return {name: value for name, value in vars(indices).items() if not name.startswith('_')}
+
+
+def split_columns(rows: typing.Sequence[typing.Sequence[str]], indices: type) -> Columns:
+    """Select a source value array per field of given indices class out of pre-split VMI rows"""
+    transposed = list(zip(*rows))
+    return {
+        name: np.array(transposed[i] if i < len(transposed) else [row[i] for row in rows], dtype=str)
+        for name, i in index_fields(indices).items()
+    }
+
+
+def fixed_width_fields(indices: type) -> typing.Dict[str, typing.Tuple[int, int]]:
+    """Return the (start, stop) character positions of the fields of given VMI12 style indices class"""
+    return {
+        name: (value.start, value.stop) if isinstance(value, slice) else (value, value + 1)
+        for name, value in index_fields(indices).items()
+    }
+
+
+def char_table(lines: typing.Sequence[str], width: int = 0) -> np.ndarray:
+    """Return given lines as a 2-D array of unicode code points, padded with zeros to at least given width"""
+    if not lines:
+        return np.zeros((0, width), dtype=np.uint32)
+    table = np.array(lines, dtype=str)
+    table = table.view(np.uint32).reshape(len(lines), table.itemsize // 4)
+    if table.shape[1] < width:
+        table = np.pad(table, ((0, 0), (0, width - table.shape[1])))
+    return table
+
+
+def slice_columns(table: np.ndarray, indices: type) -> Columns:
+    """
+    Select a source value array per field of given VMI12 style indices class out of a character table. Fields
+    beyond the end of a line are shortened or empty, as with string slicing.
+    """
+    fields = fixed_width_fields(indices)
+    table = np.pad(table, ((0, 0), (0, max(0, max(stop for _, stop in fields.values()) - table.shape[1]))))
+    return {
+        name: np.ascontiguousarray(table[:, start:stop]).view(f'U{stop - start}').reshape(len(table))
+        for name, (start, stop) in fields.items()
+    }
+
+
+def map_unique(func: typing.Callable, *columns: np.ndarray, dtype: typing.Any = object) -> np.ndarray:
+    """
+    Vectorized application of a scalar function. The function is called once for each unique combination of the
+    values in given equal length columns and its results are spread into an array of given dtype.
+    """
+    keys, inverse = vmi_codes.unique_rows(*columns)
+    return vmi_codes.spread([func(*key) for key in keys], inverse, dtype)
+
+
+def unzip(column: np.ndarray, count: int) -> typing.List[np.ndarray]:
+    """Split an object array of tuples into an array per tuple position"""
+    parts = [np.empty(len(column), dtype=object) for _ in range(count)]
+    for i, values in enumerate(column.tolist()):
+        for part, value in zip(parts, values):
+            part[i] = value
+    return parts
+
+
+def float_column(column: np.ndarray, default: float = 0.0) -> np.ndarray:
+    """Parse source values as floats, with the default for unparseable values"""
+    return map_unique(lambda value: util.get_or_default(util.parse_float(value), default), column, dtype=float)
+
+
+def join_identifier(*columns: np.ndarray) -> np.ndarray:
+    """Identifiers out of '-' joined values of given columns, as generated in vmi_util"""
+    return np.array(['-'.join(values) for values in zip(*(column.tolist() for column in columns))], dtype=str)
+
+
+def stand_identifiers(raw: Columns) -> np.ndarray:
+    return join_identifier(raw['lohkomuoto'], raw['section_y'], raw['section_x'], raw['test_area_number'],
+                           raw['stand_number'])
+
+
+def _fmc(land_category: str, forestry_centre: str, owner_group: str, *source: str) -> int:
+    fields = ('muut_arvot', 'puuntuotannon_rajoitus', 'puuntuotannon_rajoitus_tarkenne', 'suojametsakoodi',
+              'ahvenanmaan_markkinahakkuualue', 'koealan_kasittelyluokka')
+    return vmi_util.determine_forest_management_category(
+        vmi2internal.convert_land_use_category(land_category),
+        vmi_util.parse_forestry_centre(forestry_centre),
+        dict(zip(fields, source)),
+        vmi2internal.convert_owner(owner_group),
+        _FieldNames(), False)
+
+
+def stand_columns(raw: Columns, stand_ids: np.ndarray) -> Columns:
+    """Convert VMI source value arrays of type 1 rows into ForestStand property arrays shared by VMI12 and VMI13"""
+    return {
+        'identifier': stand_identifiers(raw),
+        'stand_id': stand_ids,
+        'management_unit_id': stand_ids,
+        'degree_days': map_unique(vmi_util.transform_vmi_degree_days, raw['degree_days']),
+        'owner_category': map_unique(vmi2internal.convert_owner, raw['owner_group']),
+        'fra_category': raw['fra_class'],
+        'land_use_category': map_unique(vmi2internal.convert_land_use_category, raw['land_category']),
+        'land_use_category_detail': raw['land_category_detail'],
+        'site_type_category': map_unique(vmi2internal.convert_site_type_category, raw['kasvupaikkatunnus']),
+        'soil_peatland_category': map_unique(vmi2internal.convert_soil_peatland_category, raw['paatyyppi']),
+        'tax_class_reduction': vmi_codes.TAX_CLASS_REDUCTION.map(raw['tax_class_reduction'], dtype=int),
+        'tax_class': vmi_codes.TAX_CLASS.map(raw['tax_class'], dtype=int),
+        'drainage_category': map_unique(vmi2internal.convert_drainage_category, raw['ojitus_tilanne']),
+        'development_class': vmi_codes.DEVELOPMENT_CLASS.map(raw['kehitysluokka']),
+        'drainage_feasibility': map_unique(vmi_util.determine_drainage_feasibility, raw['ojitus_tarve'], dtype=bool),
+        'forestry_centre_id': map_unique(vmi_util.parse_forestry_centre, raw['forestry_centre'], dtype=int),
+        'forest_management_category': map_unique(
+            _fmc, raw['land_category'], raw['forestry_centre'], raw['owner_group'], raw['muut_arvot'],
+            raw['puuntuotannon_rajoitus'], raw['puuntuotannon_rajoitus_tarkenne'], raw['suojametsakoodi'],
+            raw['ahvenanmaan_markkinahakkuualue'], raw['koealan_kasittelyluokka'], dtype=int),
+        'municipality_id': map_unique(vmi_util.determine_municipality, raw['municipality'], raw['kitukunta']),
+        'natural_regeneration_feasibility': map_unique(vmi_util.determine_natural_renewal, raw['hakkuuehdotus'],
+                                                       dtype=bool),
+        'auxiliary_stand': raw['stand_number'] != '1',
+    }
+
+
+def year_columns(raw: Columns, year: np.ndarray, small_tree_factor_field: str) -> Columns:
+    """Convert VMI source value arrays of type 1 rows into ForestStand property arrays relative to inventory year"""
+    maintenance = map_unique(vmi_util.determine_forest_maintenance_details, raw['hakkuu_tapa'], raw['hakkuu_aika'],
+                             year)
+    young_stand_tending_year, cutting_year, method_of_last_cutting = unzip(maintenance, 3)
+    return {
+        'year': year,
+        'drainage_year': map_unique(vmi_util.determine_drainage_year, raw['ojitus_aika'], year),
+        'soil_surface_preparation_year': vmi_codes.SOIL_SURFACE_PREPARATION_YEAR.map(raw['maanmuokkaus'], year),
+        'regeneration_area_cleaning_year': vmi_codes.REFORM_SECTOR_CLEARING_YEAR.map(
+            raw['muu_toimenpide'], raw['muu_toimenpide_aika'], year),
+        'artificial_regeneration_year': vmi_codes.ARTIFICIAL_REGENERATION_YEAR.map(
+            raw['viljely'], raw['viljely_aika'], year),
+        'young_stand_tending_year': young_stand_tending_year,
+        'cutting_year': cutting_year,
+        'method_of_last_cutting': method_of_last_cutting,
+        'stems_per_ha_scaling_factors': map_unique(vmi_util.determine_area_factors, raw[small_tree_factor_field],
+                                                   raw['osuus9m']),
+    }
+
+
+def _geo_location(crs: str, height_transform: typing.Callable[[str], typing.Optional[float]]) -> typing.Callable:
+    def geo_location(lat: str, lon: str, height: str) -> tuple:
+        stand = ForestStand()
+        stand.set_geo_location(vmi_util.parse_float(lat), vmi_util.parse_float(lon), height_transform(height), crs)
+        return stand.geo_location
+    return geo_location
+
+
+def vmi13_stand_columns(raw: Columns, stand_ids: np.ndarray) -> Columns:
+    """Convert VMI13 source value arrays of type 1 rows into ForestStand property arrays"""
+    result = stand_columns(raw, stand_ids)
+    year = vmi_util.parse_vmi13_year_array(raw['date'])
+    area = map_unique(lambda lohkomuoto: vmi_util.determine_vmi13_area_ha(int(lohkomuoto)), raw['lohkomuoto'],
+                      dtype=float)
+    result.update(year_columns(raw, year, 'osuus4m'))
+    result.update({
+        'area': area,
+        'area_weight': area,
+        'geo_location': map_unique(_geo_location('EPSG:3067', vmi_util.transform_vmi13_height_above_sea_level),
+                                   raw['lat'], raw['lon'], raw['height_above_sea_level']),
+        'fertilization_year': np.full(len(year), None, dtype=object),
+    })
+    return result
+
+
+def vmi12_stand_columns(raw: Columns, stand_ids: np.ndarray) -> Columns:
+    """Convert VMI12 source value arrays of type 1 rows into ForestStand property arrays"""
+    result = stand_columns(raw, stand_ids)
+    year = vmi_util.parse_vmi12_year_array(raw['date'])
+    area = map_unique(lambda lohkomuoto, county: vmi_codes.VMI12_AREA_HA.decode(int(lohkomuoto), int(county)),
+                      raw['lohkomuoto'], raw['county'], dtype=float)
+    result.update(year_columns(raw, year, 'osuus5m'))
+    result.update({
+        'area': area,
+        'area_weight': area,
+        'geo_location': map_unique(_geo_location('EPSG:2393', vmi_util.transform_vmi12_height_above_sea_level),
+                                   raw['lat'], raw['lon'], raw['height_above_sea_level']),
+    })
+    return result
+
+
+def stratum_columns(raw: Columns) -> Columns:
+    """Convert VMI source value arrays of type 2 rows into TreeStratum property arrays"""
+    size = len(raw['species'])
+    mean_diameter = float_column(raw['avg_diameter'])
+    sapling_stems_per_ha = float_column(raw['sapling_stems_per_ha'])
+    mean_height = map_unique(vmi_util.determine_stratum_tree_height, raw['avg_height'], mean_diameter, dtype=float)
+    biological_age, breast_height_age = vmi_util.determine_stratum_age_values_array(
+        raw['biological_age'], raw['d13_age'], mean_height)
+    return {
+        'identifier': join_identifier(raw['lohkomuoto'], raw['section_y'], raw['section_x'],
+                                      raw['test_area_number'], raw['stand_number'], raw['stratum_number'],
+                                      np.full(size, 'stratum')),
+        'species': map_unique(vmi2internal.convert_species, raw['species']),
+        'origin': vmi_codes.STRATUM_ORIGIN.map(raw['origin'], dtype=int),
+        'stems_per_ha': float_column(raw['stems_per_ha']),
+        'sapling_stems_per_ha': sapling_stems_per_ha,
+        'sapling_stratum': sapling_stems_per_ha > 0.0,
+        'mean_diameter': mean_diameter,
+        'mean_height': mean_height,
+        'breast_height_age': breast_height_age,
+        'biological_age': biological_age,
+        'basal_area': float_column(raw['basal_area']),
+        'cutting_year': np.zeros(size, dtype=int),
+        'age_when_10cm_diameter_at_breast_height': np.zeros(size, dtype=int),
+        'tree_number': np.zeros(size, dtype=int),
+        'lowest_living_branch_height': np.zeros(size, dtype=float),
+        'management_category': np.ones(size, dtype=int),
+    }
+
+
+def tree_columns(raw: Columns, height_conversion_factor: float) -> Columns:
+    """Convert VMI source value arrays of type 3 rows into ReferenceTree property arrays"""
+    size = len(raw['species'])
+    breast_height_age, biological_age = vmi_util.determine_tree_age_values_array(
+        raw['d13_age'], raw['age_increase'], raw['total_age'])
+    return {
+        'tree_category': raw['tree_category'],
+        'identifier': join_identifier(raw['lohkomuoto'], raw['section_y'], raw['section_x'],
+                                      raw['test_area_number'], raw['stand_number'], raw['tree_number'],
+                                      np.full(size, 'tree')),
+        'species': map_unique(vmi2internal.convert_species, raw['species']),
+        'breast_height_diameter': float_column(raw['diameter']) / 10.0,
+        'breast_height_age': breast_height_age,
+        'biological_age': biological_age,
+        'pruning_year': np.zeros(size, dtype=int),
+        'age_when_10cm_diameter_at_breast_height': np.zeros(size, dtype=int),
+        'origin': np.zeros(size, dtype=int),
+        'tree_number': map_unique(util.parse_int, raw['tree_number']),
+        'lowest_living_branch_height': float_column(raw['living_branches_height']) / 10.0,
+        'management_category': map_unique(vmi_util.determine_tree_management_category, raw['latvuskerros'],
+                                          dtype=int),
+        'height': map_unique(lambda height: vmi_util.determine_tree_height(height, height_conversion_factor),
+                             raw['height']),
+    }
+
+
+def link_to_stands(stand_identifier: np.ndarray, child_identifier: np.ndarray) -> np.ndarray:
+    """
+    Return the stand array positions of the stands given child rows belong to. Raises KeyError for child rows
+    without a stand, as in VMI builders.
+    """
+    order = np.argsort(stand_identifier, kind='stable')
+    known = stand_identifier[order]
+    positions = np.searchsorted(known, child_identifier)
+    found = positions < len(known)
+    found[found] = known[positions[found]] == child_identifier[found]
+    if not found.all():
+        raise KeyError(str(child_identifier[~found][0]))
+    return order[positions]
+
+
+def unique_stand_rows(identifiers: np.ndarray) -> np.ndarray:
+    """
+    Positions of type 1 rows to convert. Of stands with a repeated identifier, the last row is used in the position
+    of the first one, as in VMI builders.
+    """
+    if len(identifiers) == 0:
+        return np.empty(0, dtype=int)
+    _, first = np.unique(identifiers, return_index=True)
+    _, last = np.unique(identifiers[::-1], return_index=True)
+    last = len(identifiers) - 1 - last
+    return last[np.argsort(first, kind='stable')]
+
+
+def build_columns(stand_raw: Columns, strata_raw: Columns, tree_raw: typing.Optional[Columns],
+                  stand_converter: typing.Callable[[Columns, np.ndarray], Columns],
+                  height_conversion_factor: float) -> VMIColumns:
+    """
+    Convert the source value arrays of VMI type 1, 2 and 3 rows into linked property arrays. Trees are left out
+    when tree_raw is None.
+    """
+    selected = unique_stand_rows(stand_identifiers(stand_raw))
+    stand_raw = {name: column[selected] for name, column in stand_raw.items()}
+    result = VMIColumns(stands=stand_converter(stand_raw, selected + 1))
+    result.strata = stratum_columns(strata_raw)
+    result.strata['stand_index'] = link_to_stands(result.stands['identifier'], stand_identifiers(strata_raw))
+    if tree_raw is not None:
+        result.trees = tree_columns(tree_raw, height_conversion_factor)
+        result.trees['stand_index'] = link_to_stands(result.stands['identifier'], stand_identifiers(tree_raw))
+    return result
+
+
+def vmi13_columns(stand_rows: typing.Sequence[typing.Sequence[str]],
+                  strata_rows: typing.Sequence[typing.Sequence[str]],
+                  tree_rows: typing.Optional[typing.Sequence[typing.Sequence[str]]]) -> VMIColumns:
+    """Convert pre-split VMI13 type 1, 2 and 3 rows into property arrays. Trees are left out when tree_rows is None."""
+    return build_columns(
+        split_columns(stand_rows, VMI13StandIndices),
+        split_columns(strata_rows, VMI13StratumIndices),
+        None if tree_rows is None else split_columns(tree_rows, VMI13TreeIndices),
+        vmi13_stand_columns,
+        10.0)
+
+
+def read_vmi13_columns(data_rows: typing.Iterable[str], reference_trees: bool = True) -> VMIColumns:
+    """Read raw VMI13 source rows, such as an open source file, into property arrays in a single pass"""
+    rows_by_type = {'1': [], '2': [], '3': []}
+    for raw in data_rows:
+        row = raw.split()
+        if row and row[0] in rows_by_type:
+            rows_by_type[row[0]].append(row)
+    return vmi13_columns(rows_by_type['1'], rows_by_type['2'], rows_by_type['3'] if reference_trees else None)
+
+
+def vmi12_columns(stand_rows: typing.Sequence[str], strata_rows: typing.Sequence[str],
+                  tree_rows: typing.Optional[typing.Sequence[str]]) -> VMIColumns:
+    """Convert raw VMI12 type 1, 2 and 3 rows into property arrays. Trees are left out when tree_rows is None."""
+    return vmi12_table_columns(char_table(stand_rows), char_table(strata_rows),
+                               None if tree_rows is None else char_table(tree_rows))
+
+
+def vmi12_table_columns(stand_table: np.ndarray, strata_table: np.ndarray,
+                        tree_table: typing.Optional[np.ndarray]) -> VMIColumns:
+    """Convert character tables of VMI12 type 1, 2 and 3 rows into property arrays"""
+    return build_columns(
+        slice_columns(stand_table, VMI12StandIndices),
+        slice_columns(strata_table, VMI12StratumIndices),
+        None if tree_table is None else slice_columns(tree_table, VMI12TreeIndices),
+        vmi12_stand_columns,
+        100.0)
+
+
+def read_vmi12_columns(source: typing.Union[bytes, typing.Iterable[str]], reference_trees: bool = True,
+                       encoding: str = 'utf-8') -> VMIColumns:
+    """
+    Read VMI12 source data, as the bytes of a source file or an iterable of raw rows, into property arrays. The rows
+    are classified by their type and sliced into fields in bulk. Rows of other types than 1, 2 and 3 are skipped.
+    """
+    lines = source.decode(encoding).splitlines() if isinstance(source, bytes) else list(source)
+    table = char_table(lines, VMI12StandIndices.row_type + 1)
+    row_type = table[:, VMI12StandIndices.row_type]
+    return vmi12_table_columns(table[row_type == ord('1')], table[row_type == ord('2')],
+                               table[row_type == ord('3')] if reference_trees else None)
+
+
+def sapling_tree_columns(strata: Columns, tree_stand_index: np.ndarray, stand_count: int) -> Columns:
+    """
+    ReferenceTree property arrays of the sapling trees of sapling strata, as created by
+    TreeStratum.to_sapling_reference_tree. Saplings are numbered after the trees of their stand in stratum order.
+    """
+    rows = np.flatnonzero(strata['sapling_stratum'])
+    stand_index = strata['stand_index'][rows]
+    order = np.argsort(stand_index, kind='stable')
+    rank = np.empty(len(rows), dtype=np.int64)
+    rank[order] = np.arange(len(rows)) - np.searchsorted(stand_index[order], stand_index[order])
+    tree_numbers = np.bincount(tree_stand_index, minlength=stand_count)[stand_index] + rank + 1
+    size = len(rows)
+    return {
+        'identifier': np.array([vmi_util.convert_stratum_id_to_tree_id(identifier, tree_number) for identifier,
+                                tree_number in zip(strata['identifier'][rows].tolist(), tree_numbers.tolist())],
+                               dtype=str),
+        'stems_per_ha': strata['sapling_stems_per_ha'][rows],
+        'species': strata['species'][rows],
+        'breast_height_diameter': strata['mean_diameter'][rows],
+        'height': strata['mean_height'][rows],
+        'breast_height_age': strata['breast_height_age'][rows],
+        'biological_age': strata['biological_age'][rows],
+        'saw_log_volume_reduction_factor': np.full(size, -1.0),
+        'pruning_year': np.zeros(size, dtype=int),
+        'age_when_10cm_diameter_at_breast_height': np.zeros(size, dtype=int),
+        'origin': strata['origin'][rows],
+        'management_category': np.ones(size, dtype=int),
+        'sapling': np.ones(size, dtype=bool),
+        'stand_index': stand_index,
+    }
+
+
+def concatenate_tables(cls: type, first: Columns, second: Columns) -> Columns:
+    """
+    Rows of two property tables of a model class, with the class defaults for properties missing from either.
+    Columns of differing types are joined as object arrays, keeping the type of each value as in the row path.
+    """
+    defaults = cls().__dict__
+    result = {}
+    for name in dict.fromkeys([*first, *second]):
+        parts = [
+            table[name] if name in table else np.full(len(next(iter(table.values()), ())), defaults[name])
+            for table in (first, second)
+        ]
+        if parts[0].dtype != parts[1].dtype:
+            parts = [part.astype(object) for part in parts]
+        result[name] = np.concatenate(parts)
+    return result
+
+
+def supplement_columns(columns: VMIColumns, is_vmi12: bool) -> VMIColumns:
+    """
+    Supplement missing values of reference trees as the supplemenent_missing_values of VMI builders, over all stands
+    at once. Stems per hectare and Näslund heights are set for the trees, sapling trees are added for sapling strata
+    and the missing ages supplemented. The strata are removed, as in VMI builders.
+    """
+    trees = dict(columns.trees)
+    trees['stems_per_ha'] = map_unique(lambda diameter: vmi_util.determine_stems_per_ha(diameter, is_vmi12),
+                                       trees['breast_height_diameter'], dtype=float)
+    trees['height'] = vmi_supplementing.supplement_naslund_height_column(
+        trees['height'], trees['breast_height_diameter'], trees['species'])
+    trees = concatenate_tables(
+        ReferenceTree, trees, sapling_tree_columns(columns.strata, trees['stand_index'], columns.stand_count))
+    trees['breast_height_age'], trees['biological_age'] = vmi_supplementing.supplement_age_columns(
+        trees, columns.strata)
+    return VMIColumns(stands=columns.stands, trees=trees)
+
+
+def _materialize(cls: type, columns: Columns, excluded: typing.Tuple[str, ...] = ()) -> list:
+    names = [name for name in columns if name not in excluded]
+    result = []
+    for values in zip(*(columns[name].tolist() for name in names)):
+        instance = cls()
+        instance.__dict__.update(zip(names, values))
+        result.append(instance)
+    return result
+
+
+def materialize(columns: VMIColumns) -> typing.List[ForestStand]:
+    """Create ForestStand instances with their TreeStratum and ReferenceTree instances out of property arrays"""
+    stands = _materialize(ForestStand, columns.stands)
+    for cls, table, attribute in ((TreeStratum, columns.strata, 'tree_strata'),
+                                  (ReferenceTree, columns.trees, 'reference_trees')):
+        if not table:
+            continue
+        for instance, stand_index in zip(_materialize(cls, table, ('stand_index',)), table['stand_index'].tolist()):
+            stand = stands[stand_index]
+            instance.stand = stand
+            getattr(stand, attribute).append(instance)
+    return stands
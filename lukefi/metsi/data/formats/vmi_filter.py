@@ -0,0 +1,80 @@
+"""
+Stand level filters of VMI builders, evaluated on the raw fields of type 1 rows before any conversion.
+
+A StandFilter is given to a VMI builder with the builder flag 'stand_filter'. The rows of rejected stands, type 2 and
+3 rows included, are left out of the build without being converted.
+"""
+import dataclasses
+import typing
+
+from lukefi.metsi.data.conversion import vmi2internal
+from lukefi.metsi.data.enums.internal import LandUseCategory
+from lukefi.metsi.data.formats import vmi_util
+from lukefi.metsi.data.formats.util import parse_float, parse_int
+from lukefi.metsi.data.formats.vmi_const import VMI12StandIndices, VMI13StandIndices
+
+
+@dataclasses.dataclass
+class StandFilter:
+    """
+    Criteria of the stands to build. Criteria left as None accept all stands.
+
+    :param land_use_categories: accepted land use categories
+    :param forestry_centres: accepted forestry centre ids
+    :param lohkomuodot: accepted lohkomuoto codes
+    :param counties: accepted VMI12 county codes. Not available for VMI13, which has no county field.
+    :param municipalities: accepted municipality ids, as determined from the municipality and kitukunta fields
+    :param bounding_box: (min lat, min lon, max lat, max lon) of accepted stand locations, inclusive, in the
+        coordinate system of the source, i.e. EPSG:2393 for VMI12 and EPSG:3067 for VMI13
+    :param auxiliary_stand: accept only auxiliary stands with True or only main stands with False
+    """
+    land_use_categories: typing.Optional[typing.Collection[LandUseCategory]] = None
+    forestry_centres: typing.Optional[typing.Collection[int]] = None
+    lohkomuodot: typing.Optional[typing.Collection[int]] = None
+    counties: typing.Optional[typing.Collection[int]] = None
+    municipalities: typing.Optional[typing.Collection[int]] = None
+    bounding_box: typing.Optional[typing.Tuple[float, float, float, float]] = None
+    auxiliary_stand: typing.Optional[bool] = None
+
+    _land_categories: typing.Dict[str, bool] = dataclasses.field(default_factory=dict, init=False, repr=False,
+                                                                 compare=False)
+
+    def __post_init__(self):
+        for field in ('land_use_categories', 'forestry_centres', 'lohkomuodot', 'counties', 'municipalities'):
+            if getattr(self, field) is not None:
+                setattr(self, field, frozenset(getattr(self, field)))
+
+    def accepts_land_category(self, land_category: str) -> bool:
+        """Whether the land use category of given raw code is accepted, memoized by the code"""
+        accepted = self._land_categories.get(land_category)
+        if accepted is None:
+            accepted = vmi2internal.convert_land_use_category(land_category) in self.land_use_categories
+            self._land_categories[land_category] = accepted
+        return accepted
+
+    def accepts(self, row: typing.Sequence, indices: VMI12StandIndices or VMI13StandIndices) -> bool:
+        """Whether the stand of given VMI type 1 row meets all criteria. Cheaper criteria are checked first."""
+        if self.auxiliary_stand is not None and (row[indices.stand_number] != '1') != self.auxiliary_stand:
+            return False
+        if self.lohkomuodot is not None and parse_int(row[indices.lohkomuoto]) not in self.lohkomuodot:
+            return False
+        if self.counties is not None:
+            if not hasattr(indices, 'county'):
+                raise ValueError(f"County filter is not available for {indices.__name__} rows")
+            if parse_int(row[indices.county]) not in self.counties:
+                return False
+        if self.forestry_centres is not None and \
+                vmi_util.parse_forestry_centre(row[indices.forestry_centre]) not in self.forestry_centres:
+            return False
+        if self.land_use_categories is not None and not self.accepts_land_category(row[indices.land_category]):
+            return False
+        if self.municipalities is not None and \
+                vmi_util.determine_municipality(row[indices.municipality], row[indices.kitukunta]) \
+                not in self.municipalities:
+            return False
+        if self.bounding_box is not None:
+            lat, lon = parse_float(row[indices.lat]), parse_float(row[indices.lon])
+            min_lat, min_lon, max_lat, max_lon = self.bounding_box
+            if lat is None or lon is None or not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                return False
+        return True
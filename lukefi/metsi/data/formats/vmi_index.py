@@ -0,0 +1,166 @@
+"""
+Byte offset index of the rows of VMI12 and VMI13 source files, for reading the rows of selected stands without
+scanning the whole file.
+
+The index maps each stand identifier, as given by vmi_util.generate_stand_identifier, to the order number of its stand
+row and the byte spans of its type 1, 2 and 3 rows. It is persisted as JSON next to the source file and rebuilt when
+the size or modification time of the source no longer match.
+"""
+import dataclasses
+import json
+import os
+import typing
+import warnings
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.index.json'
+
+# [offset, length] of a raw row in the source file
+Span = typing.List[int]
+
+# stand row order number and the spans of its type 1, 2 and 3 rows, as persisted in JSON
+StandEntry = typing.List[typing.Union[int, typing.List[Span]]]
+
+
+def index_path(source_path: typing.Union[str, os.PathLike]) -> str:
+    return os.fspath(source_path) + INDEX_SUFFIX
+
+
+def source_signature(source_path: typing.Union[str, os.PathLike]) -> typing.Tuple[int, int]:
+    """Size and modification time of the source file in nanoseconds"""
+    stat = os.stat(source_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def merged_spans(spans: typing.Iterable[typing.Tuple[int, int]]) -> typing.List[typing.Tuple[int, int]]:
+    """Given (offset, length) spans in offset order, with directly consecutive spans merged into one"""
+    result = []
+    for offset, length in spans:
+        if result and result[-1][0] + result[-1][1] == offset:
+            result[-1] = (result[-1][0], result[-1][1] + length)
+        else:
+            result.append((offset, length))
+    return result
+
+
+@dataclasses.dataclass
+class VMIIndex:
+    builder: str
+    source_size: int
+    source_mtime_ns: int
+    encoding: str
+    stands: typing.Dict[str, StandEntry]
+
+    @classmethod
+    def create(cls, builder, source_path: typing.Union[str, os.PathLike], encoding: str = 'utf-8') -> 'VMIIndex':
+        """
+        Scan a VMI source file once and index its rows by stand identifier. The rows are classified and identified
+        with given VMI12Builder or VMI13Builder instance. Stand rows are numbered in source order as in build(), and a
+        repeated stand row replaces the earlier one.
+        """
+        size, mtime_ns = source_signature(source_path)
+        stands: typing.Dict[str, StandEntry] = {}
+        stand_order = 0
+        offset = 0
+        with open(source_path, 'rb') as source:
+            for line in source:
+                length = len(line)
+                raw = line.decode(encoding).rstrip('\r\n')
+                if raw.strip():
+                    row = builder.pre_parse_row(raw)
+                    row_type = builder.safe_row_type(row)
+                    if row_type in (1, 2, 3):
+                        entry = stands.setdefault(builder.stand_identifier(row), [None, [], [], []])
+                        if row_type == 1:
+                            stand_order += 1
+                            entry[0] = stand_order
+                            entry[1] = [[offset, length]]
+                        else:
+                            entry[row_type].append([offset, length])
+                offset += length
+        return cls(type(builder).__name__, size, mtime_ns, encoding, stands)
+
+    @classmethod
+    def load(cls, path: typing.Union[str, os.PathLike]) -> 'VMIIndex':
+        with open(path, 'r', encoding='utf-8') as index_file:
+            content = json.load(index_file)
+        if content.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported VMI index version {content.get('version')}")
+        return cls(content['builder'], content['source_size'], content['source_mtime_ns'], content['encoding'],
+                   content['stands'])
+
+    def save(self, path: typing.Union[str, os.PathLike]):
+        content = dataclasses.asdict(self)
+        content['version'] = INDEX_VERSION
+        with open(path, 'w', encoding='utf-8') as index_file:
+            json.dump(content, index_file)
+
+    def matches(self, builder, source_path: typing.Union[str, os.PathLike], encoding: str = 'utf-8') -> bool:
+        """The index was created by the type of given builder out of the current content of the source file"""
+        return (self.builder, self.encoding, (self.source_size, self.source_mtime_ns)) == \
+            (type(builder).__name__, encoding, source_signature(source_path))
+
+    def select(self, stand_ids: typing.Optional[typing.Iterable[str]] = None,
+               predicate: typing.Optional[typing.Callable[[str], bool]] = None) -> typing.List[str]:
+        """
+        Identifiers of the indexed stands in stand order, limited to given stand_ids and to the identifiers
+        accepted by predicate. KeyError is raised for stand_ids not found in the index.
+        """
+        identifiers = self.stands.keys()
+        if stand_ids is not None:
+            identifiers = list(dict.fromkeys(stand_ids))
+            for identifier in identifiers:
+                if identifier not in self.stands:
+                    raise KeyError(identifier)
+        if predicate is not None:
+            identifiers = [identifier for identifier in identifiers if predicate(identifier)]
+        return sorted(identifiers, key=lambda identifier: self.stands[identifier][0] or 0)
+
+    def read_rows(self, source_path: typing.Union[str, os.PathLike], identifiers: typing.Iterable[str],
+                  row_types: typing.Collection[int] = (1, 2, 3)) -> typing.Dict[str, typing.List[typing.List[str]]]:
+        """
+        Read the raw rows of given stands from the source file, seeking to the indexed rows only. Returns the
+        [stand_rows, strata_rows, tree_rows] of each stand by identifier, leaving out the row types not listed in
+        row_types. Directly consecutive rows are read at once.
+        """
+        identifiers = list(identifiers)
+        wanted = []
+        for identifier in identifiers:
+            entry = self.stands[identifier]
+            for row_type in row_types:
+                wanted.extend((offset, length, identifier, row_type) for offset, length in entry[row_type])
+        wanted.sort()
+        result = {identifier: [[], [], []] for identifier in identifiers}
+        position = 0
+        with open(source_path, 'rb') as source:
+            for offset, length in merged_spans((offset, length) for offset, length, _, _ in wanted):
+                source.seek(offset)
+                data = source.read(length)
+                while position < len(wanted) and wanted[position][0] < offset + length:
+                    row_offset, row_length, identifier, row_type = wanted[position]
+                    raw = data[row_offset - offset:row_offset - offset + row_length].decode(self.encoding)
+                    result[identifier][row_type - 1].append(raw.rstrip('\r\n'))
+                    position += 1
+        return result
+
+
+def load_or_create(builder, source_path: typing.Union[str, os.PathLike], encoding: str = 'utf-8') -> VMIIndex:
+    """
+    The index of given VMI source file. A persisted index next to the source file is used when it is up to date.
+    Otherwise the source is indexed and the index persisted next to it. When the index can not be persisted, as in
+    read-only inventory directories, it is used from memory only.
+    """
+    path = index_path(source_path)
+    if os.path.exists(path):
+        try:
+            index = VMIIndex.load(path)
+            if index.matches(builder, source_path, encoding):
+                return index
+        except (ValueError, KeyError, TypeError):
+            pass
+    index = VMIIndex.create(builder, source_path, encoding)
+    try:
+        index.save(path)
+    except OSError as error:
+        warnings.warn(f"Unable to persist VMI index {path}: {error}")
+    return index
@@ -1,11 +1,36 @@
 """
 NOTE: this module's functionality has been intentionally duplicated from `forestry-function-library` to avoid depending on the forestryfunctions library here. Implementation here needs to follow the source.
 """
+import math
 import typing
+
+import numpy as np
+
 from lukefi.metsi.data.enums.internal import TreeSpecies
 from lukefi.metsi.data.model import ReferenceTree, TreeStratum
 
 
+NASLUND_PINE_OR_OTHER_CONIFEROUS = frozenset({
+    TreeSpecies.PINE,
+    TreeSpecies.ABIES,
+    TreeSpecies.BLACK_SPRUCE,
+    TreeSpecies.DOUGLAS_FIR,
+    TreeSpecies.JUNIPER,
+    TreeSpecies.KEDAR,
+    TreeSpecies.LARCH,
+    TreeSpecies.OTHER_CONIFEROUS,
+    TreeSpecies.OTHER_PINE,
+    TreeSpecies.OTHER_SPRUCE,
+    TreeSpecies.SERBIAN_SPRUCE,
+    TreeSpecies.SHORE_PINE,
+    TreeSpecies.THUJA,
+    TreeSpecies.UNKNOWN_CONIFEROUS,
+    TreeSpecies.YEW,
+})
+
+_naslund_pine_or_other_coniferous_codes = np.array(sorted(int(species) for species in NASLUND_PINE_OR_OTHER_CONIFEROUS))
+
+
 def naslund_height(diameter: float, species: TreeSpecies) -> typing.Optional[float]:
         """
         NOTE: this function has been intentionally duplicated from `forestryfunctions\preprocessing\naslund.py` to avoid depending on the forestryfunctions library here. Implementation here needs to follow the source.
@@ -16,23 +41,6 @@ def naslund_height(diameter: float, species: TreeSpecies) -> typing.Optional[flo
         :return estimated height of the tree in meters or None
 
         """
-        NASLUND_PINE_OR_OTHER_CONIFEROUS = [
-            TreeSpecies.PINE,
-            TreeSpecies.ABIES,
-            TreeSpecies.BLACK_SPRUCE,
-            TreeSpecies.DOUGLAS_FIR,
-            TreeSpecies.JUNIPER,
-            TreeSpecies.KEDAR,
-            TreeSpecies.LARCH,
-            TreeSpecies.OTHER_CONIFEROUS,
-            TreeSpecies.OTHER_PINE,
-            TreeSpecies.OTHER_SPRUCE,
-            TreeSpecies.SERBIAN_SPRUCE,
-            TreeSpecies.SHORE_PINE,
-            TreeSpecies.THUJA,
-            TreeSpecies.UNKNOWN_CONIFEROUS,
-            TreeSpecies.YEW,
-        ]
         if diameter > 0:
             # scots pine or other coniferous
             if species in NASLUND_PINE_OR_OTHER_CONIFEROUS:
@@ -50,6 +58,63 @@ def naslund_height(diameter: float, species: TreeSpecies) -> typing.Optional[flo
         else:
             return None
 
+
+def naslund_height_array(diameters: np.ndarray, species: np.ndarray) -> np.ndarray:
+    """
+    Vectorized naslund_height over arrays of diameters and TreeSpecies codes, with NaN heights where the diameter is
+    not positive.
+
+    :param diameters: diameters of the trees at 1.3m height
+    :param species: species codes of the trees as TreeSpecies values, -1 for trees without species
+    :return estimated heights of the trees in meters
+    """
+    diameters = np.asarray(diameters, dtype=float)
+    species = np.asarray(species, dtype=np.int64)
+    pine_or_other_coniferous = np.isin(species, _naslund_pine_or_other_coniferous_codes)
+    spruce = species == TreeSpecies.SPRUCE
+    # exponent and the two parameters of each tree by its species group, other species by default
+    exponent = np.where(spruce, 3.0, 2.0)
+    a = np.select([pine_or_other_coniferous, spruce], [0.894, 1.811], 0.898)
+    b = np.select([pine_or_other_coniferous, spruce], [0.185, 0.308], 0.242)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        height = np.round((diameters ** exponent) / (a + b * diameters) ** exponent + 1.3, 2)
+    return np.where(diameters > 0, height, np.nan)
+
+
+def supplement_naslund_heights(trees: typing.Iterable[ReferenceTree]):
+    """Fill the missing heights of given reference trees with the Näslund height model in a single array call"""
+    missing = [tree for tree in trees if (tree.height or 0) <= 0]
+    if not missing:
+        return
+    heights = naslund_height_array(
+        [tree.breast_height_diameter for tree in missing],
+        [-1 if tree.species is None else tree.species for tree in missing])
+    for tree, height in zip(missing, heights.tolist()):
+        tree.height = None if math.isnan(height) else height
+
+
+def species_codes(species: typing.Sequence) -> np.ndarray:
+    """Integer codes of a column of species, -1 for missing species"""
+    return np.array([-1 if value is None else value for value in np.asarray(species, dtype=object).tolist()],
+                    dtype=np.int64)
+
+
+def _greater_than(values: typing.Sequence, limit: float) -> np.ndarray:
+    """Whether each value of a column is greater than limit, False for missing values"""
+    return np.array([value is not None and value > limit for value in np.asarray(values, dtype=object).tolist()],
+                    dtype=bool)
+
+
+def supplement_naslund_height_column(heights: typing.Sequence, diameters: typing.Sequence,
+                                     species: typing.Sequence) -> np.ndarray:
+    """Columnar supplement_naslund_heights, returning an object array of given heights with the missing ones filled"""
+    result = np.array(heights, dtype=object)
+    missing = ~_greater_than(result, 0)
+    estimates = naslund_height_array(np.asarray(diameters, dtype=float)[missing], species_codes(species)[missing])
+    result[missing] = [None if math.isnan(height) else height for height in estimates.tolist()]
+    return result
+
+
 STRATUM_SUPPLEMENT = 1
 INITIAL_TREE_SUPPLEMENT = 2
 SAME_TREE_DIAMETER_SUPPLEMENT = 3
@@ -211,6 +276,61 @@ def solve_supplement_strategy(no_age_trees: typing.List[ReferenceTree],
     return supplement_strategies
 
 
+class AgeSupplementIndex:
+    """
+    Species keyed indexes of the aged reference trees and tree strata of a stand, built once for resolving the age
+    supplementing of all trees of the stand without scanning the aged trees and strata for each of them. Strategies
+    and supplement sources are identical to those of solve_supplement_strategy and perform_supplementing.
+
+    The stratum supplement of a tree is the diameter override fold of solve_stratum_supplement over the aged strata
+    of its species in source order. The fold depends on the order of the strata, so it is kept over the species
+    specific list and memoized by tree species and diameter.
+    """
+
+    def __init__(self, age_trees: typing.List[ReferenceTree], age_stratums: typing.List[TreeStratum]):
+        self.stratums_by_species: typing.Dict[typing.Any, typing.List[TreeStratum]] = {}
+        self.species_with_diameter_stratum = set()
+        for stratum in age_stratums:
+            if stratum.species is not None:
+                self.stratums_by_species.setdefault(stratum.species, []).append(stratum)
+                if stratum.has_diameter():
+                    self.species_with_diameter_stratum.add(stratum.species)
+        self.first_tree_by_species: typing.Dict[typing.Any, ReferenceTree] = {}
+        self.first_tree_by_identifier: typing.Dict[str, ReferenceTree] = {}
+        for tree in age_trees:
+            if tree.species is not None:
+                self.first_tree_by_species.setdefault(tree.species, tree)
+            self.first_tree_by_identifier.setdefault(tree.identifier, tree)
+        self._stratum_supplements: typing.Dict[tuple, TreeStratum] = {}
+
+    def strategy(self, reference_tree: ReferenceTree) -> SupplementStrategy:
+        """The supplement strategy of a tree with no age, in the priority order of solve_supplement_strategy"""
+        if reference_tree.species in self.species_with_diameter_stratum:
+            strategy = SupplementStrategy(reference_tree)
+            strategy.solved = True
+            strategy.strategy = STRATUM_SUPPLEMENT
+            return strategy
+        age_tree = None if reference_tree.species is None else self.first_tree_by_species.get(reference_tree.species)
+        if age_tree is not None:
+            strategy = SupplementStrategy(reference_tree)
+            strategy.solved = True
+            strategy.strategy = INITIAL_TREE_SUPPLEMENT
+            strategy.tree_identifier = age_tree.identifier
+            return strategy
+        return final_tree_strategy(reference_tree)
+
+    def supplement_stratum(self, reference_tree: ReferenceTree) -> TreeStratum:
+        key = (reference_tree.species, reference_tree.breast_height_diameter)
+        stratum = self._stratum_supplements.get(key)
+        if stratum is None:
+            stratum = solve_stratum_supplement(reference_tree, self.stratums_by_species[reference_tree.species])
+            self._stratum_supplements[key] = stratum
+        return stratum
+
+    def supplement_tree(self, tree_identifier: str) -> ReferenceTree:
+        return self.first_tree_by_identifier[tree_identifier]
+
+
 def supplement_age_for_reference_trees(reference_trees: typing.List[ReferenceTree],
                                        stratums: typing.List[TreeStratum]) -> typing.List[ReferenceTree]:
     """ 
@@ -219,10 +339,134 @@ def supplement_age_for_reference_trees(reference_trees: typing.List[ReferenceTre
     Supplementing of reference trees that have no d13 age.
     Supplementing happens from subsets of stratums and trees that have d13 age.
     Based on a priority a strategy to supplement is selected and supplementing is performed.
+
+    The trees and strata are partitioned in a single pass and the strategies resolved with an AgeSupplementIndex,
+    with results identical to solve_supplement_strategy and perform_supplementing.
     """
-    no_age_trees = list(filter(lambda t: t.breast_height_age == 0.0 and t.has_height_over_130_cm(), reference_trees))
-    age_trees = list(filter(lambda t: t.breast_height_age > 0.0, reference_trees))
-    age_stratums = list(filter(lambda s: s.breast_height_age > 0.0, stratums))
-    trees_and_strategies = solve_supplement_strategy(no_age_trees, age_trees, age_stratums)
-    return perform_supplementing(trees_and_strategies, age_trees, age_stratums)
+    no_age_trees = []
+    age_trees = []
+    for tree in reference_trees:
+        if tree.breast_height_age == 0.0:
+            if tree.has_height_over_130_cm():
+                no_age_trees.append(tree)
+        elif tree.breast_height_age > 0.0:
+            age_trees.append(tree)
+    age_stratums = [stratum for stratum in stratums if stratum.breast_height_age > 0.0]
+    if not no_age_trees:
+        return no_age_trees
+    index = AgeSupplementIndex(age_trees, age_stratums)
+    trees_and_strategies = []
+    for rt in no_age_trees:
+        strategy = index.strategy(rt)
+        if not strategy.solved:
+            raise UserWarning('error: supplement strategy for tree number' + str(rt.identifier) + ' can not be solved')
+        trees_and_strategies.append((rt, strategy))
+    for rt, strategy in trees_and_strategies:
+        if strategy.strategy is STRATUM_SUPPLEMENT:
+            source = index.supplement_stratum(rt)
+        elif strategy.strategy is INITIAL_TREE_SUPPLEMENT:
+            source = index.supplement_tree(strategy.tree_identifier)
+        else:
+            perform_supplementing([(rt, strategy)], age_trees, age_stratums)
+            continue
+        rt.breast_height_age = source.breast_height_age
+        rt.biological_age = source.biological_age
+    return no_age_trees
     # TODO: Remove zero stem stratums. See vmi-data-converter issue #55.
+
+
+def _lookup(group_keys: np.ndarray, keys: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Positions of keys in sorted group_keys and whether each key was found"""
+    positions = np.searchsorted(group_keys, keys)
+    found = positions < len(group_keys)
+    found[found] = group_keys[positions[found]] == keys[found]
+    return np.where(found, positions, 0), found
+
+
+def supplement_age_columns(trees: typing.Mapping[str, np.ndarray],
+                           strata: typing.Mapping[str, np.ndarray]) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Columnar supplement_age_for_reference_trees over the reference trees and tree strata of any number of stands.
+    The arrays are keyed by the model property names, with the stand of each row in 'stand_index'. Trees and strata
+    are grouped by stand and species and the strategies of solve_supplement_strategy applied as array operations,
+    with results identical to supplement_age_for_reference_trees on the trees and strata of each stand in row order.
+
+    return: new breast height age and biological age arrays of the trees
+    """
+    tree_stand = np.asarray(trees['stand_index'], dtype=np.int64)
+    tree_species = species_codes(trees['species'])
+    diameter = np.asarray(trees['breast_height_diameter'], dtype=float)
+    breast_height_age = np.array(trees['breast_height_age'], dtype=object)
+    biological_age = np.array(trees['biological_age'], dtype=object)
+    ages = breast_height_age.astype(float)
+    no_age = np.flatnonzero((ages == 0.0) & _greater_than(trees['height'], 1.3))
+    if len(no_age) == 0:
+        return breast_height_age, biological_age
+    stratum_stand = np.asarray(strata['stand_index'], dtype=np.int64)
+    stratum_species = species_codes(strata['species'])
+    width = max(tree_species.max(initial=0), stratum_species.max(initial=0)) + 1
+    target = tree_stand[no_age] * width + tree_species[no_age]
+    has_species = tree_species[no_age] >= 0
+
+    # aged strata ordered by stand and species, in row order within each
+    aged = np.flatnonzero((np.asarray(strata['breast_height_age'], dtype=float) > 0.0) & (stratum_species >= 0))
+    aged = aged[np.lexsort((stratum_species[aged], stratum_stand[aged]))]
+    stratum_diameter = np.asarray(strata['mean_diameter'], dtype=float)[aged]
+    stratum_keys, starts, sizes = np.unique(stratum_stand[aged] * width + stratum_species[aged],
+                                            return_index=True, return_counts=True)
+    has_diameter = stratum_diameter > 0.0
+    group_has_diameter = np.logical_or.reduceat(has_diameter, starts) if len(starts) else has_diameter
+    stratum_group, found = _lookup(stratum_keys, target)
+    by_stratum = found & has_species
+    by_stratum[by_stratum] = group_has_diameter[stratum_group[by_stratum]]
+
+    # initial tree supplement from the first aged tree of the same species, located by its identifier
+    aged_trees = np.flatnonzero(ages > 0.0)
+    with_species = aged_trees[tree_species[aged_trees] >= 0]
+    tree_keys, first = np.unique(tree_stand[with_species] * width + tree_species[with_species], return_index=True)
+    tree_group, found = _lookup(tree_keys, target)
+    by_tree = ~by_stratum & found & has_species
+    _, identifier_codes = np.unique(np.asarray(trees['identifier'], dtype=str), return_inverse=True)
+    identifier_width = identifier_codes.max(initial=0) + 1
+    identifier_keys, first_with_identifier = np.unique(
+        tree_stand[aged_trees] * identifier_width + identifier_codes[aged_trees], return_index=True)
+    donors = with_species[first[tree_group[by_tree]]]
+    donors = aged_trees[first_with_identifier[_lookup(
+        identifier_keys, tree_stand[donors] * identifier_width + identifier_codes[donors])[0]]]
+
+    # trees without age are over 1.3 m high, so the final strategy is the diameter supplement or none
+    final = ~by_stratum & ~by_tree
+    has_biological_age = _greater_than(biological_age[no_age], 0.0)
+    unsolved = final & has_biological_age
+    if unsolved.any():
+        rows = no_age[unsolved]
+        rt = rows[np.lexsort((rows, tree_stand[rows]))[0]]
+        raise UserWarning('error: supplement strategy for tree number' + str(trees['identifier'][rt]) +
+                          ' can not be solved')
+
+    # diameter override fold of solve_stratum_supplement over the strata of each group, a stratum rank at a time
+    rows = no_age[by_stratum]
+    start, size = starts[stratum_group[by_stratum]], sizes[stratum_group[by_stratum]]
+    supplement = start.copy()
+    for rank in range(1, size.max(initial=1)):
+        active = np.flatnonzero(size > rank)
+        current = start[active] + rank
+        initial_diameter, current_diameter = stratum_diameter[supplement[active]], stratum_diameter[current]
+        high, low = np.maximum(initial_diameter, current_diameter), np.minimum(initial_diameter, current_diameter)
+        # strata without diameter are masked out by has_diameter below
+        with np.errstate(divide='ignore', invalid='ignore'):
+            threshold = high + (low - high) * (high / (low + high))
+        override = has_diameter[current] & (threshold > diameter[rows[active]])
+        supplement[active] = np.where(override, current, supplement[active])
+    sources = aged[supplement]
+    breast_height_age[rows] = np.asarray(strata['breast_height_age'], dtype=object)[sources]
+    biological_age[rows] = np.asarray(strata['biological_age'], dtype=object)[sources]
+
+    rows = no_age[by_tree]
+    breast_height_age[rows] = breast_height_age[donors]
+    biological_age[rows] = biological_age[donors]
+
+    rows = no_age[final]
+    breast_height_age[rows] = 2 * diameter[rows]
+    biological_age[rows] = 9 + 2 * diameter[rows]
+    return breast_height_age, biological_age
@@ -1,10 +1,11 @@
-from typing import Optional, Tuple, Sequence
+from typing import Callable, Optional, Tuple, Sequence
 from datetime import datetime as dt
 
+import numpy as np
+
+from lukefi.metsi.data.formats import geo_util
 from lukefi.metsi.data.formats.util import get_or_default, parse_float, parse_int
 from lukefi.metsi.data.formats.vmi_const import vmi12_county_areas, vmi13_county_areas, VMI12StandIndices, VMI13StandIndices
-from shapely.geometry import Point
-from geopandas import GeoSeries
 
 
 def determine_area_factors(small_tree_sourcevalue: str, big_tree_sourcevalue: str) -> Tuple[float, float]:
@@ -287,9 +288,23 @@ def convert_vmi12_geolocation(lat_source: str, lon_source: str) -> Tuple[float,
     :param lon_source: EPSG:2393 longitude
     :return: lat, lon tuple in EPSG:3067
     """
-    point = GeoSeries([Point(parse_float(lon_source), parse_float(lat_source))], crs='EPSG:2393')
-    point = point.to_crs(3067)
-    return round(point.centroid.y[0]), round(point.centroid.x[0])
+    lat, lon = convert_vmi12_geolocations([lat_source], [lon_source])
+    return round(lat[0]), round(lon[0])
+
+
+def convert_vmi12_geolocations(lat_sources: Sequence[str], lon_sources: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert sequences of VMI12 coordinates in EPSG:2393 to EPSG:3067 in a single transformation. Return values are
+    rounded to meter precision.
+    :param lat_sources: EPSG:2393 latitudes
+    :param lon_sources: EPSG:2393 longitudes
+    :return: lat, lon arrays in EPSG:3067
+    """
+    lat, lon = geo_util.transform_coordinates(
+        [parse_float(source) for source in lat_sources],
+        [parse_float(source) for source in lon_sources],
+        'EPSG:2393', 'EPSG:3067')
+    return np.rint(lat), np.rint(lon)
 
 
 def convert_vmi12_approximate_geolocation(lat_source: str, lon_source: str) -> Tuple[float, float]:
@@ -316,6 +331,100 @@ def parse_vmi13_date(date_string: str) -> dt:
     return dt.strptime(date_string, '%Y%m%d')
 
 
+_month_days = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def vmi12_century(two_digit_year: int) -> int:
+    """Full year of a two digit VMI12 year, with the pivot of strptime %y: 69-99 are 1900s and 00-68 2000s"""
+    return two_digit_year + (1900 if two_digit_year >= 69 else 2000)
+
+
+def validate_date(year: int, month: int, day: int, date_string: str):
+    """Raise ValueError for a month or day out of range, as strptime does"""
+    leap_day = month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    if not 1 <= month <= 12 or not 1 <= day <= _month_days[month] + leap_day:
+        raise ValueError(f"Invalid VMI date '{date_string}'")
+
+
+def _is_date_digits(date_string: str, length: int) -> bool:
+    return len(date_string) == length and date_string.isascii() and date_string.isdigit()
+
+
+def parse_vmi12_year(date_string: str) -> int:
+    """
+    The year of VMI12 date source format ddmmyy, validated like parse_vmi12_date but without strptime. Dates other
+    than six digits, such as the unpadded days and months strptime accepts, are parsed with parse_vmi12_date.
+    """
+    if not _is_date_digits(date_string, 6):
+        return parse_vmi12_date(date_string).year
+    year = vmi12_century(int(date_string[4:6]))
+    validate_date(year, int(date_string[2:4]), int(date_string[0:2]), date_string)
+    return year
+
+
+def parse_vmi13_year(date_string: str) -> int:
+    """
+    The year of VMI13 date source format yyyymmdd, validated like parse_vmi13_date but without strptime. Dates other
+    than eight digits, such as the unpadded days and months strptime accepts, are parsed with parse_vmi13_date.
+    """
+    if not _is_date_digits(date_string, 8):
+        return parse_vmi13_date(date_string).year
+    year = int(date_string[0:4])
+    validate_date(year, int(date_string[4:6]), int(date_string[6:8]), date_string)
+    return year
+
+
+def _date_column_digits(dates: np.ndarray, length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The digits of a column of date strings as a 2-D integer array, and a mask of the dates of exactly length ASCII
+    digits. The digits of other dates are left zero.
+    """
+    digits = np.zeros((len(dates), length), dtype=np.int64)
+    if len(dates) == 0:
+        return digits, np.zeros(0, dtype=bool)
+    fixed = np.char.str_len(dates) == length
+    codes = dates[fixed].astype(f'U{length}').view(np.uint32).reshape(-1, length).astype(np.int64) - ord('0')
+    digits[fixed] = codes
+    fixed[fixed] = ((codes >= 0) & (codes <= 9)).all(axis=1)
+    return digits, fixed
+
+
+def _validate_date_columns(year: np.ndarray, month: np.ndarray, day: np.ndarray, date_strings: Sequence[str]):
+    leap_day = (month == 2) & (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = np.asarray(_month_days)[np.clip(month, 0, 12)] + leap_day
+    valid = (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+    if not valid.all():
+        raise ValueError(f"Invalid VMI date '{np.asarray(date_strings)[~valid][0]}'")
+
+
+def _date_column_years(dates: np.ndarray, fixed: np.ndarray, year: np.ndarray, month: np.ndarray, day: np.ndarray,
+                       parse_year: Callable[[str], int]) -> np.ndarray:
+    """Validated years of the fixed width dates, with the other dates parsed one by one with parse_year"""
+    _validate_date_columns(year[fixed], month[fixed], day[fixed], dates[fixed])
+    if not fixed.all():
+        year[~fixed] = [parse_year(date) for date in dates[~fixed].tolist()]
+    return year
+
+
+def parse_vmi12_year_array(date_strings: Sequence[str]) -> np.ndarray:
+    """Vectorized parse_vmi12_year of a column of VMI12 ddmmyy dates into an integer array of years"""
+    dates = np.asarray(date_strings, dtype=str)
+    digits, fixed = _date_column_digits(dates, 6)
+    two_digit_year = digits[:, 4] * 10 + digits[:, 5]
+    year = two_digit_year + np.where(two_digit_year >= 69, 1900, 2000)
+    return _date_column_years(dates, fixed, year, digits[:, 2] * 10 + digits[:, 3], digits[:, 0] * 10 + digits[:, 1],
+                              parse_vmi12_year)
+
+
+def parse_vmi13_year_array(date_strings: Sequence[str]) -> np.ndarray:
+    """Vectorized parse_vmi13_year of a column of VMI13 yyyymmdd dates into an integer array of years"""
+    dates = np.asarray(date_strings, dtype=str)
+    digits, fixed = _date_column_digits(dates, 8)
+    year = digits[:, :4] @ np.array([1000, 100, 10, 1])
+    return _date_column_years(dates, fixed, year, digits[:, 4] * 10 + digits[:, 5], digits[:, 6] * 10 + digits[:, 7],
+                              parse_vmi13_year)
+
+
 def transform_vmi12_height_above_sea_level(sourcevalue: str) -> float or None:
     """
     Transform given VMI12 number value string from desimeters to meters.
@@ -564,6 +673,27 @@ def determine_tree_age_values(
     return chest_height_age, computed_age
 
 
+def _parse_column(sources: Sequence[str], parser, default, dtype) -> np.ndarray:
+    """Parse a column of source values once per unique value, with the default for unparseable values"""
+    values, inverse = np.unique(np.asarray(sources, dtype=str), return_inverse=True)
+    return np.array([get_or_default(parser(value), default) for value in values.tolist()], dtype=dtype)[inverse]
+
+
+def determine_tree_age_values_array(
+        chest_height_age_sources: Sequence[str],
+        age_increase_sources: Sequence[str],
+        total_age_sources: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized determine_tree_age_values of source value columns into integer arrays of the two ages"""
+    chest_height_age = _parse_column(chest_height_age_sources, parse_int, 0, np.int64)
+    age_increase = _parse_column(age_increase_sources, parse_int, 0, np.int64)
+    total_age = _parse_column(total_age_sources, parse_int, 0, np.int64)
+    computed_age = np.select(
+        [total_age > 0, age_increase > 0, chest_height_age > 0],
+        [total_age, chest_height_age + age_increase, chest_height_age + 9],
+        0)
+    return chest_height_age, computed_age
+
+
 def determine_tree_management_category(sourcevalue: str) -> int:
     return 2 if sourcevalue.lower() in ('b', 'c', 'd', 'e', 'f', 'g') else 1
 
@@ -680,3 +810,29 @@ def determine_stratum_age_values(biological_age_source: str,
         computational_age = 0.0
 
     return (computational_age, breast_height_age)
+
+
+def determine_stratum_age_values_array(biological_age_sources: Sequence[str],
+                                       breast_height_age_sources: Sequence[str],
+                                       heights: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized determine_stratum_age_values of source value columns and stratum heights into float arrays of the
+    biological and breast height ages
+    """
+    computational_age = _parse_column(biological_age_sources, parse_float, 0.0, float)
+    breast_height_age = _parse_column(breast_height_age_sources, parse_float, 0.0, float)
+    height = np.asarray(heights, dtype=float)
+    height_age = 1.4 * height
+    no_age = computational_age == 0
+    from_breast_height_age = no_age & (breast_height_age > 0)
+    from_height = no_age & (breast_height_age == 0) & (height > 0)
+    over_130_cm = height > 1.3
+    from_height_and_age = (computational_age > 0) & (breast_height_age == 0) & over_130_cm
+    biological_age = np.select(
+        [from_breast_height_age, from_height & over_130_cm, from_height, from_height_and_age, computational_age > 0],
+        [breast_height_age + 9, np.round(height_age + 8, 0), np.round(height_age, 0),
+         np.round(height_age + computational_age, 0), computational_age + breast_height_age],
+        0.0)
+    breast_height_age = np.where((from_height & over_130_cm) | from_height_and_age,
+                                 np.round(height_age, 0), breast_height_age)
+    return biological_age, breast_height_age
@@ -0,0 +1,76 @@
+"""
+Parser backends for Forest Centre XML. The lxml backend is used when lxml is installed, otherwise parsing falls back
+to the standard library ElementTree. Both backends present elements with the ElementTree API, so the parsed elements
+are interchangeable for smk_util and ForestCentreBuilder.
+"""
+import os
+import typing
+import xml.etree.ElementTree as ET
+
+from lukefi.metsi.data.formats.smk_util import NS
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+ElementFinder = typing.Callable[[typing.Any], typing.List[typing.Any]]
+
+
+class ElementTreeBackend:
+    """ Standard library xml.etree.ElementTree backend. Paths are evaluated with Element.findall. """
+    name = 'etree'
+
+    def fromstring(self, data: typing.Union[str, bytes]):
+        return ET.fromstring(data)
+
+    def iterparse(self, source, events: typing.Tuple[str, ...]):
+        return ET.iterparse(source, events=events)
+
+    def xpath(self, path: str) -> ElementFinder:
+        return lambda element: element.findall(path, NS)
+
+
+class LxmlBackend:
+    """ lxml backend. Paths are compiled once into etree.XPath objects. """
+    name = 'lxml'
+
+    def __init__(self):
+        if etree is None:
+            raise ImportError("The lxml XML backend requires the lxml package")
+        self.parser = etree.XMLParser(remove_comments=True, remove_pis=True)
+        # unicode input with an encoding declaration is refused by lxml, so text is parsed as utf-8 bytes
+        self.text_parser = etree.XMLParser(encoding='utf-8', remove_comments=True, remove_pis=True)
+
+    def fromstring(self, data: typing.Union[str, bytes]):
+        if isinstance(data, str):
+            return etree.fromstring(data.encode('utf-8'), self.text_parser)
+        return etree.fromstring(data, self.parser)
+
+    def iterparse(self, source, events: typing.Tuple[str, ...]):
+        if isinstance(source, os.PathLike):
+            source = os.fspath(source)
+        return etree.iterparse(source, events=events, remove_comments=True, remove_pis=True)
+
+    def xpath(self, path: str) -> ElementFinder:
+        return etree.XPath(path, namespaces=NS)
+
+
+backends = {
+    ElementTreeBackend.name: ElementTreeBackend,
+    LxmlBackend.name: LxmlBackend,
+}
+
+
+def get_backend(name: typing.Optional[str] = None):
+    """
+    XML parser backend by name, 'lxml' or 'etree'. Without a name lxml is used when it is installed.
+
+    :raises ValueError: for an unknown backend name
+    :raises ImportError: when the lxml backend is requested and lxml is not installed
+    """
+    if name is None:
+        name = ElementTreeBackend.name if etree is None else LxmlBackend.name
+    if name not in backends:
+        raise ValueError(f"Unknown XML backend '{name}', expected one of {', '.join(backends)}")
+    return backends[name]()
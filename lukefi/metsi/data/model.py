@@ -5,7 +5,8 @@ from dataclasses import dataclass
 from lukefi.metsi.data.conversion.internal2mela import mela_stand, mela_tree
 from lukefi.metsi.data.enums.internal import LandUseCategory, OwnerCategory, SiteType, SoilPeatlandCategory, TreeSpecies, DrainageCategory
 from lukefi.metsi.data.enums.mela import MelaLandUseCategory
-from lukefi.metsi.data.formats.util import convert_str_to_type
+from functools import cache
+from lukefi.metsi.data.formats.util import compile_row_decoder, enum_converter
 from lukefi.metsi.data.layered_model import LayeredObject
 from lukefi.metsi.data.soa import Soable
 
@@ -186,31 +187,36 @@ class TreeStratum():
             self.sapling_stratum,
         ]
 
+    # csv row layout after the row type as (property name, column count, converter)
+    csv_row_layout = (
+        ("identifier", 1, None),
+        ("species", 1, enum_converter(TreeSpecies)),
+        ("origin", 1, None),
+        ("stems_per_ha", 1, None),
+        ("mean_diameter", 1, None),
+        ("mean_height", 1, None),
+        ("breast_height_age", 1, None),
+        ("biological_age", 1, None),
+        ("basal_area", 1, None),
+        ("saw_log_volume_reduction_factor", 1, None),
+        ("cutting_year", 1, None),
+        ("age_when_10cm_diameter_at_breast_height", 1, None),
+        ("tree_number", 1, None),
+        ("stand_origin_relative_position", 3, None),
+        ("lowest_living_branch_height", 1, None),
+        ("management_category", 1, None),
+        ("sapling_stems_per_ha", 1, None),
+        ("sapling_stratum", 1, None),
+    )
+
+    @classmethod
+    @cache
+    def csv_row_decoder(cls):
+        return compile_row_decoder(cls, cls.csv_row_layout, offset=1)
+
     @classmethod
     def from_csv_row(cls, row) -> "TreeStratum":
-        def conv(value, property_name):
-            return convert_str_to_type(cls, value, property_name)
-
-        result = cls()
-        result.identifier = conv(row[1], "identifier")
-        result.species = TreeSpecies[row[2].split(".")[1]]
-        result.origin = conv(row[3], "origin")
-        result.stems_per_ha = conv(row[4], "stems_per_ha")
-        result.mean_diameter = conv(row[5], "mean_diameter")
-        result.mean_height = conv(row[6], "mean_height")
-        result.breast_height_age = conv(row[7], "breast_height_age")
-        result.biological_age = conv(row[8], "biological_age")
-        result.basal_area = conv(row[9], "basal_area")
-        result.saw_log_volume_reduction_factor = conv(row[10], "saw_log_volume_reduction_factor")
-        result.cutting_year = conv(row[11], "cutting_year")
-        result.age_when_10cm_diameter_at_breast_height = conv(row[12], "age_when_10cm_diameter_at_breast_height")
-        result.tree_number = conv(row[13], "tree_number")
-        result.stand_origin_relative_position = conv((row[14],row[15],row[16]),  "stand_origin_relative_position")
-        result.lowest_living_branch_height = conv(row[17], "lowest_living_branch_height")
-        result.management_category = conv(row[18], "management_category")
-        result.sapling_stems_per_ha = conv(row[19], "sapling_stems_per_ha")
-        result.sapling_stratum = conv(row[20], "sapling_stratum")
-        return result
+        return cls.csv_row_decoder()(row)
 
 @dataclass
 class ReferenceTree():
@@ -325,37 +331,44 @@ class ReferenceTree():
             self.sapling
         ]
 
+    # csv row layout after the row type as (property name, column count, converter)
+    csv_row_layout = (
+        ("identifier", 1, None),
+        ("species", 1, enum_converter(TreeSpecies)),
+        ("origin", 1, None),
+        ("stems_per_ha", 1, None),
+        ("breast_height_diameter", 1, None),
+        ("height", 1, None),
+        ("breast_height_age", 1, None),
+        ("biological_age", 1, None),
+        ("saw_log_volume_reduction_factor", 1, None),
+        ("pruning_year", 1, None),
+        ("age_when_10cm_diameter_at_breast_height", 1, None),
+        ("tree_number", 1, None),
+        ("stand_origin_relative_position", 3, None),
+        ("lowest_living_branch_height", 1, None),
+        ("management_category", 1, None),
+        ("tree_category", 1, None),
+        ("sapling", 1, None),
+    )
+
+    @classmethod
+    @cache
+    def csv_row_decoder(cls):
+        return compile_row_decoder(cls, cls.csv_row_layout, offset=1)
+
     @classmethod
     def from_csv_row(cls, row) -> "ReferenceTree":
-        def conv(value, property_name):
-            return convert_str_to_type(cls, value, property_name)
-        result = cls()
-        result.identifier = conv(row[1], "identifier")
-        result.species = TreeSpecies[row[2].split(".")[1]]
-        result.origin = conv(row[3], "origin")
-        result.stems_per_ha = conv(row[4], "stems_per_ha")
-        result.breast_height_diameter = conv(row[5], "breast_height_diameter")
-        result.height = conv(row[6], "height")
-        result.breast_height_age = conv(row[7], "breast_height_age")
-        result.biological_age = conv(row[8], "biological_age")
-        result.saw_log_volume_reduction_factor = conv(row[9], "saw_log_volume_reduction_factor")
-        result.pruning_year = conv(row[10], "pruning_year")
-        result.age_when_10cm_diameter_at_breast_height = conv(row[11], "age_when_10cm_diameter_at_breast_height")
-        result.tree_number = conv(row[12], "tree_number")
-        result.stand_origin_relative_position = conv((
-            row[13],
-            row[14],
-            row[15],
-        ), "stand_origin_relative_position")
-        result.lowest_living_branch_height = conv(row[16], "lowest_living_branch_height")
-        result.management_category = conv(row[17], "management_category")
-        result.tree_category = conv(row[18], "tree_category")
-        result.sapling = conv(row[19], "sapling")
-        return result
+        return cls.csv_row_decoder()(row)
 
 
     def as_rsd_row(self):
-        melaed = mela_tree(self)
+        return mela_tree(self).as_mela_rsd_row()
+
+
+    def as_mela_rsd_row(self):
+        """RSD tree record of a tree already converted to the Mela value space"""
+        melaed = self
         saw_log_volume_reduction_factor = (
             -1
             if melaed.saw_log_volume_reduction_factor is None
@@ -557,61 +570,70 @@ class ForestStand():
             self.stand_id,
         ]
 
-    def from_row(self, row):
+    # row layout of as_internal_row as (property name, column count, converter)
+    row_layout = (
+        ("management_unit_id", 1, None),
+        ("year", 1, None),
+        ("area", 1, None),
+        ("area_weight", 1, None),
+        ("geo_location", 4, None),
+        ("degree_days", 1, None),
+        ("owner_category", 1, None),
+        ("land_use_category", 1, None),
+        ("soil_peatland_category", 1, None),
+        ("site_type_category", 1, None),
+        ("tax_class_reduction", 1, None),
+        ("tax_class", 1, None),
+        ("drainage_category", 1, None),
+        ("drainage_feasibility", 1, None),
+        ("drainage_year", 1, None),
+        ("fertilization_year", 1, None),
+        ("soil_surface_preparation_year", 1, None),
+        ("natural_regeneration_feasibility", 1, None),
+        ("regeneration_area_cleaning_year", 1, None),
+        ("development_class", 1, None),
+        ("artificial_regeneration_year", 1, None),
+        ("young_stand_tending_year", 1, None),
+        ("pruning_year", 1, None),
+        ("cutting_year", 1, None),
+        ("forestry_centre_id", 1, None),
+        ("forest_management_category", 1, None),
+        ("method_of_last_cutting", 1, None),
+        ("municipality_id", 1, None),
+        ("fra_category", 1, None),
+        ("land_use_category_detail", 1, None),
+        ("auxiliary_stand", 1, None),
+        ("stems_per_ha_scaling_factors", 2, None),
+        ("stand_id", 1, None),
+    )
 
-        def conv(value, property_name):
-            return convert_str_to_type(self, value, property_name)
-
-        self.management_unit_id = conv(row[0], "management_unit_id")
-        self.year = conv(row[1], "year")
-        self.area = conv(row[2], "area")
-        self.area_weight = conv(row[3], "area_weight")
-        self.geo_location = conv((
-            row[4],
-            row[5],
-            row[6],
-            row[7],
-        ), "geo_location")
-        self.degree_days = conv(row[8], "degree_days")
-        self.owner_category = conv(row[9], "owner_category")
-        self.land_use_category = conv(row[10], "land_use_category")
-        self.soil_peatland_category = conv(row[11], "soil_peatland_category")
-        self.site_type_category = conv(row[12], "site_type_category")
-        self.tax_class_reduction = conv(row[13], "tax_class_reduction")
-        self.tax_class = conv(row[14], "tax_class")
-        self.drainage_category = conv(row[15], "drainage_category")
-        self.drainage_feasibility = conv(row[16], "drainage_feasibility")
-        self.drainage_year = conv(row[17], "drainage_year")
-        self.fertilization_year = conv(row[18], "fertilization_year")
-        self.soil_surface_preparation_year = conv(row[19], "soil_surface_preparation_year")
-        self.natural_regeneration_feasibility = conv(row[20], "natural_regeneration_feasibility")
-        self.regeneration_area_cleaning_year = conv(row[21], "regeneration_area_cleaning_year")
-        self.development_class = conv(row[22], "development_class")
-        self.artificial_regeneration_year = conv(row[23], "artificial_regeneration_year")
-        self.young_stand_tending_year = conv(row[24], "young_stand_tending_year")
-        self.pruning_year = conv(row[25], "pruning_year")
-        self.cutting_year = conv(row[26], "cutting_year")
-        self.forestry_centre_id = conv(row[27], "forestry_centre_id")
-        self.forest_management_category = conv(row[28], "forest_management_category")
-        self.method_of_last_cutting = conv(row[29], "method_of_last_cutting")
-        self.municipality_id = conv(row[30], "municipality_id")
-        self.fra_category = conv(row[31], "fra_category")
-        self.land_use_category_detail = conv(row[32], "land_use_category_detail")
-        self.auxiliary_stand = conv(row[33], "auxiliary_stand")
-        self.stems_per_ha_scaling_factors = conv((row[34], row[35]), "stems_per_ha_scaling_factors")
-        self.stand_id = conv(row[36], "stand_id")
+    @classmethod
+    @cache
+    def row_decoder(cls):
+        return compile_row_decoder(cls, cls.row_layout)
+
+    @classmethod
+    @cache
+    def csv_row_decoder(cls):
+        """decoder of csv rows, with the identifier after the row type taken as is"""
+        return compile_row_decoder(cls, (("identifier", 1, lambda value: value),) + cls.row_layout, offset=1)
+
+    def from_row(self, row):
+        self.row_decoder()(row, self)
 
 
     @classmethod
     def from_csv_row(cls, row) -> "ForestStand":
-        stand = cls()
-        stand.identifier = row[1]
-        stand.from_row(row[2:])
-        return stand
+        return cls.csv_row_decoder()(row)
 
 
     def as_rsd_row(self):
-        melaed = mela_stand(self)
+        return mela_stand(self, reference_trees=False, tree_strata=False).as_mela_rsd_row()
+
+
+    def as_mela_rsd_row(self):
+        """RSD stand record of a stand already converted to the Mela value space"""
+        melaed = self
         forestry_centre_id = (
             -1 if melaed.forestry_centre_id is None else melaed.forestry_centre_id
         )
@@ -1,7 +1,12 @@
 """
 NOTE: this test suite has been intentionally duplicated from `forestry-function-library` and the implementation here should follow the source. 
 """
+import copy
+import random
 import unittest
+import warnings
+
+import numpy as np
 from lukefi.metsi.data.formats import vmi_supplementing as age_sup
 from lukefi.metsi.data.model import TreeStratum, ReferenceTree
 from collections import namedtuple
@@ -223,3 +228,96 @@ class TestAgeSupplementing(unittest.TestCase):
         # test that the sapling 002-002-02-1-01-tree is not included in results
         result = [tree for tree in result if tree.identifier == input_trees[0].identifier]
         self.assertEqual(0, len(result))
+
+    def test_supplement_age_for_reference_trees_parity(self):
+        rng = random.Random(7)
+        species = [None, 1, 2, 3, 4]
+        for _ in range(300):
+            tree_values = [
+                Input(f'tree-{rng.randint(0, 6)}', rng.choice(species), rng.choice([0.0, 4.0, 9.5, 13.0, 21.0]),
+                      rng.choice([0.0, 0.0, 12.0, 35.0]), rng.choice([None, 0.0, 20.0, 45.0]),
+                      rng.choice([None, 1.2, 1.3, 6.0, 14.0]))
+                for _ in range(rng.randint(0, 12))
+            ]
+            stratum_values = [
+                Input(f'stratum-{i}', rng.choice(species), rng.choice([None, 0.0, 6.0, 11.0, 18.0, 25.0]),
+                      rng.choice([0.0, 15.0, 40.0]), rng.choice([None, 25.0, 50.0]), None)
+                for i in range(rng.randint(0, 6))
+            ]
+            trees = create_test_trees(tree_values)
+            stratums = create_test_stratums(stratum_values)
+            expected_trees = copy.deepcopy(trees)
+            no_age_trees = [t for t in expected_trees if t.breast_height_age == 0.0 and t.has_height_over_130_cm()]
+            expected_age_trees = [t for t in expected_trees if t.breast_height_age > 0.0]
+            expected_stratums = [s for s in stratums if s.breast_height_age > 0.0]
+            try:
+                strategies = age_sup.solve_supplement_strategy(no_age_trees, expected_age_trees, expected_stratums)
+                expected = age_sup.perform_supplementing(strategies, expected_age_trees, expected_stratums)
+            except UserWarning:
+                self.assertRaises(UserWarning, age_sup.supplement_age_for_reference_trees, trees, stratums)
+                continue
+            result = age_sup.supplement_age_for_reference_trees(trees, stratums)
+            self.assertEqual([t.identifier for t in expected], [t.identifier for t in result])
+            self.assertEqual([(t.breast_height_age, t.biological_age) for t in expected_trees],
+                             [(t.breast_height_age, t.biological_age) for t in trees])
+
+    def test_supplement_age_columns(self):
+        rng = random.Random(11)
+        species = [None, 1, 2, 3]
+        for _ in range(50):
+            stands = []
+            for _ in range(rng.randint(1, 8)):
+                trees = create_test_trees([
+                    Input(f'tree-{rng.randint(0, 4)}', rng.choice(species), rng.choice([0.0, 4.0, 9.5, 13.0, 21.0]),
+                          rng.choice([0.0, 0.0, 12, 35]), rng.choice([0.0, 20, 45]), rng.choice([None, 1.2, 6.0]))
+                    for _ in range(rng.randint(0, 8))
+                ])
+                stratums = create_test_stratums([
+                    Input(f'stratum-{i}', rng.choice(species), rng.choice([0.0, 6.0, 11.0, 18.0, 25.0]),
+                          rng.choice([0.0, 15.0, 40.0]), rng.choice([25.0, 50.0]), None)
+                    for i in range(rng.randint(0, 5))
+                ])
+                stands.append((trees, stratums))
+
+            def columns(members, names):
+                result = {name: np.array([getattr(m, name) for _, m in members], dtype=object) for name in names}
+                result['stand_index'] = np.array([i for i, _ in members], dtype=int)
+                return result
+
+            tree_columns = columns([(i, t) for i, (trees, _) in enumerate(stands) for t in trees],
+                                   ('identifier', 'species', 'breast_height_diameter', 'height', 'breast_height_age',
+                                    'biological_age'))
+            stratum_columns = columns([(i, s) for i, (_, stratums) in enumerate(stands) for s in stratums],
+                                      ('species', 'mean_diameter', 'breast_height_age', 'biological_age'))
+            try:
+                for trees, stratums in stands:
+                    age_sup.supplement_age_for_reference_trees(trees, stratums)
+            except UserWarning as expected:
+                with self.assertRaises(UserWarning) as result:
+                    age_sup.supplement_age_columns(tree_columns, stratum_columns)
+                self.assertEqual(str(expected), str(result.exception))
+                continue
+            breast_height_age, biological_age = age_sup.supplement_age_columns(tree_columns, stratum_columns)
+            self.assertEqual([(t.breast_height_age, t.biological_age) for trees, _ in stands for t in trees],
+                             list(zip(breast_height_age.tolist(), biological_age.tolist())))
+
+    def test_supplement_age_columns_without_stratum_diameters(self):
+        trees = create_test_trees([Input('tree-1', 1, 8.0, 0.0, 0.0, 6.0)])
+        stratums = create_test_stratums([
+            Input('stratum-1', 1, 0.0, 30.0, 40.0, None),
+            Input('stratum-2', 1, 0.0, 35.0, 45.0, None),
+            Input('stratum-3', 1, 10.0, 20.0, 25.0, None),
+        ])
+        tree_columns = {name: np.array([getattr(t, name) for t in trees], dtype=object)
+                        for name in ('identifier', 'species', 'breast_height_diameter', 'height', 'breast_height_age',
+                                     'biological_age')}
+        tree_columns['stand_index'] = np.zeros(len(trees), dtype=int)
+        stratum_columns = {name: np.array([getattr(s, name) for s in stratums], dtype=object)
+                           for name in ('species', 'mean_diameter', 'breast_height_age', 'biological_age')}
+        stratum_columns['stand_index'] = np.zeros(len(stratums), dtype=int)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            breast_height_age, biological_age = age_sup.supplement_age_columns(tree_columns, stratum_columns)
+        age_sup.supplement_age_for_reference_trees(trees, stratums)
+        self.assertEqual([(t.breast_height_age, t.biological_age) for t in trees],
+                         list(zip(breast_height_age.tolist(), biological_age.tolist())))
@@ -1,3 +1,5 @@
+import itertools
+
 from lukefi.metsi.data.formats import vmi_util
 from lukefi.metsi.data.formats.vmi_const import *
 from tests import test_util
@@ -353,6 +355,15 @@ class TestConversion(test_util.ConverterTestSuite):
         ]
         self.run_with_test_assertions(assertions, vmi_util.convert_vmi12_geolocation)
 
+    def test_convert_vmi12_geolocations(self):
+        lat, lon = vmi_util.convert_vmi12_geolocations(['6656996', '6652133'], ['3102608', '3246174'])
+        self.assertEqual((6654200, 102598), (lat[0], lon[0]))
+        self.assertEqual([vmi_util.convert_vmi12_geolocation('6656996', '3102608'),
+                          vmi_util.convert_vmi12_geolocation('6652133', '3246174')],
+                         list(zip(lat.tolist(), lon.tolist())))
+        lat, lon = vmi_util.convert_vmi12_geolocations([], [])
+        self.assertEqual((0, 0), (len(lat), len(lon)))
+
     def test_vmi12_coords(self):
         assertions = [
             (['6656996', '3102608'], (6656996.0, 102608.0))
@@ -373,6 +384,38 @@ class TestConversion(test_util.ConverterTestSuite):
         self.assertEqual(result.month, 2)
         self.assertEqual(result.day, 1)
 
+    def test_vmi_year(self):
+        for source, expected in [('010219', 2019), ('311299', 1999), ('010169', 1969), ('290200', 2000)]:
+            self.assertEqual(vmi_util.parse_vmi12_date(source).year, vmi_util.parse_vmi12_year(source))
+            self.assertEqual(expected, vmi_util.parse_vmi12_year(source))
+        for source in ['20190201', '20000229', '19991231']:
+            self.assertEqual(vmi_util.parse_vmi13_date(source).year, vmi_util.parse_vmi13_year(source))
+        # unpadded days and months are accepted as by strptime
+        for source, expected in [('01693', 1993), ('1193', 1993), ('31120', 2020)]:
+            self.assertEqual(expected, vmi_util.parse_vmi12_year(source))
+            self.assertEqual([2019, expected], vmi_util.parse_vmi12_year_array(['010219', source]).tolist())
+        for source, expected in [('2019723', 2019), ('202011', 2020), ('1999121', 1999)]:
+            self.assertEqual(expected, vmi_util.parse_vmi13_year(source))
+            self.assertEqual([expected, 2019], vmi_util.parse_vmi13_year_array([source, '20190201']).tolist())
+        for source in ['290219', '320118', '001218', '011318', '0102', '01021a', '']:
+            self.assertRaises(ValueError, vmi_util.parse_vmi12_date, source)
+            self.assertRaises(ValueError, vmi_util.parse_vmi12_year, source)
+            self.assertRaises(ValueError, vmi_util.parse_vmi12_year_array, ['010219', source])
+        for source in ['20190229', '21000229', '20191301', '20190100', '2019020', ' 2019020']:
+            self.assertRaises(ValueError, vmi_util.parse_vmi13_date, source)
+            self.assertRaises(ValueError, vmi_util.parse_vmi13_year, source)
+            self.assertRaises(ValueError, vmi_util.parse_vmi13_year_array, [source])
+
+    def test_vmi_year_array(self):
+        vmi12_dates = [f'{day:02d}{month:02d}{year:02d}'
+                       for year in range(100) for month in (1, 2, 12) for day in (1, 28)]
+        self.assertEqual([vmi_util.parse_vmi12_date(date).year for date in vmi12_dates],
+                         vmi_util.parse_vmi12_year_array(vmi12_dates).tolist())
+        vmi13_dates = ['20190201', '20000229', '19991231', '20240229']
+        self.assertEqual([vmi_util.parse_vmi13_date(date).year for date in vmi13_dates],
+                         vmi_util.parse_vmi13_year_array(vmi13_dates).tolist())
+        self.assertEqual([], vmi_util.parse_vmi13_year_array([]).tolist())
+
     def test_parse_forestry_centre(self):
         assertions = [
             (['20'], 20),
@@ -490,6 +533,13 @@ class TestConversion(test_util.ConverterTestSuite):
         ]
         self.run_with_test_assertions(assertions, vmi_util.determine_tree_age_values)
 
+    def test_determine_tree_age_values_array(self):
+        sources = ['0', '10', '2', '23', '3', '', ' 5', 'kissa123']
+        columns = list(zip(*itertools.product(sources, repeat=3)))
+        breast_height_age, biological_age = vmi_util.determine_tree_age_values_array(*columns)
+        self.assertEqual([vmi_util.determine_tree_age_values(*values) for values in zip(*columns)],
+                         list(zip(breast_height_age.tolist(), biological_age.tolist())))
+
     def test_determine_tree_management_category(self):
         assertions = [
             (['A'], 1),
@@ -550,6 +600,14 @@ class TestConversion(test_util.ConverterTestSuite):
         ]
         self.run_with_test_assertions(assertions, vmi_util.determine_stratum_age_values)
 
+    def test_determine_stratum_age_values_array(self):
+        sources = ['0', '1', '2', '.', ' ', '12.5', 'nan']
+        heights = [0.0, 1.0, 1.3, 1.35, 10.0, 17.25]
+        columns = list(zip(*itertools.product(sources, sources, heights)))
+        biological_age, breast_height_age = vmi_util.determine_stratum_age_values_array(*columns)
+        self.assertEqual(repr([vmi_util.determine_stratum_age_values(*values) for values in zip(*columns)]),
+                         repr(list(zip(biological_age.tolist(), breast_height_age.tolist()))))
+
     def test_generating_vmi12_stand_identifier(self):
         # section_x is 012
         # section_y is 001
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from lukefi.metsi.data.conversion import fc2internal, vmi2internal
+from lukefi.metsi.data.conversion.util import MISSING, EnumTable, enum_codes
+from lukefi.metsi.data.enums import forest_centre, vmi
+from lukefi.metsi.data.enums.internal import OwnerCategory, TreeSpecies
+from lukefi.metsi.data.enums.mela import MelaTreeSpecies
+
+
+class EnumTableTest(unittest.TestCase):
+
+    def test_string_valued_source(self):
+        table = EnumTable({vmi.VmiOwnerCategory.PRIVATE: OwnerCategory.PRIVATE})
+        self.assertEqual(len(vmi.VmiOwnerCategory), len(table.codes))
+        self.assertEqual(OwnerCategory.PRIVATE, table.get(vmi.VmiOwnerCategory.PRIVATE))
+        self.assertIsNone(table.get(vmi.VmiOwnerCategory.UNKNOWN))
+        codes = table.source_codes(['1', '0', '1'])
+        self.assertEqual([OwnerCategory.PRIVATE, MISSING, OwnerCategory.PRIVATE], table.convert(codes).tolist())
+        self.assertRaises(ValueError, table.source_codes, ['1', 'X'])
+
+    def test_integer_valued_source(self):
+        table = EnumTable({TreeSpecies.SPRUCE: MelaTreeSpecies.NORWAY_SPRUCE}, MelaTreeSpecies.OTHER_DECIDUOUS)
+        self.assertEqual(MelaTreeSpecies.NORWAY_SPRUCE, table.get(TreeSpecies.SPRUCE))
+        self.assertEqual(MelaTreeSpecies.NORWAY_SPRUCE, table.get(2))
+        self.assertEqual(MelaTreeSpecies.OTHER_DECIDUOUS, table.get(None))
+        result = table.convert(enum_codes([TreeSpecies.SPRUCE, None, TreeSpecies.PINE]))
+        self.assertEqual([2, 8, 8], result.tolist())
+        self.assertEqual([MelaTreeSpecies.NORWAY_SPRUCE, MelaTreeSpecies.OTHER_DECIDUOUS, None],
+                         table.members(np.append(result[:2], MISSING)).tolist())
+        self.assertEqual([8], table.convert([100]).tolist())
+
+    def assert_column_conversion(self, convert, convert_codes, codes):
+        expected = [convert(code) for code in codes]
+        self.assertEqual([MISSING if value is None else value.value for value in expected],
+                         convert_codes(codes).tolist())
+
+    def test_vmi_column_conversions(self):
+        self.assert_column_conversion(vmi2internal.convert_species, vmi2internal.convert_species_codes,
+                                      [s.value for s in vmi.VmiSpecies if s.value] + ['0', ' 1', 'A9 '])
+        self.assert_column_conversion(vmi2internal.convert_owner, vmi2internal.convert_owner_codes,
+                                      [o.value for o in vmi.VmiOwnerCategory])
+        self.assert_column_conversion(vmi2internal.convert_land_use_category,
+                                      vmi2internal.convert_land_use_category_codes,
+                                      [c.value for c in vmi.VmiLandUseCategory])
+        empty = ['', ' ', '.']
+        self.assert_column_conversion(vmi2internal.convert_site_type_category,
+                                      vmi2internal.convert_site_type_category_codes,
+                                      [c.value for c in vmi.VmiSiteType] + empty)
+        self.assert_column_conversion(vmi2internal.convert_soil_peatland_category,
+                                      vmi2internal.convert_soil_peatland_category_codes,
+                                      [c.value for c in vmi.VmiSoilPeatlandCategory] + empty)
+        self.assert_column_conversion(vmi2internal.convert_drainage_category,
+                                      vmi2internal.convert_drainage_category_codes,
+                                      [c.value for c in vmi.VmiDrainageCategory] + empty)
+        self.assertEqual([], vmi2internal.convert_species_codes([]).tolist())
+
+    def test_forest_centre_column_conversions(self):
+        conversions = [
+            (fc2internal.convert_species, fc2internal.convert_species_codes, forest_centre.ForestCentreSpecies),
+            (fc2internal.convert_owner, fc2internal.convert_owner_codes, forest_centre.ForestCentreOwnerCategory),
+            (fc2internal.convert_land_use_category, fc2internal.convert_land_use_category_codes,
+             forest_centre.ForestCentreLandUseCategory),
+            (fc2internal.convert_site_type_category, fc2internal.convert_site_type_category_codes,
+             forest_centre.ForestCentreSiteType),
+            (fc2internal.convert_soil_peatland_category, fc2internal.convert_soil_peatland_category_codes,
+             forest_centre.ForestCentreSoilPeatlandCategory),
+            (fc2internal.convert_drainage_category, fc2internal.convert_drainage_category_codes,
+             forest_centre.ForestCentreDrainageCategory),
+        ]
+        for convert, convert_codes, source in conversions:
+            self.assert_column_conversion(convert, convert_codes, [member.value for member in source])
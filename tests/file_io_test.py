@@ -1,5 +1,13 @@
+import bz2
 import csv
-from io import StringIO
+import gzip
+import lzma
+import os
+import random
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
+from lukefi.metsi.data.conversion import internal2mela
 from lukefi.metsi.data.formats.io_utils import *
 from tests.test_util import ConverterTestSuite, vmi13_builder
 
@@ -16,6 +24,15 @@ class IoUtilsTest(ConverterTestSuite):
         ]
         self.run_with_test_assertions(assertions, rsd_float)
 
+    def test_rsd_format_rows(self):
+        values = [123, 0, 123.4455667788, None, "1.23", "abc", True, -0.0, -1e-9, 0.0078125, 2.5e-7, 1e15, -7]
+        random.seed(1)
+        values.extend(random.uniform(-1e4, 1e4) for _ in range(1000))
+        records = [values[i:i + 4] for i in range(0, len(values) - 3, 4)]
+        result = rsd_format_rows(rsd_array(records, 4), ' '.join(['%.6f'] * 4))
+        self.assertEqual([" ".join(map(rsd_float, record)) for record in records], result)
+        self.assertEqual([], rsd_format_rows(rsd_array([], 4), '%.6f'))
+
     def test_rsd_forest_stand_rows(self):
         vmi13_stands = vmi13_builder.build()
         result = rsd_forest_stand_rows(vmi13_stands[0])
@@ -26,6 +43,41 @@ class IoUtilsTest(ConverterTestSuite):
         result = stands_to_rsd_content(vmi13_stands)
         self.assertEqual(5, len(result))
 
+    def test_rsd_rows_convert_stands_once(self):
+        expected = []
+        for stand in cleaned_output(vmi13_builder.build()):
+            metadata = msb_metadata(stand)
+            expected.append(" ".join(chain(metadata[0], metadata[1], map(rsd_float, stand.as_rsd_row()), metadata[2])))
+            expected.extend(" ".join(map(rsd_float, tree.as_rsd_row())) for tree in stand.reference_trees)
+        stands = vmi13_builder.build()
+        with patch.object(internal2mela, 'mela_tree', wraps=internal2mela.mela_tree) as mela_tree, \
+                patch.object(internal2mela, 'mela_stratum', wraps=internal2mela.mela_stratum) as mela_stratum:
+            result = stands_to_rsd_content(stands)
+        self.assertEqual(expected, result)
+        self.assertEqual(sum(len(stand.reference_trees) for stand in cleaned_output(stands)), mela_tree.call_count)
+        self.assertEqual(0, mela_stratum.call_count)
+
+    def test_write_rsd(self):
+        expected = '\n'.join(stands_to_rsd_content(vmi13_builder.build())) + '\n'
+        binary_sink = BytesIO()
+        stats = write_rsd(iter(vmi13_builder.build()), binary_sink, chunk_size=1)
+        self.assertEqual(expected.encode('utf-8'), binary_sink.getvalue())
+        self.assertEqual(WriteStats(stands=2, records=5, bytes=len(expected)), stats)
+        text_sink = StringIO()
+        write_rsd(vmi13_builder.build(), text_sink)
+        self.assertEqual(expected, text_sink.getvalue())
+
+    def test_write_csv_compressed(self):
+        expected = '\n'.join(stands_to_csv_content(vmi13_builder.build(), ';')) + '\n'
+        with tempfile.TemporaryDirectory() as directory:
+            for suffix, opener in (('.gz', gzip.open), ('.bz2', bz2.open), ('.xz', lzma.open), ('.csv', open)):
+                path = os.path.join(directory, 'stands' + suffix)
+                with open_sink(path) as sink:
+                    stats = write_csv(vmi13_builder.build(), sink, ';')
+                with opener(path, 'rt', encoding='utf-8') as source:
+                    self.assertEqual(expected, source.read())
+                self.assertEqual(WriteStats(stands=2, records=5, bytes=len(expected.encode('utf-8'))), stats)
+
     def test_stands_to_csv(self):
         delimiter = ";"
         vmi13_stands = vmi13_builder.build()
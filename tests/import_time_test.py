@@ -0,0 +1,33 @@
+import subprocess
+import sys
+import unittest
+
+GEOSPATIAL_MODULES = ('geopandas', 'shapely', 'pyproj', 'pandas')
+
+PACKAGE_MODULES = (
+    'lukefi.metsi.data.model',
+    'lukefi.metsi.data.formats.ForestBuilder',
+    'lukefi.metsi.data.formats.vmi_util',
+    'lukefi.metsi.data.formats.smk_util',
+    'lukefi.metsi.data.formats.geo_util',
+    'lukefi.metsi.data.conversion.internal2mela',
+)
+
+
+def imported_modules(*modules: str, calls: str = '') -> set:
+    """Top level names of the modules imported in a fresh interpreter by importing given modules and running calls"""
+    script = '\n'.join([f'import {module}' for module in modules] + [calls, 'import sys', 'print(*sys.modules)'])
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    return {name.split('.')[0] for name in output.split()}
+
+
+class ImportTimeTest(unittest.TestCase):
+
+    def test_geospatial_stack_is_not_imported_with_the_package(self):
+        imported = imported_modules(*PACKAGE_MODULES)
+        self.assertEqual(set(), imported.intersection(GEOSPATIAL_MODULES))
+
+    def test_geospatial_stack_is_imported_on_first_use(self):
+        imported = imported_modules('lukefi.metsi.data.formats.smk_util',
+                                    calls='lukefi.metsi.data.formats.smk_util.parse_crs("EPSG:3067")')
+        self.assertIn('pyproj', imported)
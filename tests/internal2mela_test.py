@@ -1,9 +1,14 @@
 from types import SimpleNamespace
 import unittest
 from parameterized import parameterized
+from pyproj import Transformer
 from lukefi.metsi.data.model import ReferenceTree, ForestStand, TreeStratum
-from lukefi.metsi.data.conversion.internal2mela import land_use_mapper, soil_peatland_mapper, species_mapper, owner_mapper, mela_stand
-from lukefi.metsi.data.enums.internal import LandUseCategory, OwnerCategory, SiteType, SoilPeatlandCategory, TreeSpecies
+from lukefi.metsi.data.conversion.internal2mela import land_use_mapper, soil_peatland_mapper, species_mapper, owner_mapper, mela_stand, \
+    mela_stands, stand_location_converter
+from lukefi.metsi.data.conversion import internal2mela
+from lukefi.metsi.data.conversion.util import MISSING, enum_codes
+from lukefi.metsi.data.enums.internal import DrainageCategory, LandUseCategory, OwnerCategory, SiteType, \
+    SoilPeatlandCategory, TreeSpecies
 from lukefi.metsi.data.enums.mela import MelaLandUseCategory, MelaOwnerCategory, MelaSoilAndPeatlandCategory, MelaTreeSpecies
 
 
@@ -33,6 +38,27 @@ class Internal2MelaTest(unittest.TestCase):
         self.assertEqual(0.0, result.area)
         self.assertEqual(100.0, result.area_weight)
 
+    def test_stand_location_reprojection(self):
+        lon, lat = Transformer.from_crs("EPSG:4326", "EPSG:3067", always_xy=True).transform(23.0, 60.0)
+        fixture = ForestStand(geo_location=(60.0, 23.0, 10.0, "EPSG:4326"))
+        result = stand_location_converter(fixture)
+        self.assertEqual((lat / 1000, lon / 1000, 10.0, "EPSG:3067"), result.geo_location)
+
+    def test_mela_stands(self):
+        fixtures = [
+            ForestStand(geo_location=(6654200, 102598, 0.0, "EPSG:3067")),
+            ForestStand(geo_location=(6656996.0, 3102608.0, 0.0, "EPSG:2393")),
+            ForestStand(geo_location=(60.0, 23.0, 1.0, "EPSG:4326")),
+            ForestStand(geo_location=(61.0, 24.0, 2.0, "EPSG:4326")),
+        ]
+        fixtures[0].reference_trees.append(ReferenceTree(species=TreeSpecies.SPRUCE, stand=fixtures[0]))
+        expected = [mela_stand(stand) for stand in fixtures]
+        result = mela_stands(fixtures)
+        self.assertEqual([s.geo_location for s in expected], [s.geo_location for s in result])
+        self.assertEqual(MelaTreeSpecies.NORWAY_SPRUCE, result[0].reference_trees[0].species)
+        self.assertIs(result[0], result[0].reference_trees[0].stand)
+        self.assertEqual("EPSG:4326", fixtures[2].geo_location[3])
+
     @parameterized.expand([
         (OwnerCategory.METSAHALLITUS, MelaOwnerCategory.STATE),
         (OwnerCategory.UNKNOWN, MelaOwnerCategory.PRIVATE)
@@ -71,3 +97,31 @@ class Internal2MelaTest(unittest.TestCase):
             )
         result = soil_peatland_mapper(fixture)
         self.assertEqual(result.soil_peatland_category, expected)
+
+    def assert_column_mapping(self, mapper, attribute, convert_codes, *columns):
+        fixtures = [SimpleNamespace(**dict(zip(attribute, values))) for values in zip(*columns)]
+        expected = [getattr(mapper(fixture), attribute[0]) for fixture in fixtures]
+        result = convert_codes(*(enum_codes(column) for column in columns))
+        self.assertEqual([MISSING if value is None else value.value for value in expected], result.tolist())
+
+    def test_column_mappings(self):
+        self.assert_column_mapping(species_mapper, ['species'], internal2mela.species_codes,
+                                   list(TreeSpecies) + [None])
+        self.assert_column_mapping(owner_mapper, ['owner_category'], internal2mela.owner_codes,
+                                   list(OwnerCategory) + [None])
+        self.assert_column_mapping(land_use_mapper, ['land_use_category'], internal2mela.land_use_codes,
+                                   list(LandUseCategory) + [None])
+        self.assert_column_mapping(internal2mela.site_type_mapper, ['site_type_category'],
+                                   internal2mela.site_type_codes, list(SiteType) + [None])
+
+    def test_two_column_mappings(self):
+        soil = list(SoilPeatlandCategory) + [None]
+        site = list(SiteType) + [None]
+        drainage = list(DrainageCategory) + [None]
+        soil_and_site = [(s, t) for s in soil for t in site]
+        self.assert_column_mapping(soil_peatland_mapper, ['soil_peatland_category', 'site_type_category'],
+                                   internal2mela.soil_peatland_codes, *zip(*soil_and_site))
+        drainage_and_soil = [(d, s) for d in drainage for s in soil]
+        self.assert_column_mapping(internal2mela.drainage_category_mapper,
+                                   ['drainage_category', 'soil_peatland_category'],
+                                   internal2mela.drainage_category_codes, *zip(*drainage_and_soil))
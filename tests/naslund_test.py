@@ -1,9 +1,12 @@
 """
 NOTE: this test suite has been intentionally duplicated from `forestry-function-library` and the implementation here should follow the source. 
 """
+import math
+
 from lukefi.metsi.data.enums.internal import TreeSpecies
 
 from lukefi.metsi.data.formats import vmi_supplementing
+from lukefi.metsi.data.model import ReferenceTree
 from tests import test_util
 
 
@@ -21,3 +24,21 @@ class TestNaslund(test_util.ConverterTestSuite):
             ([10.0, TreeSpecies.UNKNOWN], 10.38),
         ]
         self.run_with_test_assertions(assertions, vmi_supplementing.naslund_height)
+
+    def test_naslund_height_array(self):
+        diameters = [d / 10.0 for d in range(-5, 1001)]
+        for species in TreeSpecies:
+            expected = [vmi_supplementing.naslund_height(d, species) for d in diameters]
+            result = vmi_supplementing.naslund_height_array(diameters, [species] * len(diameters)).tolist()
+            self.assertEqual(expected, [None if math.isnan(h) else h for h in result], species)
+        self.assertEqual(0, len(vmi_supplementing.naslund_height_array([], [])))
+
+    def test_supplement_naslund_heights(self):
+        trees = [
+            ReferenceTree(breast_height_diameter=10.0, species=TreeSpecies.SPRUCE, height=None),
+            ReferenceTree(breast_height_diameter=10.0, species=TreeSpecies.SPRUCE, height=5.0),
+            ReferenceTree(breast_height_diameter=0.0, species=TreeSpecies.PINE, height=0.0),
+            ReferenceTree(breast_height_diameter=20.0, species=None, height=0.0),
+        ]
+        vmi_supplementing.supplement_naslund_heights(trees)
+        self.assertEqual([9.85, 5.0, None, 13.45], [tree.height for tree in trees])
@@ -1,6 +1,9 @@
 import unittest
 import os
-from lukefi.metsi.data.formats.ForestBuilder import ForestCentreBuilder
+from lukefi.metsi.data.formats.ForestBuilder import ForestCentreBuilder, ForestCentreStreamBuilder
+from lukefi.metsi.data.formats import xml_backend
+from lukefi.metsi.data.model import ForestStand
+from tests.test_util import stand_dicts
 from lukefi.metsi.data.enums.internal import *
 
 builder_flags = {
@@ -32,6 +35,55 @@ class TestForestCentreBuilder(unittest.TestCase):
             number_of_stratums = len(stands[0].tree_strata)
             self.assertEqual(i[1], number_of_stratums)
 
+    def test_smk_builder_batch_centroids(self):
+        stands = ForestCentreBuilder({'strata_origin': '1', 'batch_centroids': True}, self.xml_string).build()
+        self.assertEqual([s.geo_location for s in self.smk_stands], [s.geo_location for s in stands])
+
+    def test_smk_stream_builder(self):
+        for origin in ('1', '2', None):
+            flags = {'strata_origin': origin}
+            expected = ForestCentreBuilder(flags, self.xml_string).build()
+            from_path = ForestCentreStreamBuilder(flags, absolute_resource_path).build()
+            self.assertEqual(stand_dicts(expected), stand_dicts(from_path))
+            with open(absolute_resource_path, 'rb') as f:
+                from_stream = list(ForestCentreStreamBuilder(flags, f).build_stream())
+            self.assertEqual(stand_dicts(expected), stand_dicts(from_stream))
+
+    def test_smk_stream_builder_is_lazy(self):
+        builder = ForestCentreStreamBuilder(builder_flags, absolute_resource_path)
+        stream = builder.build_stream()
+        first = next(stream)
+        self.assertEqual('10', first.identifier)
+        self.assertEqual(3, len(first.tree_strata))
+        self.assertEqual(['15'], [stand.identifier for stand in stream])
+
+    def test_set_stand_operations(self):
+        assertions = [
+            (1, 'cutting_year', 4),
+            (13, 'cutting_year', 3),
+            (94, 'cutting_year', 1),
+            (100, 'cutting_year', 6),
+            (124, 'cutting_year', 6),
+            (128, 'cutting_year', 5),
+            (228, 'artificial_regeneration_year', None),
+            (630, 'artificial_regeneration_year', None),
+            (450, 'regeneration_area_cleaning_year', None),
+            (960, 'soil_surface_preparation_year', None),
+            (890, 'young_stand_tending_year', None),
+            (912, 'fertilization_year', None),
+            (940, 'drainage_year', None),
+            (970, 'pruning_year', None),
+        ]
+        for oper_type, attribute, method in assertions:
+            stand = ForestStand(soil_peatland_category=SoilPeatlandCategory.MINERAL_SOIL)
+            stand = self.smk_builder.set_stand_operations(stand, {1: (oper_type, 2010)})
+            self.assertEqual(2010, getattr(stand, attribute))
+            self.assertEqual(method, stand.method_of_last_cutting)
+        stand = ForestStand(soil_peatland_category=SoilPeatlandCategory.TREELESS_MIRE)
+        self.assertEqual(5, self.smk_builder.set_stand_operations(stand, {1: (4, 2010)}).method_of_last_cutting)
+        stand = self.smk_builder.set_stand_operations(ForestStand(), {1: (999, 2010)})
+        self.assertEqual((None, None), (stand.cutting_year, stand.method_of_last_cutting))
+
     def test_smk_builder_stands(self):
         self.assertEqual(2, len(self.smk_stands))
 
@@ -181,3 +233,28 @@ class TestForestCentreBuilder(unittest.TestCase):
         self.assertEqual(None, self.smk_stands[0].tree_strata[1].lowest_living_branch_height)
         self.assertEqual(None, self.smk_stands[0].tree_strata[0].management_category)
         self.assertEqual(None, self.smk_stands[0].tree_strata[1].management_category)
+
+
+@unittest.skipUnless(xml_backend.etree is not None, 'lxml is not installed')
+class TestForestCentreBuilderBackends(unittest.TestCase):
+    xml_string = TestForestCentreBuilder.xml_string
+
+    def test_lxml_backend_parity(self):
+        for origin in ('1', '2', None):
+            expected = ForestCentreBuilder({'strata_origin': origin, 'xml_backend': 'etree'}, self.xml_string).build()
+            flags = {'strata_origin': origin, 'xml_backend': 'lxml'}
+            self.assertEqual(stand_dicts(expected), stand_dicts(ForestCentreBuilder(flags, self.xml_string).build()))
+            self.assertEqual(stand_dicts(expected),
+                             stand_dicts(ForestCentreBuilder(flags, self.xml_string.encode('utf-8')).build()))
+            self.assertEqual(stand_dicts(expected),
+                             stand_dicts(ForestCentreStreamBuilder(flags, absolute_resource_path).build()))
+
+    def test_default_backend(self):
+        self.assertEqual('lxml', ForestCentreBuilder(builder_flags, self.xml_string).backend.name)
+
+
+class TestXmlBackend(unittest.TestCase):
+
+    def test_get_backend(self):
+        self.assertEqual('etree', xml_backend.get_backend('etree').name)
+        self.assertRaises(ValueError, xml_backend.get_backend, 'sax')
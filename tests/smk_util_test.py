@@ -1,6 +1,10 @@
 import datetime
+import random
 import xml.etree.ElementTree as ET
 
+import numpy as np
+from shapely.geometry import Polygon
+
 from types import SimpleNamespace
 from lukefi.metsi.data.formats import smk_util
 from tests import test_util
@@ -130,6 +134,54 @@ class TestSmkXMLConversion(test_util.ConverterTestSuite):
         sns = smk_util.parse_stratum_data(estratum)
         self.assertEqual(assertion, sns)
 
+    def test_read_stand_basic_data(self):
+        test_element = """
+            <st:StandNumber>123</st:StandNumber>
+            <st:StandNumberExtension></st:StandNumberExtension>
+            <st:Area>1.73</st:Area>
+            <st:Area>2.00</st:Area>
+        """
+        reference_stand = generate_test_data(stand_data_element=test_element)
+        record = smk_util.read_stand_basic_data(reference_stand)
+        self.assertEqual(
+            smk_util.StandBasicDataRecord(id='123', StandNumber='123', StandNumberExtension='', Area='1.73'),
+            record)
+        self.assertEqual(smk_util.generate_stand_identifier(reference_stand), record.id)
+        self.assertRaises(AttributeError, setattr, record, 'Unknown', '1')
+
+    def test_read_stand_basic_data_matches_findtext(self):
+        stand = ET.parse('tests/resources/SMK_source.xml').getroot().find('./st:Stands/st:Stand', smk_util.NS)
+        record = smk_util.read_stand_basic_data(stand)
+        for name in smk_util.StandBasicDataRecord.__slots__[1:]:
+            self.assertEqual(stand.findtext(f'./st:StandBasicData/st:{name}', None, smk_util.NS),
+                             getattr(record, name))
+
+    def test_read_operation_data(self):
+        operations_element = """
+            <op:Operation id="544" mainType="1">
+                <op:OperationType>3</op:OperationType>
+                <op:CompletionData>
+                    <op:CompletionDate>2020-03-01</op:CompletionDate>
+                </op:CompletionData>
+            </op:Operation>
+            <op:Operation id="545" mainType="2">
+                <op:OperationType>410</op:OperationType>
+                <op:ProposalData>
+                    <op:ProposalType>0</op:ProposalType>
+                    <op:ProposalYear>2015</op:ProposalYear>
+                </op:ProposalData>
+            </op:Operation>
+        """
+        reference_stand = generate_test_data(operations_element=operations_element)
+        eoperations = reference_stand.findall('./op:Operations/op:Operation', smk_util.NS)
+        past, future = map(smk_util.read_operation_data, eoperations)
+        self.assertEqual(
+            smk_util.OperationRecord(id='544', OperationType='3', CompletionData=True, CompletionDate='2020-03-01'),
+            past)
+        self.assertEqual(
+            smk_util.OperationRecord(id='545', OperationType='410', ProposalData=True, ProposalYear='2015'),
+            future)
+
 
     def test_parse_year(self):
         assertions = [
@@ -243,6 +295,38 @@ class TestSmkXMLConversion(test_util.ConverterTestSuite):
         self.run_with_test_assertions(assertions, smk_util.parse_centroid)
 
 
+    def test_polygon_centroid(self):
+        rng = random.Random(42)
+        for _ in range(100):
+            n = rng.randint(3, 40)
+            angles = sorted(rng.uniform(0, 2 * np.pi) for _ in range(n))
+            if rng.random() < 0.5:
+                angles.reverse()
+            radii = [rng.uniform(10, 200) for _ in range(n)]
+            ring = [(506000.0 + r * np.cos(a), 6775000.0 + r * np.sin(a)) for a, r in zip(angles, radii)]
+            ring.append(ring[0])
+            expected = Polygon(ring).centroid
+            self.assertEqual((expected.x, expected.y), smk_util.polygon_centroid(np.array(ring)))
+
+    def test_polygon_centroid_degenerate(self):
+        ring = np.array([(0.0, 0.0), (1.0, 1.0), (2.0, 2.0), (0.0, 0.0)])
+        expected = Polygon(ring).centroid
+        self.assertEqual((expected.x, expected.y), smk_util.polygon_centroid(ring))
+
+    def test_coordinate_array(self):
+        result = smk_util.coordinate_array('1.5,2.5 3.0,4.0')
+        self.assertEqual([[1.5, 2.5], [3.0, 4.0]], result.tolist())
+
+    def test_batch_centroids(self):
+        square = np.array([(0.0, 0.0), (0.0, 2.0), (2.0, 2.0), (2.0, 0.0), (0.0, 0.0)])
+        result = smk_util.batch_centroids([('polygon', square), None, ('point', np.array([(5.0, 6.0)]))])
+        self.assertEqual([(1.0, 1.0), None, (5.0, 6.0)], result)
+        self.assertEqual([], smk_util.batch_centroids([]))
+
+    def test_parse_crs(self):
+        self.assertEqual('EPSG:3067', smk_util.parse_crs('EPSG:3067'))
+        self.assertRaises(Exception, smk_util.parse_crs, 'no such crs')
+
     def test_parse_coordinates_from_point(self):
         point_element = """
             <gml:pointProperty>
@@ -345,6 +429,32 @@ class TestSmkXMLConversion(test_util.ConverterTestSuite):
         self.assertEqual(fixture, result)
 
 
+    def test_parse_date_year(self):
+        self.assertEqual(2017, smk_util.parse_date_year('2017-02-07'))
+        self.assertEqual(1992, smk_util.parse_date_year('1992-02-01'))
+        self.assertRaises(ValueError, smk_util.parse_date_year, 'asd-01-01')
+
+    def test_parse_operations_with_completion_and_proposal_data(self):
+        operations_element = """
+            <op:Operation id="544" mainType="1">
+                <op:OperationType>3</op:OperationType>
+                <op:CompletionData>
+                    <op:CompletionDate>2020-03-01</op:CompletionDate>
+                </op:CompletionData>
+                <op:ProposalData>
+                    <op:ProposalYear>2015</op:ProposalYear>
+                </op:ProposalData>
+            </op:Operation>
+            <op:Operation id="545" mainType="1">
+                <op:OperationType>4</op:OperationType>
+            </op:Operation>
+        """
+        reference_stand = generate_test_data(operations_element=operations_element)
+        eoperations = reference_stand.findall(smk_util.XPATH_OPERATIONS, smk_util.NS)
+        self.assertEqual({544: (3, 2020)}, smk_util.parse_operations(eoperations, 'past'))
+        self.assertEqual({544: (3, 2015)}, smk_util.parse_operations(eoperations, 'future'))
+        self.assertEqual({544: (3, 2015)}, smk_util.parse_operations(eoperations))
+
     def test_parse_stand_operations(self):
         operations_element = """
             <op:Operation id="544" mainType="1">
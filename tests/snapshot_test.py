@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+
+from lukefi.metsi.data.conversion.internal2mela import mela_stands
+from lukefi.metsi.data.enums.internal import TreeSpecies
+from lukefi.metsi.data.formats import snapshot
+from lukefi.metsi.data.formats.ForestBuilder import ForestCentreBuilder, VMI12Builder, VMI13Builder
+from lukefi.metsi.data.model import ForestStand, ReferenceTree
+from tests.forest_builder_run_test import vmi_file_reader
+from tests.test_util import stand_dicts
+
+
+def reference_stands() -> list:
+    resources = Path('tests', 'resources')
+    stands = VMI12Builder({'reference_trees': True}, vmi_file_reader(resources / 'VMI12_source_mini.dat')).build()
+    stands += VMI13Builder({'reference_trees': True}, vmi_file_reader(resources / 'VMI13_source_mini.dat')).build()
+    stands += ForestCentreBuilder({'strata_origin': '1'}, (resources / 'SMK_source.xml').read_text('utf-8')).build()
+    return stands + mela_stands(stands)
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def test_snapshot_roundtrip(self):
+        stands = reference_stands()
+        sink = BytesIO()
+        snapshot.write_snapshot(stands, sink)
+        sink.seek(0)
+        result = snapshot.read_snapshot(sink)
+        self.assertEqual(stand_dicts(stands), stand_dicts(result))
+        for stand in result:
+            self.assertTrue(all(tree.stand is stand for tree in stand.reference_trees))
+            self.assertTrue(all(stratum.stand is stand for stratum in stand.tree_strata))
+        self.assertEqual([type(s.geo_location) for s in stands], [type(s.geo_location) for s in result])
+
+    def test_compressed_snapshot_file(self):
+        stands = reference_stands()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'stands.npz')
+            snapshot.write_snapshot(stands, path, compressed=True)
+            self.assertEqual(stand_dicts(stands), stand_dicts(snapshot.read_snapshot(path)))
+
+    def test_encode_tables(self):
+        stand = ForestStand(identifier='1', geo_location=(6654200.0, 102598.0, None, 'EPSG:3067'),
+                            monthly_temperatures=[1.0, 2.5])
+        stand.reference_trees.append(ReferenceTree(species=TreeSpecies.PINE, stand=stand))
+        stand.reference_trees.append(ReferenceTree(species=None, stand=stand))
+        arrays, meta = snapshot.encode_tables([stand, ForestStand(identifier='2')])
+        self.assertEqual([0, 0], arrays['reference_trees.stand_index'].tolist())
+        self.assertEqual(np.int16, arrays['reference_trees.species.values'].dtype)
+        self.assertEqual([0, -1], arrays['reference_trees.species.values'].tolist())
+        self.assertEqual('tuple', meta['tables']['stands']['columns']['geo_location']['kind'])
+        self.assertEqual([6654200.0, 0.0], arrays['stands.geo_location.0.values'].tolist())
+        self.assertEqual([False, True], arrays['stands.geo_location.mask'].tolist())
+        self.assertEqual([0, 2, 2], arrays['stands.monthly_temperatures.offsets'].tolist())
+        result = snapshot.decode_tables(arrays, meta)
+        self.assertEqual([TreeSpecies.PINE, None], [tree.species for tree in result[0].reference_trees])
+        self.assertEqual([1.0, 2.5], result[0].monthly_temperatures)
+        self.assertIsNone(result[1].monthly_temperatures)
+
+    def test_unsupported_values(self):
+        self.assertRaises(TypeError, snapshot.encode_tables, [ForestStand(identifier=object())])
@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from lukefi.metsi.data.formats.stand_store import StandStore, StandView, write_store
+from lukefi.metsi.data.model import ForestStand
+from tests.snapshot_test import reference_stands
+from tests.test_util import stand_dicts
+
+
+class StandStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.stands = reference_stands()
+        write_store(self.stands, self.directory.name)
+        self.store = StandStore(self.directory.name)
+
+    def tearDown(self):
+        del self.store
+        self.directory.cleanup()
+
+    def test_memory_mapped_arrays(self):
+        self.assertTrue(all(isinstance(array, np.memmap) for array in self.store.arrays.values()))
+
+    def test_views(self):
+        self.assertEqual(len(self.stands), len(self.store))
+        for stand, view in zip(self.stands, self.store):
+            self.assertEqual(stand.identifier, view.identifier)
+            self.assertEqual(stand.geo_location, view.geo_location)
+            self.assertEqual(stand.land_use_category, view.land_use_category)
+            self.assertEqual([t.identifier for t in stand.reference_trees],
+                             [t.identifier for t in view.reference_trees])
+            self.assertEqual([t.species for t in stand.reference_trees], [t.species for t in view.reference_trees])
+            self.assertEqual([s.mean_height for s in stand.tree_strata], [s.mean_height for s in view.tree_strata])
+            self.assertTrue(all(tree.stand == view for tree in view.reference_trees))
+            self.assertTrue(all(stratum.stand == view for stratum in view.tree_strata))
+        self.assertEqual(self.store[-1], self.store[len(self.store) - 1])
+        self.assertRaises(IndexError, self.store.__getitem__, len(self.store))
+
+    def test_views_are_read_only(self):
+        view = self.store[0]
+        self.assertIsInstance(view, StandView)
+        self.assertRaises(AttributeError, setattr, view, 'year', 2000)
+        self.assertRaises(AttributeError, getattr, view, 'unknown')
+
+    def test_materialize(self):
+        self.assertEqual(stand_dicts(self.stands), stand_dicts(self.store.materialize()))
+        self.assertEqual(stand_dicts(self.stands[1:3]), stand_dicts(self.store.materialize([1, 2])))
+        stand = self.store[1].materialize()
+        self.assertTrue(all(tree.stand is stand for tree in stand.reference_trees))
+        stand.year = 1900
+        self.assertNotEqual(1900, self.store[1].year)
+
+    def test_empty_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_store([], directory)
+            store = StandStore(directory)
+            self.assertEqual(0, len(store))
+            self.assertEqual([], store.materialize())
+
+    def test_overwrite_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_store([ForestStand(area=None), ForestStand(area=2.0)], directory)
+            write_store([ForestStand(area=1.0), ForestStand(area=3.0)], directory)
+            store = StandStore(directory)
+            self.assertEqual([1.0, 3.0], [view.area for view in store])
+            self.assertEqual([1.0, 3.0], [stand.area for stand in store.materialize()])
@@ -4,6 +4,32 @@ import unittest
 from lukefi.metsi.data.formats.ForestBuilder import VMIBuilder, VMI13Builder
 
 
+def stand_dicts(stands: typing.Iterable) -> typing.List[typing.Tuple[dict, list, list]]:
+    """Comparable representation of stands with their reference trees and tree strata, without back references"""
+    def without(obj, *excluded):
+        return {k: v for k, v in obj.__dict__.items() if k not in excluded}
+
+    return [
+        (
+            without(stand, 'reference_trees', 'tree_strata'),
+            [without(tree, 'stand') for tree in stand.reference_trees],
+            [without(stratum, 'stand') for stratum in stand.tree_strata]
+        )
+        for stand in stands
+    ]
+
+
+def typed_stand_dicts(stands: typing.Iterable) -> typing.List[typing.Tuple[dict, list, list]]:
+    """stand_dicts with the values paired with their types, telling apart equal values such as 0 and 0.0"""
+    def typed(values: dict) -> dict:
+        return {k: (type(v), v) for k, v in values.items()}
+
+    return [
+        (typed(stand), [typed(tree) for tree in trees], [typed(stratum) for stratum in strata])
+        for stand, trees, strata in stand_dicts(stands)
+    ]
+
+
 class ConverterTestSuite(unittest.TestCase):
     def run_with_test_assertions(self, assertions: typing.List[typing.Tuple], fn: typing.Callable):
         for case in assertions:
@@ -1,5 +1,11 @@
+from enum import EnumMeta
+from typing import Optional
+
 from tests import test_util
-from lukefi.metsi.data.formats.util import parse_int, parse_float, get_or_default
+from lukefi.metsi.data.enums.internal import LandUseCategory
+from lukefi.metsi.data.formats.util import parse_int, parse_float, get_or_default, class_annotations, \
+    compile_converter, compile_row_decoder, convert_str_to_type
+from lukefi.metsi.data.model import ForestStand, ReferenceTree, TreeStratum
 
 
 class TestOptionUtil(test_util.ConverterTestSuite):
@@ -30,3 +36,35 @@ class TestOptionUtil(test_util.ConverterTestSuite):
             ([None, None], None)
         ]
         self.run_with_test_assertions(assertions, get_or_default)
+
+    def test_compile_converter(self):
+        values = {
+            int: ['1', '-3', 'None'],
+            float: ['1.5', '2', 'None'],
+            bool: ['True', 'False', 'None'],
+            str: ['abc', 'None'],
+        }
+        for _class in (ForestStand, ReferenceTree, TreeStratum):
+            for name, property_type in class_annotations(_class).items():
+                if name == 'species' or (isinstance(property_type, type) and issubclass(property_type, list)):
+                    continue
+                converter = compile_converter(property_type, name)
+                args = getattr(property_type, '__args__', ())
+                enum_types = [t for t in args if isinstance(t, EnumMeta)]
+                if enum_types:
+                    samples = [str(member) for member in enum_types[0]] + ['None']
+                else:
+                    samples = next((v for t, v in values.items() if property_type in (t, Optional[t])), None)
+                if samples is None:
+                    continue
+                for value in samples:
+                    self.assertEqual(convert_str_to_type(_class, value, name), converter(value), (name, value))
+
+    def test_compile_row_decoder(self):
+        stand = ForestStand(identifier='1', year=2020, area=1.5, geo_location=(1.0, 2.0, 3.0, 'EPSG:3067'),
+                            land_use_category=LandUseCategory.FOREST, auxiliary_stand=True)
+        row = [str(value) for value in ['stand', stand.identifier] + stand.as_internal_row()]
+        decoded = compile_row_decoder(ForestStand, ForestStand.row_layout, offset=2)(row)
+        self.assertEqual(stand.as_internal_row(), decoded.as_internal_row())
+        self.assertEqual(LandUseCategory.FOREST, decoded.land_use_category)
+        self.assertIsNone(decoded.owner_category)
@@ -4,14 +4,13 @@ import unittest
 from lukefi.metsi.data.formats import vmi_const
 from lukefi.metsi.data.formats.ForestBuilder import *
 from lukefi.metsi.data.enums.internal import *
+from tests.test_util import stand_dicts
 
 class TestForestBuilder(unittest.TestCase):
 
     default_builder_flags = {"reference_trees": True}
 
-    @classmethod
-    def vmi12_builder(cls, vmi_builder_flags: dict = default_builder_flags) -> VMI12Builder:
-        vmi12_data = [
+    vmi12_data = [
             'K0999999 99 11    66521333246174    1010   0041721         000059500417      1   0         40020618 B0          0   0 0   0              0  0                   6652133.85 C 102600.11 66521333246174                                                                                          0      0',
             'K0999999 98 11    66521333246174    1010   1141721         140259100417404   6  99  1241271S1280818 101 1 30    0   0 0   0   00  0 10   0  0   111 011004322   6652133.94 J 118950.77 66521333246174 S1 5 1         09K10E10L09M09M19           24189 04506      1298460   0 0   0 0   00 222 1      1',
             'K0999999 98 12 01  1 11             24 190  04606N17 1  84A1 0',
@@ -21,12 +20,7 @@ class TestForestBuilder(unittest.TestCase):
             'K0999999 96 21    66521333246174    0100   1041721         000059100417      4  55         S0280818 101 3 4     0   0 0   0    132       0  0        1          6652133.05 T 117155.45 66521333246174    5 1                                                          0A                              3  19 21'
         ]
 
-        vmi12_builder: VMIBuilder = VMI12Builder(vmi_builder_flags, vmi12_data)
-        return vmi12_builder
-
-    @classmethod
-    def vmi13_builder(cls, vmi_builder_flags: dict = default_builder_flags) -> VMI13Builder:
-        vmi13_data = [
+    vmi13_data = [
             '1 U 1  99  99 99 1   . 0 20181121 2018 258 3 1 10 10  . 12 10 176 176 893    1    5 4 S 7013044.52 543791.23 7013044.52 543791.23  179.70 1019    . T  1 3   33 220  0   . 0  . 1 0  0  . . 0 1  0  . . 0 0 2 3 0  . 2 3 1 35 2 3 2 0 4  75 0 0 3 1 5  2 .  . .  . 15 4 10 0 15 2 10 8 15 6 26 .  .  .    . 22 187  63 19 . U     . E 1 . . 0 A . . . . 0 . 0 .  . 0 . 7 3 . . 4 1 . 2 2 2   0 . . 0 . .   1  0 0 .   . 0 0 . . .         . 1 7013044.52 543791.23 .    .',
             '3 U 1  99  99 99 1  10 0 20181121 258  11 V  1  250 7 2    .    . 306  863 1  0 0 .   .   .   .   .  . . .  .  .  .  . .  . .  . . . . . .   .   . .  .   .   .   .   . .   . . .   . . .   . . .   . . .   . . .   . . .   . . .   . . . .  . .  . .  . .  . .  . .  . .  . .  .     .     .     .     .     .     .     .     .     .        .        .        .     .       .      .      .      .      .     . .    .',
             '3 U 1  99  99 99 1  10 0 20181121 258  11 V  1  250 7 2    .    . 306  863 1  0 0 .   .   .   .   .  . . .  .  .  .  . .  . .  . . . . . .   .   . .  .   .   .   .   . .   . . .   . . .   . . .   . . .   . . .   . . .   . . .   . . . .  . .  . .  . .  . .  . .  . .  . .  .     .     .     .     .     .     .     .     .     .        .        .        .     .       .      .      .      .      .     . .    .',
@@ -34,7 +28,15 @@ class TestForestBuilder(unittest.TestCase):
             '2 U 1  99  99 98 1   1 0 20181102 258 1  2 3 1350  1400  4  38 E   7  8 F  2 .  0 .  .  . .  . .    .',
             '1 U 1  99  99 98 2   . 0 20181102 2018 258 3 1 10 10  . 11  9 402 402 430    6   20 1 S 7012044.52 543491.23 7012044.52 543491.23  136.10 1084    . T  2 3   54 205  0   . 8 18 1 0  0  . . 0 1  0  . . 0 0 1 3 0  . . 0 0  . 0 . 1 0 1   5 3 2 3 1 3  2 .  . .  .  3 9  2 0  3 2  . .  . .  5 .  .  . 2150  4  35   6  8 . S 10600 E 2 7 0 1 6 0 . . . 2 A 1 A  2 0 . 1 2 . . 0 0 . 2 2 2   0 . . 0 . .   . 25 0 .   . 4 0 . . .         . 1 7012044.52 543491.23 .    .',
         ]
-        vmi13_builder: VMIBuilder = VMI13Builder(vmi_builder_flags, vmi13_data)
+
+    @classmethod
+    def vmi12_builder(cls, vmi_builder_flags: dict = default_builder_flags) -> VMI12Builder:
+        vmi12_builder: VMIBuilder = VMI12Builder(vmi_builder_flags, cls.vmi12_data)
+        return vmi12_builder
+
+    @classmethod
+    def vmi13_builder(cls, vmi_builder_flags: dict = default_builder_flags) -> VMI13Builder:
+        vmi13_builder: VMIBuilder = VMI13Builder(vmi_builder_flags, cls.vmi13_data)
         return vmi13_builder
 
     @classmethod
@@ -470,3 +472,55 @@ class TestForestBuilder(unittest.TestCase):
         self.vmi13_builder().remove_strata(stands)
         self.assertEqual(0, len(stands[1].tree_strata))
 
+    def test_vmi12_build_stream(self):
+        for flags in (self.default_builder_flags, {'reference_trees': False}):
+            expected = self.vmi12_built(flags)
+            result = list(VMI12Builder(flags).build_stream(iter(self.vmi12_data)))
+            self.assertEqual(stand_dicts(expected), stand_dicts(result))
+            self.assertEqual([1, 2, 3, 4], [stand.stand_id for stand in result])
+
+    def test_vmi13_build_stream(self):
+        for flags in (self.default_builder_flags, {'reference_trees': False}):
+            expected = self.vmi13_built(flags)
+            result = list(VMI13Builder(flags).build_stream(iter(self.vmi13_data)))
+            self.assertEqual(stand_dicts(expected), stand_dicts(result))
+        result = list(VMI13Builder(self.default_builder_flags).build_stream(iter(self.vmi13_data)))
+        self.assertIs(result[0], result[0].reference_trees[0].stand)
+
+    def test_build_stream_is_lazy(self):
+        stream = VMI13Builder(self.default_builder_flags).build_stream(iter(self.vmi13_data))
+        self.assertEqual('1-99-99-99-1', next(stream).identifier)
+        self.assertEqual('1-99-99-98-1', next(stream).identifier)
+
+    def test_build_stream_unsorted(self):
+        unsorted_rows = [self.vmi13_data[i] for i in (3, 1, 0, 5, 4, 2)]
+        with self.assertRaises(ValueError):
+            list(VMI13Builder(self.default_builder_flags).build_stream(unsorted_rows))
+        result = list(VMI13Builder(self.default_builder_flags).build_stream(unsorted_rows, presorted=False))
+        self.assertEqual(['1-99-99-98-1', '1-99-99-99-1', '1-99-99-98-2'], [s.identifier for s in result])
+        self.assertEqual([1, 2, 3], [s.stand_id for s in result])
+        self.assertEqual([1, 2, 0], [len(s.reference_trees) for s in result])
+
+    def test_build_stream_without_stand_row(self):
+        with self.assertRaises(KeyError):
+            list(VMI13Builder(self.default_builder_flags).build_stream(self.vmi13_data[1:3]))
+
+    def test_build_parallel(self):
+        for flags in (self.default_builder_flags, {'reference_trees': False}):
+            for builder in (self.vmi12_builder, self.vmi13_builder):
+                expected = builder(flags).build()
+                result = builder(flags).build_parallel(max_workers=2, chunksize=1)
+                self.assertEqual(stand_dicts(expected), stand_dicts(result))
+                self.assertEqual([s.stand_id for s in expected], [s.stand_id for s in result])
+        result = self.vmi13_builder().build_parallel(max_workers=2)
+        self.assertTrue(all(tree.stand is stand for stand in result for tree in stand.reference_trees))
+
+    def test_vmi12_reproject_geo_location(self):
+        flags = {'reference_trees': True, 'reproject_geo_location': True}
+        expected = self.vmi12_built()
+        for result in (self.vmi12_builder(flags).build(),
+                       list(VMI12Builder(flags).build_stream(self.vmi12_data)),
+                       self.vmi12_builder(flags).build_columnar()):
+            for original, stand in zip(expected, result):
+                lat, lon = vmi_util.convert_vmi12_geolocation(original.geo_location[0], original.geo_location[1])
+                self.assertEqual((lat, lon, original.geo_location[2], 'EPSG:3067'), stand.geo_location)
@@ -0,0 +1,60 @@
+import itertools
+import string
+import unittest
+
+import numpy as np
+
+from lukefi.metsi.data.formats import vmi_codes, vmi_util
+
+CODES = list(string.printable[:95]) + ['', '  ', '00', '10', '3.1', '101', '201', '310', '409', '504', '999']
+
+
+class TestVMICodes(unittest.TestCase):
+
+    def assert_parity(self, decode, rule, *domains):
+        for key in itertools.product(*domains):
+            try:
+                expected = rule(*key)
+            except Exception as e:
+                self.assertRaises(type(e), decode, *key)
+                continue
+            self.assertEqual(expected, decode(*key), key)
+
+    def test_code_tables(self):
+        self.assert_parity(vmi_codes.TAX_CLASS_REDUCTION.decode, vmi_util.determine_tax_class_reduction, CODES)
+        self.assert_parity(vmi_codes.TAX_CLASS.decode, vmi_util.determine_tax_class, CODES)
+        self.assert_parity(vmi_codes.OWNER_GROUP.decode, vmi_util.determine_owner_group, CODES)
+        self.assert_parity(vmi_codes.STRATUM_ORIGIN.decode, vmi_util.determine_stratum_origin, CODES)
+        self.assert_parity(vmi_codes.DEVELOPMENT_CLASS.decode, vmi_util.determine_development_class, CODES)
+        self.assert_parity(vmi_codes.VMI12_AREA_HA.decode, vmi_util.determine_vmi12_area_ha,
+                           range(-1, 12), range(-1, 24))
+
+    def test_year_code_tables(self):
+        years = (0, 1995, 2018)
+        self.assert_parity(vmi_codes.ARTIFICIAL_REGENERATION_YEAR.decode,
+                           vmi_util.determine_artificial_regeneration_year,
+                           CODES, CODES, years)
+        self.assert_parity(vmi_codes.SOIL_SURFACE_PREPARATION_YEAR.decode,
+                           vmi_util.determine_soil_surface_preparation_year, CODES, years)
+        self.assert_parity(vmi_codes.REFORM_SECTOR_CLEARING_YEAR.decode,
+                           vmi_util.determine_clearing_of_reform_sector_year,
+                           CODES, CODES, years)
+
+    def test_production_limitations(self):
+        self.assert_parity(vmi_codes.fmc_by_production_limitations, vmi_util.determine_fmc_by_production_limitations,
+                           (1, 4), ('', '1', '7'), (0, 4), vmi_codes.PRODUCTION_LIMITATIONS + ('999', '3.1'),
+                           ('', '1', '3', '5'), ('', '1'))
+
+    def test_map(self):
+        rng = np.random.default_rng(0)
+        first = rng.choice(np.array(CODES[:20] + ['0', '1', '2', '3', '4']), 500)
+        second = rng.choice(np.array(list('0123aAbB. ')), 500)
+        years = rng.choice(np.array([2000, 2018]), 500)
+        self.assertEqual([vmi_util.determine_tax_class(code) for code in first],
+                         vmi_codes.TAX_CLASS.map(first, dtype=int).tolist())
+        self.assertEqual([vmi_util.determine_artificial_regeneration_year(*codes) for codes in
+                          zip(first.tolist(), second.tolist(), years.tolist())],
+                         vmi_codes.ARTIFICIAL_REGENERATION_YEAR.map(first, second, years).tolist())
+        self.assertEqual([], vmi_codes.TAX_CLASS.map(np.array([], dtype=str)).tolist())
+        self.assertEqual([], vmi_codes.SOIL_SURFACE_PREPARATION_YEAR.map(np.array([], dtype=str),
+                                                                         np.array([], dtype=int)).tolist())
@@ -0,0 +1,133 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from lukefi.metsi.data.enums.internal import TreeSpecies
+from lukefi.metsi.data.formats import vmi_columns
+from lukefi.metsi.data.formats.ForestBuilder import VMIBuilder, VMI12Builder, VMI13Builder
+from lukefi.metsi.data.formats.io_utils import stands_to_csv_content
+from lukefi.metsi.data.formats.vmi_const import VMI12TreeIndices, VMI13TreeIndices
+from lukefi.metsi.data.model import ReferenceTree
+from tests import vmi_builder_test
+from tests.forest_builder_run_test import vmi_file_reader
+from tests.test_util import typed_stand_dicts
+
+vmi12_data = vmi_builder_test.TestForestBuilder.vmi12_data
+vmi13_data = vmi_builder_test.TestForestBuilder.vmi13_data
+
+
+class VmiColumnsTest(unittest.TestCase):
+
+    def test_map_unique(self):
+        calls = []
+
+        def func(a, b):
+            calls.append((a, b))
+            return a + b
+
+        result = vmi_columns.map_unique(func, np.array(['1', '2', '1', '1']), np.array(['a', 'a', 'a', 'b']))
+        self.assertEqual(['1a', '2a', '1a', '1b'], result.tolist())
+        self.assertEqual(3, len(calls))
+        self.assertEqual((0,), vmi_columns.map_unique(func, np.array([]), np.array([])).shape)
+
+    def test_map_unique_dtype(self):
+        result = vmi_columns.map_unique(lambda x: int(x) * 2, np.array(['1', '3', '1']), dtype=int)
+        self.assertEqual(np.int_, result.dtype)
+        self.assertEqual([2, 6, 2], result.tolist())
+
+    def test_link_to_stands(self):
+        stands = np.array(['b', 'a', 'c'])
+        self.assertEqual([1, 1, 0, 2], vmi_columns.link_to_stands(stands, np.array(['a', 'a', 'b', 'c'])).tolist())
+        self.assertRaises(KeyError, vmi_columns.link_to_stands, stands, np.array(['a', 'd']))
+
+    def test_unique_stand_rows(self):
+        identifiers = np.array(['a', 'b', 'a', 'c'])
+        self.assertEqual([2, 1, 3], vmi_columns.unique_stand_rows(identifiers).tolist())
+
+    def test_read_vmi13_columns(self):
+        result = vmi_columns.read_vmi13_columns(vmi13_data)
+        self.assertEqual(3, result.stand_count)
+        self.assertEqual(['1-99-99-99-1', '1-99-99-98-1', '1-99-99-98-2'], result.stands['identifier'].tolist())
+        self.assertEqual([1, 2, 3], result.stands['stand_id'].tolist())
+        self.assertEqual([0, 0], result.trees['stand_index'].tolist())
+        self.assertEqual([TreeSpecies.PINE, TreeSpecies.PINE], result.trees['species'].tolist())
+        self.assertEqual([1], result.strata['stand_index'].tolist())
+        self.assertEqual({}, vmi_columns.read_vmi13_columns(vmi13_data, reference_trees=False).trees)
+
+    def test_vmi13_build_columnar(self):
+        sources = (vmi13_data, vmi_file_reader(Path('tests', 'resources', 'VMI13_source_mini.dat')))
+        for data in sources:
+            for flags in ({'reference_trees': True}, {'reference_trees': False}):
+                expected = VMI13Builder(flags, data).build()
+                result = VMI13Builder(flags, data).build_columnar()
+                self.assertEqual(typed_stand_dicts(expected), typed_stand_dicts(result))
+                self.assertTrue(all(tree.stand is stand for stand in result for tree in stand.reference_trees))
+
+    def test_vmi13_build_columnar_value_types(self):
+        def aged(row: str) -> str:
+            fields = row.split()
+            if fields[0] == '3':
+                fields[VMI13TreeIndices.d13_age] = '30'
+            return ' '.join(fields)
+
+        # integer tree ages in one stand and the float ages of a sapling stratum in another
+        data = [aged(row) for row in vmi_file_reader(Path('tests', 'resources', 'VMI13_source_mini.dat'))]
+        expected = VMI13Builder({'reference_trees': True}, data).build()
+        result = VMI13Builder({'reference_trees': True}, data).build_columnar()
+        self.assertEqual([30, 30, 7.0], [tree.breast_height_age for stand in result for tree in stand.reference_trees])
+        self.assertEqual(typed_stand_dicts(expected), typed_stand_dicts(result))
+        self.assertEqual(stands_to_csv_content(expected, ';'), stands_to_csv_content(result, ';'))
+
+    def test_concatenate_tables(self):
+        first = {'breast_height_age': np.array([30, 0]), 'sapling': np.array([False, False])}
+        second = {'breast_height_age': np.array([7.0]), 'height': np.array([1.3])}
+        result = vmi_columns.concatenate_tables(ReferenceTree, first, second)
+        self.assertEqual([int, int, float], [type(age) for age in result['breast_height_age'].tolist()])
+        self.assertEqual([False, False, False], result['sapling'].tolist())
+        self.assertEqual([ReferenceTree().height] * 2 + [1.3], result['height'].tolist())
+
+    def test_columnar_hooks_are_abstract(self):
+        class RowBuilder(VMIBuilder):
+            def find_row_type(self, row):
+                return None
+
+            def build(self):
+                return []
+
+            def supplemenent_missing_values(self, stands):
+                pass
+
+        self.assertRaises(TypeError, RowBuilder, {'reference_trees': True}, [])
+
+    def test_vmi13_build_columnar_without_stand_row(self):
+        self.assertRaises(KeyError, VMI13Builder({'reference_trees': True}, vmi13_data[1:]).build_columnar)
+
+    def test_slice_columns(self):
+        rows = [
+            'K0999999 98 13001 1207217 2  01 15521741',
+            'K0999999 98 13002 1207217'
+        ]
+        result = vmi_columns.slice_columns(vmi_columns.char_table(rows), VMI12TreeIndices)
+        for name, index in vmi_columns.index_fields(VMI12TreeIndices).items():
+            self.assertEqual([row[index] if isinstance(index, slice) else row[index:index + 1] for row in rows],
+                             result[name].tolist())
+
+    def test_read_vmi12_columns(self):
+        path = Path('tests', 'resources', 'VMI12_source_mini.dat')
+        result = vmi_columns.read_vmi12_columns(path.read_bytes())
+        self.assertEqual(4, result.stand_count)
+        self.assertEqual([1, 2, 3, 4], result.stands['stand_id'].tolist())
+        self.assertEqual([1], result.trees['stand_index'].tolist())
+        self.assertEqual([1, 2], result.strata['stand_index'].tolist())
+        self.assertEqual('EPSG:2393', result.stands['geo_location'][0][3])
+        same = vmi_columns.read_vmi12_columns(vmi_file_reader(path))
+        self.assertEqual(result.stands['identifier'].tolist(), same.stands['identifier'].tolist())
+
+    def test_vmi12_build_columnar(self):
+        sources = (vmi12_data, vmi_file_reader(Path('tests', 'resources', 'VMI12_source_mini.dat')))
+        for data in sources:
+            for flags in ({'reference_trees': True}, {'reference_trees': False}):
+                expected = VMI12Builder(flags, data).build()
+                result = VMI12Builder(flags, data).build_columnar()
+                self.assertEqual(typed_stand_dicts(expected), typed_stand_dicts(result))
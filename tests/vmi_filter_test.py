@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from lukefi.metsi.data.enums.internal import LandUseCategory
+from lukefi.metsi.data.formats.ForestBuilder import VMI12Builder, VMI13Builder
+from lukefi.metsi.data.formats.vmi_const import VMI12StandIndices, VMI13StandIndices
+from lukefi.metsi.data.formats.vmi_filter import StandFilter
+from tests.test_util import stand_dicts
+from tests import vmi_builder_test
+
+
+class TestStandFilter(unittest.TestCase):
+    builder_flags = {'reference_trees': True, 'strata_origin': '1'}
+
+    @staticmethod
+    def expected(stands: list, condition) -> list:
+        result = [stand for stand in stands if condition(stand)]
+        for i, stand in enumerate(result):
+            stand.set_identifiers(i + 1)
+        return result
+
+    def assert_filtered(self, builder_type: type, rows: list, stand_filter: StandFilter, condition):
+        flags = dict(self.builder_flags, stand_filter=stand_filter)
+        expected = stand_dicts(self.expected(builder_type(self.builder_flags, rows).build(), condition))
+        self.assertEqual(expected, stand_dicts(builder_type(flags, rows).build()))
+        self.assertEqual(expected, stand_dicts(builder_type(flags, rows).build_parallel(max_workers=2)))
+        self.assertEqual(expected, stand_dicts(builder_type(flags).build_stream(rows)))
+        self.assertEqual(expected, stand_dicts(builder_type(flags).build_stream(rows, presorted=False)))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'source.dat')
+            with open(path, 'w', encoding='utf-8') as source:
+                source.write('\n'.join(rows))
+            self.assertEqual(expected, stand_dicts(builder_type(flags).build_indexed(path)))
+            if expected:
+                # a selection of the accepted stands keeps the numbering of the whole file
+                self.assertEqual(expected[-1:], stand_dicts(builder_type(flags).build_indexed(
+                    path, stand_ids=[expected[-1][0]['identifier']])))
+
+    def test_vmi12_filters(self):
+        rows = vmi_builder_test.TestForestBuilder.vmi12_data
+        self.assert_filtered(VMI12Builder, rows, StandFilter(land_use_categories=[LandUseCategory.FOREST]),
+                             lambda stand: stand.land_use_category == LandUseCategory.FOREST)
+        self.assert_filtered(VMI12Builder, rows, StandFilter(municipalities=[417], auxiliary_stand=False),
+                             lambda stand: stand.municipality_id == 417 and not stand.auxiliary_stand)
+        self.assert_filtered(VMI12Builder, rows, StandFilter(counties=[21], lohkomuodot=[0]),
+                             lambda stand: True)
+        self.assert_filtered(VMI12Builder, rows, StandFilter(counties=[1]), lambda stand: False)
+
+    def test_vmi13_filters(self):
+        rows = vmi_builder_test.TestForestBuilder.vmi13_data
+        self.assert_filtered(VMI13Builder, rows, StandFilter(forestry_centres=[9]),
+                             lambda stand: stand.forestry_centre_id == 9)
+        self.assert_filtered(VMI13Builder, rows, StandFilter(auxiliary_stand=True),
+                             lambda stand: stand.auxiliary_stand)
+        self.assert_filtered(VMI13Builder, rows, StandFilter(bounding_box=(7012000.0, 543000.0, 7013000.0, 544000.0)),
+                             lambda stand: stand.geo_location[0] < 7013000.0)
+        self.assertRaises(ValueError, VMI13Builder, {'stand_filter': StandFilter(counties=[1])}, rows)
+
+    def test_rows_before_stand_row(self):
+        data = vmi_builder_test.TestForestBuilder.vmi13_data
+        # the tree rows of the first stand precede its stand row
+        rows = data[1:3] + data[:1] + data[3:]
+        for stand_filter, condition in ((StandFilter(auxiliary_stand=True), lambda stand: stand.auxiliary_stand),
+                                        (StandFilter(auxiliary_stand=False), lambda stand: not stand.auxiliary_stand)):
+            flags = dict(self.builder_flags, stand_filter=stand_filter)
+            expected = self.expected(VMI13Builder(self.builder_flags, rows).build(), condition)
+            self.assertEqual(stand_dicts(expected), stand_dicts(VMI13Builder(flags, rows).build()))
+
+    def test_accepts(self):
+        row = vmi_builder_test.TestForestBuilder.vmi13_data[0].split()
+        self.assertTrue(StandFilter().accepts(row, VMI13StandIndices))
+        self.assertTrue(StandFilter(lohkomuodot={1}, municipalities={12}).accepts(row, VMI13StandIndices))
+        self.assertFalse(StandFilter(land_use_categories=[LandUseCategory.SEA]).accepts(row, VMI13StandIndices))
+        self.assertFalse(StandFilter(bounding_box=(0.0, 0.0, 1.0, 1.0)).accepts(row, VMI13StandIndices))
+        row = vmi_builder_test.TestForestBuilder.vmi12_data[0]
+        self.assertTrue(StandFilter(land_use_categories=[LandUseCategory.SEA]).accepts(row, VMI12StandIndices))
+        self.assertFalse(StandFilter(auxiliary_stand=True).accepts(row, VMI12StandIndices))
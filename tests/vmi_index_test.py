@@ -0,0 +1,99 @@
+import contextlib
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from lukefi.metsi.data.formats import vmi_index
+from lukefi.metsi.data.formats.ForestBuilder import VMI12Builder, VMI13Builder
+from tests.test_util import stand_dicts
+
+RESOURCES = os.path.join(os.path.dirname(__file__), 'resources')
+
+
+class TestVMIIndex(unittest.TestCase):
+    builder_flags = {'reference_trees': True, 'strata_origin': '1'}
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def source(self, file_name: str) -> str:
+        path = os.path.join(self.directory, file_name)
+        shutil.copyfile(os.path.join(RESOURCES, file_name), path)
+        return path
+
+    @staticmethod
+    def read_lines(path: str) -> list:
+        with open(path, 'r', encoding='utf-8') as source:
+            return [line.rstrip('\n') for line in source if line.strip()]
+
+    @staticmethod
+    def writable(directory: str) -> bool:
+        try:
+            with tempfile.TemporaryFile(dir=directory):
+                return True
+        except OSError:
+            return False
+
+    def test_build_indexed(self):
+        for builder_type, file_name in ((VMI12Builder, 'VMI12_source_mini.dat'),
+                                        (VMI13Builder, 'VMI13_source_mini.dat')):
+            path = self.source(file_name)
+            expected = builder_type(self.builder_flags, self.read_lines(path)).build()
+            builder = builder_type(self.builder_flags)
+            self.assertEqual(stand_dicts(expected), stand_dicts(builder.build_indexed(path)))
+            self.assertTrue(os.path.exists(vmi_index.index_path(path)))
+            subset = [expected[-1].identifier, expected[0].identifier]
+            self.assertEqual(stand_dicts([expected[0], expected[-1]]),
+                             stand_dicts(builder.build_indexed(path, stand_ids=subset)))
+            self.assertEqual(stand_dicts(expected[1:]),
+                             stand_dicts(builder.build_indexed(path, predicate=lambda i: i != expected[0].identifier)))
+            self.assertRaises(KeyError, builder.build_indexed, path, stand_ids=['no-such-stand'])
+
+    def test_build_indexed_without_reference_trees(self):
+        path = self.source('VMI13_source_mini.dat')
+        flags = {'reference_trees': False}
+        expected = VMI13Builder(flags, self.read_lines(path)).build()
+        self.assertEqual(stand_dicts(expected), stand_dicts(VMI13Builder(flags).build_indexed(path)))
+
+    def test_persisted_index(self):
+        path = self.source('VMI13_source_mini.dat')
+        builder = VMI13Builder(self.builder_flags)
+        index = vmi_index.load_or_create(builder, path)
+        self.assertEqual(index, vmi_index.VMIIndex.load(vmi_index.index_path(path)))
+        self.assertEqual(3, len(index.stands))
+        rows = index.read_rows(path, [index.select()[0]])
+        self.assertEqual([1, 0, 2], [len(r) for r in rows[index.select()[0]]])
+        self.assertTrue(index.matches(builder, path))
+        self.assertFalse(index.matches(VMI12Builder(self.builder_flags), path))
+
+        with open(path, 'a', encoding='utf-8') as source:
+            source.write('\n' + self.read_lines(path)[0].replace(' 99 1 ', ' 97 1 ', 1))
+        os.utime(path, ns=(index.source_mtime_ns + 10 ** 9, index.source_mtime_ns + 10 ** 9))
+        self.assertFalse(index.matches(builder, path))
+        self.assertEqual(4, len(vmi_index.load_or_create(builder, path).stands))
+
+    def test_read_only_directory(self):
+        path = self.source('VMI13_source_mini.dat')
+        expected = VMI13Builder(self.builder_flags, self.read_lines(path)).build()
+        os.chmod(self.directory, stat.S_IRUSR | stat.S_IXUSR)
+        try:
+            # directory permissions are not enforced for all users, e.g. root, and the failing write is then simulated
+            save = contextlib.nullcontext()
+            if self.writable(self.directory):
+                save = patch.object(vmi_index.VMIIndex, 'save', side_effect=PermissionError('read-only'))
+            with save, self.assertWarns(UserWarning):
+                result = VMI13Builder(self.builder_flags).build_indexed(path)
+            self.assertEqual(stand_dicts(expected), stand_dicts(result))
+            self.assertFalse(os.path.exists(vmi_index.index_path(path)))
+        finally:
+            os.chmod(self.directory, stat.S_IRWXU)
+
+    def test_merged_spans(self):
+        self.assertEqual([(0, 30), (40, 5)], vmi_index.merged_spans([(0, 10), (10, 20), (40, 5)]))
+        self.assertEqual([], vmi_index.merged_spans([]))